@@ -1,63 +1,188 @@
+import json
+import os
+import re
+import time
+from collections import OrderedDict, defaultdict
+from threading import Lock
 from typing import Dict, Optional
+from ..config import (
+    MTA_KEYWORDS_EXTRA, FINGERPRINT_DB_PATH, FINGERPRINT_CACHE_SIZE, FINGERPRINT_CACHE_TTL
+)
+from ..signals.matcher import PatternMatcher
 
 class BannerFingerprinter:
     """
-    Parses SMTP banner to detect MTA type and capabilities.
-    Different MTAs have different timing and queue ID characteristics.
+    Fingerprints the MTA behind an MX host to know its timing and queue ID
+    characteristics. Matches the SMTP banner, EHLO greeting and capability
+    set, advertised SIZE limit and RCPT reply templates against a
+    fingerprint database, and caches the verdict per MX host.
     """
-    
-    MTA_PATTERNS = {
-        "postfix": {
-            "keywords": ["postfix"],
-            "supports_timing": True,
-            "supports_queue_id": True,
-            "timing_variance": 0.3,
-        },
-        "exchange": {
-            "keywords": ["exchange", "microsoft"],
-            "supports_timing": False,
-            "supports_queue_id": True,
-            "timing_variance": 0.1,
-        },
-        "mimecast": {
-            "keywords": ["mimecast"],
-            "supports_timing": False,
-            "supports_queue_id": False,
-            "timing_variance": 0.0,
-        },
-        "sendgrid": {
-            "keywords": ["sendgrid"],
-            "supports_timing": False,
-            "supports_queue_id": True,
-            "timing_variance": 0.0,
-        },
-        "google": {
-            "keywords": ["google", "aspmx"],
-            "supports_timing": True,
-            "supports_queue_id": False,
-            "timing_variance": 0.2,
-        },
-    }
+
+    # Evidence weights; a verdict needs at least MIN_SCORE
+    BANNER_WEIGHT = 3.0
+    EHLO_WEIGHT = 2.0
+    REPLY_WEIGHT = 2.0
+    CAPABILITY_WEIGHT = 1.5
+    SIZE_WEIGHT = 1.0
+    MIN_SCORE = 2.0
+    MIN_CAPABILITY_SIMILARITY = 0.85
+
+    DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "fingerprints.json")
+
+    def __init__(self, db_path: Optional[str] = FINGERPRINT_DB_PATH):
+        self.host_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = Lock()
+        self.load(db_path or self.DEFAULT_DB_PATH)
+
+    def load(self, db_path: str) -> None:
+        """Load the fingerprint database and rebuild lookup indexes."""
+        with open(db_path) as f:
+            fingerprints = json.load(f)
+
+        for mta, extra in MTA_KEYWORDS_EXTRA.items():
+            if mta in fingerprints:
+                fingerprints[mta]["banner_keywords"] = fingerprints[mta]["banner_keywords"] + extra
+
+        self.fingerprints: Dict[str, Dict] = fingerprints
+        self.banner_matcher = PatternMatcher.from_keywords(
+            (mta, fp["banner_keywords"]) for mta, fp in fingerprints.items()
+            if fp["banner_keywords"]
+        )
+        self.reply_matcher = PatternMatcher(
+            [
+                ("|".join(f"(?:{p})" for p in fp["reply_patterns"]), mta)
+                for mta, fp in fingerprints.items()
+                if fp["reply_patterns"]
+            ],
+            flags=re.IGNORECASE,
+        )
+        self.capabilities = {
+            mta: frozenset(fp["ehlo_capabilities"])
+            for mta, fp in fingerprints.items()
+            if fp["ehlo_capabilities"]
+        }
+        self.size_index = defaultdict(list)
+        for mta, fp in fingerprints.items():
+            for size in fp["size_limits"]:
+                self.size_index[size].append(mta)
+
+        with self.lock:
+            self.host_cache.clear()
 
     def parse(self, banner: str) -> Dict:
         """Parse SMTP banner and return MTA characteristics."""
-        if not banner:
-            return self._unknown_mta()
-        
-        banner_lower = banner.lower()
-        
-        for mta, config in self.MTA_PATTERNS.items():
-            if any(kw in banner_lower for kw in config["keywords"]):
-                return {
-                    "mta": mta,
-                    "supports_timing": config["supports_timing"],
-                    "supports_queue_id": config["supports_queue_id"],
-                    "timing_variance": config["timing_variance"],
-                    "banner": banner,
-                }
-        
+        return self.identify(banner=banner)
+
+    def identify(
+        self,
+        banner: Optional[str] = None,
+        ehlo_message: Optional[str] = None,
+        capabilities: Optional[Dict[str, str]] = None,
+        reply: Optional[str] = None,
+    ) -> Dict:
+        """
+        Identify the MTA from all available evidence.
+        capabilities is the EHLO extension map (lowercase name -> params).
+        """
+        scores: Dict[str, float] = defaultdict(float)
+
+        match = self.banner_matcher.search(banner or "")
+        if match:
+            scores[match[0]] += self.BANNER_WEIGHT
+
+        if ehlo_message:
+            # First EHLO line is the greeting, e.g. "mx.google.com at your service"
+            match = self.banner_matcher.search(ehlo_message.split("\n", 1)[0])
+            if match:
+                scores[match[0]] += self.EHLO_WEIGHT
+
+        if reply:
+            match = self.reply_matcher.search(reply)
+            if match:
+                scores[match[0]] += self.REPLY_WEIGHT
+
+        if capabilities:
+            advertised = frozenset(capabilities)
+            for mta, known in self.capabilities.items():
+                similarity = len(advertised & known) / len(advertised | known)
+                if similarity >= self.MIN_CAPABILITY_SIMILARITY:
+                    scores[mta] += self.CAPABILITY_WEIGHT * similarity
+
+            size = capabilities.get("size", "")
+            if size.isdigit():
+                for mta in self.size_index.get(int(size), []):
+                    scores[mta] += self.SIZE_WEIGHT
+
+        if scores:
+            mta, score = max(scores.items(), key=lambda item: item[1])
+            if score >= self.MIN_SCORE:
+                return self._known_mta(mta, banner, score)
+
         return self._unknown_mta()
 
+    def fingerprint_host(
+        self,
+        mx_host: str,
+        banner: Optional[str] = None,
+        ehlo_message: Optional[str] = None,
+        capabilities: Optional[Dict[str, str]] = None,
+        reply: Optional[str] = None,
+    ) -> Dict:
+        """
+        Identify the MTA behind mx_host, reusing a cached verdict.
+        Unknown verdicts are not cached when a reply is still to come,
+        so refine() can upgrade them from the RCPT reply text.
+        """
+        cached = self.cached(mx_host)
+        if cached is not None:
+            return cached
+
+        info = self.identify(banner, ehlo_message, capabilities, reply)
+        if info["mta"] != "unknown" or reply is not None:
+            self._store(mx_host, info)
+        return info
+
+    def refine(self, mx_host: str, info: Dict, reply: str) -> Dict:
+        """Upgrade an unknown verdict using RCPT reply text."""
+        if info["mta"] != "unknown" or not reply:
+            return info
+
+        match = self.reply_matcher.search(reply)
+        refined = self._known_mta(match[0], info.get("banner"), self.REPLY_WEIGHT) if match else info
+        self._store(mx_host, refined)
+        return refined
+
+    def cached(self, mx_host: str) -> Optional[Dict]:
+        """Return the cached fingerprint for mx_host, if still fresh."""
+        with self.lock:
+            entry = self.host_cache.get(mx_host)
+            if entry is None:
+                return None
+            info, expires_at = entry
+            if time.time() >= expires_at:
+                del self.host_cache[mx_host]
+                return None
+            self.host_cache.move_to_end(mx_host)
+            return info
+
+    def _store(self, mx_host: str, info: Dict) -> None:
+        with self.lock:
+            self.host_cache[mx_host] = (info, time.time() + FINGERPRINT_CACHE_TTL)
+            self.host_cache.move_to_end(mx_host)
+            while len(self.host_cache) > FINGERPRINT_CACHE_SIZE:
+                self.host_cache.popitem(last=False)
+
+    def _known_mta(self, mta: str, banner: Optional[str], score: float) -> Dict:
+        fp = self.fingerprints[mta]
+        return {
+            "mta": mta,
+            "supports_timing": fp["supports_timing"],
+            "supports_queue_id": fp["supports_queue_id"],
+            "timing_variance": fp["timing_variance"],
+            "banner": banner,
+            "score": score,
+        }
+
     def _unknown_mta(self) -> Dict:
         """Default for unknown MTA."""
         return {
@@ -68,4 +193,4 @@ class BannerFingerprinter:
             "banner": None,
         }
 
-fingerprinter = BannerFingerprinter()
\ No newline at end of file
+fingerprinter = BannerFingerprinter()
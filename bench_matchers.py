@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for queue ID and banner matchers.
+
+Compares the precompiled single-pass matchers against the previous
+per-pattern re.search / keyword loop over a corpus of real-world SMTP
+banners and RCPT replies.
+
+    python -m app.bench_matchers [iterations]
+"""
+import re
+import sys
+import timeit
+
+from .signals.banner import BannerFingerprinter
+from .signals.queue_id import QueueIDDetector
+
+BANNERS = [
+    "mx.google.com ESMTP a640c23a62f3a-9a1e1b2f3c4si123456ejc.123 - gsmtp",
+    "aspmx.l.google.com ESMTP z12si345678qtb.42 - gsmtp",
+    "mail.example.com ESMTP Postfix (Debian/GNU)",
+    "smtp.example.org ESMTP Postfix",
+    "BN8NAM12FT043.mail.protection.outlook.com Microsoft ESMTP MAIL Service ready at Mon, 2 Oct 2023 10:11:12 +0000",
+    "EXCH01.corp.example.com Microsoft ESMTP MAIL Service ready",
+    "us-smtp-inbound-1.mimecast.com ESMTP service ready",
+    "eu-smtp-inbound-2.mimecast.com ESMTP service ready",
+    "mx.sendgrid.net ESMTP service ready",
+    "mx1.mail.yahoo.com ESMTP ready",
+    "mx.zoho.com SMTP Server ready October 2, 2023 10:11:12 AM PDT",
+    "mail.protonmail.ch ESMTP Postfix",
+    "smtp.secureserver.net ESMTP",
+    "mx-in.messagelabs.com ESMTP",
+    "",
+]
+
+REPLIES = [
+    "2.1.5 OK a640c23a62f3a-9a1e1b2f3c4si123456ejc.123 - gsmtp",
+    "2.1.5 Ok",
+    "2.1.5 Recipient <user@example.com> OK",
+    "5.1.1 <nobody@example.com>: Recipient address rejected: User unknown in virtual mailbox table",
+    "5.1.1 The email account that you tried to reach does not exist. z12si345678qtb.42 - gsmtp",
+    "2.1.5 Recipient OK [BN8NAM12FT043.eop-nam12.prod.protection.outlook.com]",
+    "5.4.1 Recipient address rejected: Access denied. AS(201806281) [DM6NAM12FT012.eop-nam12.prod.protection.outlook.com]",
+    "Ok: queued as 4RzT9L2vXkz9sWQ",
+    "2.0.0 Ok: queued as 3C5F21A0B7",
+    "2.1.5 <user@example.com>... Recipient ok",
+    "550 Invalid Recipient - https://community.mimecast.com/docs/DOC-1369#550 [aBcDeFgHiJkLmNoPqR.us1]",
+    "250 2.1.5 Ok 1a2b3c4d-5e6f-7a8b-9c0d-1e2f3a4b5c6d",
+    "2.1.5 OK id=1qAbCd-0005xY-Zz",
+    "",
+]
+
+def legacy_detect(message: str):
+    message_str = str(message).strip()
+    for pattern, pattern_name in QueueIDDetector.PATTERNS:
+        match = re.search(pattern, message_str)
+        if match:
+            return pattern_name, match.group(0)
+    return None
+
+def legacy_parse(banner: str, fingerprints: dict):
+    banner_lower = banner.lower()
+    for mta, config in fingerprints.items():
+        if any(kw in banner_lower for kw in config["banner_keywords"]):
+            return mta
+    return None
+
+def run(iterations: int = 20000) -> None:
+    detector = QueueIDDetector()
+    fingerprinter = BannerFingerprinter()
+
+    cases = [
+        ("queue_id legacy", lambda: [legacy_detect(r) for r in REPLIES]),
+        ("queue_id compiled", lambda: [detector.detect(r) for r in REPLIES]),
+        ("banner legacy", lambda: [legacy_parse(b, fingerprinter.fingerprints) for b in BANNERS]),
+        ("banner compiled", lambda: [fingerprinter.parse(b) for b in BANNERS]),
+    ]
+
+    for name, fn in cases:
+        seconds = timeit.timeit(fn, number=iterations)
+        per_item = seconds / iterations / len(REPLIES if "queue" in name else BANNERS) * 1e6
+        print(f"{name:<20} {seconds * 1000:9.1f} ms total  {per_item:6.2f} us/item")
+
+    print(f"queue_id cache: {detector.matcher.cache_info()}")
+    print(f"banner cache:   {fingerprinter.banner_matcher.cache_info()}")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
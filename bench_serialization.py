@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for /verify response serialization.
+
+Compares FastAPI's default path for a response_model (validate the
+VerifyResponse again, walk it with jsonable_encoder, json.dumps) against
+render_verify_response (construct() over already-validated results,
+orjson), in row and columnar layouts, for a full 1000-email batch.
+
+    python -m app.bench_serialization [iterations] [batch_size]
+"""
+import json
+import random
+import sys
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+from .schemas import VerifyResponse, VerifyResult, StatusEnum, SourceEnum
+from .serialization import render_verify_response, orjson
+
+BACKPRESSURE = {
+    "queue_depth": 120, "customer_queue_depth": 40, "in_flight": 50,
+    "capacity": 50, "expected_wait_ms": 4800,
+}
+
+def make_results(size: int):
+    rng = random.Random(42)
+    results = []
+    for i in range(size):
+        probed = rng.random() < 0.3
+        results.append(VerifyResult(
+            email=f"user{i}@example{i % 50}.com",
+            status=rng.choice([StatusEnum.VALID, StatusEnum.RISKY, StatusEnum.INVALID]),
+            deliverable=rng.random() < 0.7,
+            confidence=rng.randint(0, 100),
+            catch_all=probed,
+            source=SourceEnum.PROBE_ENGINE if probed else SourceEnum.OMKAR,
+            reason="catch_all_probed" if probed else "verified",
+            signals={
+                "fake_rejected": False,
+                "queue_id": rng.random() < 0.5,
+                "timing_ratio": round(rng.uniform(0.5, 3.0), 3),
+                "spf_strict": True,
+                "mta": "postfix",
+            } if probed else None,
+        ))
+    return results
+
+def legacy_render(results) -> bytes:
+    response = VerifyResponse(
+        results=results, total_processed=len(results), total_errors=0,
+        processing_time_ms=1234.5, backpressure=BACKPRESSURE,
+    )
+    validated = VerifyResponse.validate(response)
+    return json.dumps(
+        jsonable_encoder(validated), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+def fast_render(results, columnar: bool) -> bytes:
+    response = VerifyResponse.construct(
+        results=results, total_processed=len(results), total_errors=0,
+        processing_time_ms=1234.5, job_id=None, pending=0, backpressure=BACKPRESSURE,
+        trace_id=None,
+    )
+    return render_verify_response(response, columnar).body
+
+def run(iterations: int = 50, batch_size: int = 1000) -> None:
+    results = make_results(batch_size)
+    cases = [
+        ("fastapi default", lambda: legacy_render(results)),
+        ("fast rows", lambda: fast_render(results, False)),
+        ("fast columnar", lambda: fast_render(results, True)),
+    ]
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    for name, fn in cases:
+        size = len(fn())
+        seconds = timeit.timeit(fn, number=iterations)
+        per_batch = seconds / iterations * 1000
+        print(f"{name:<16} {per_batch:8.2f} ms/batch  {size / 1024:7.1f} KiB")
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
@@ -1,10 +1,22 @@
 import os
-from typing import List
+import json
+from typing import Dict, List
 
 # ============ OMKAR API ============
 OMKAR_API_KEY = os.getenv("OMKAR_API_KEY", "your-api-key-here")
 OMKAR_URL = "https://email-verification-api.omkar.cloud/verify"
 OMKAR_TIMEOUT = 10
+OMKAR_MAX_RPS = float(os.getenv("OMKAR_MAX_RPS", "50"))
+OMKAR_MIN_RPS = 1.0  # Floor for adaptive backoff on 429s
+OMKAR_MAX_CONCURRENCY = int(os.getenv("OMKAR_MAX_CONCURRENCY", "20"))
+OMKAR_MAX_RETRIES = 2  # Retries after a 429
+OMKAR_BACKOFF_DEFAULT = 1.0  # Pause (s) on 429 without Retry-After
+OMKAR_LATENCY_WINDOW = 500  # Recent latencies kept for the hedge quantile
+OMKAR_HEDGE_QUANTILE = 0.95  # Start the probe once Omkar is slower than this
+OMKAR_HEDGE_MIN_SAMPLES = 20
+OMKAR_HEDGE_DEFAULT_DELAY = 1.0  # seconds, until enough samples exist
+OMKAR_BREAKER_THRESHOLD = 5  # Consecutive Omkar failures before skipping it
+OMKAR_BREAKER_COOLDOWN = 30
 
 # ============ REDIS ============
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
@@ -12,7 +24,7 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 REDIS_DB = int(os.getenv("REDIS_DB", "0"))
 
 # ============ RATE LIMITING ============
-MAX_DOMAIN_CONCURRENCY = 2
+MAX_DOMAIN_CONCURRENCY = 2  # Concurrent probes per domain (per MX host with SHARD_KEY=mx)
 DOMAIN_COOLDOWN = 300  # seconds
 CIRCUIT_BREAKER_THRESHOLD = 3
 CIRCUIT_BREAKER_COOLDOWN = 300
@@ -34,20 +46,140 @@ SMTP_EHLO_NAME = "bounso.com"
 FAKE_EMAIL_LENGTH = 12
 CONFIDENCE_THRESHOLD = 80
 CATCH_ALL_CONFIDENCE_CAP = 85
+FAKE_PROBES_COLD = 2  # Fake RCPTs while no timing baseline exists for the MX
+FAKE_PROBES_WARM = 1  # Fake RCPTs once the MX baseline is learned
+FAKE_PROBES_MAX = 4  # Upper bound while the timing verdict stays ambiguous
+PROBE_HISTORY_MAX_DOMAINS = 50000
+PROBE_HISTORY_MIN_PROBES = 5  # Probes before a domain's history shapes its plan
+PROBE_HISTORY_REJECT_RATE = 0.9  # Domains rejecting the first fake this often get one fake
+PROBE_EXTRA_MIN_YIELD = 0.2  # Stop extra fakes on domains where they resolve timing less often
 PROVIDER_MAX_CONFIDENCE = {
     "default": 85,
     "gmail.com": 75,
     "outlook.com": 70,
 }
 
+# ============ SIGNAL MATCHERS ============
+MATCHER_CACHE_SIZE = 4096  # Memoized banners/replies per matcher
+# JSON list of [regex, name] pairs, tried before the built-in queue ID patterns
+QUEUE_ID_PATTERNS_EXTRA: List = json.loads(os.getenv("QUEUE_ID_PATTERNS_EXTRA", "[]"))
+# JSON object of mta -> extra banner keywords
+MTA_KEYWORDS_EXTRA: Dict[str, List[str]] = json.loads(os.getenv("MTA_KEYWORDS_EXTRA", "{}"))
+
+# ============ MTA FINGERPRINTS ============
+FINGERPRINT_DB_PATH = os.getenv("FINGERPRINT_DB_PATH")  # Defaults to signals/fingerprints.json
+FINGERPRINT_CACHE_SIZE = 20000  # MX hosts
+FINGERPRINT_CACHE_TTL = 86400
+
+# ============ TIMING BASELINES ============
+TIMING_BASELINE_MIN_SAMPLES = 8
+TIMING_BASELINE_WINDOW = 500  # Samples kept per MX before old ones decay
+TIMING_BASELINE_MAX_HOSTS = 50000
+TIMING_Z_THRESHOLD = 2.0  # Std devs from the fake mean to call a verdict
+TIMING_MIN_CV = 0.05
+
+# ============ EXECUTION POLICY ============
+JOB_TTL = 86400  # Queued-probe job results kept for a day
+
+# ============ EXPORT ============
+EXPORT_SINK = os.getenv("EXPORT_SINK", "local")  # local | s3
+EXPORT_LOCAL_DIR = os.getenv("EXPORT_LOCAL_DIR", "exports")
+EXPORT_S3_BUCKET = os.getenv("EXPORT_S3_BUCKET", "")
+EXPORT_S3_PREFIX = os.getenv("EXPORT_S3_PREFIX", "exports/")
+EXPORT_S3_ENDPOINT = os.getenv("EXPORT_S3_ENDPOINT") or None  # e.g. a local MinIO, http://localhost:9000
+EXPORT_URL_TTL = 3600  # Presigned download URLs, seconds
+EXPORT_PART_SIZE = 8 * 1024 * 1024  # Compressed bytes per CSV part (S3 parts must be >= 5 MiB)
+EXPORT_PARQUET_ROWS = 200000  # Rows per Parquet part file
+EXPORT_CHUNK_ROWS = 1000  # Results read from Redis per encode step
+EXPORT_GZIP_LEVEL = 6
+
+# ============ WEBHOOKS ============
+WEBHOOK_SIGNING_SECRET = os.getenv("WEBHOOK_SIGNING_SECRET", "")  # Required for callback_url
+WEBHOOK_BATCH_SIZE = 100  # Results per callback POST
+WEBHOOK_TIMEOUT = 10
+WEBHOOK_CONCURRENCY = 20  # Parallel deliveries / pooled connections
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_BACKOFF_BASE = 5  # seconds, doubled per attempt
+WEBHOOK_BACKOFF_MAX = 3600
+WEBHOOK_POLL_INTERVAL = 1.0
+WEBHOOK_LEASE_SECONDS = 60  # Redelivered if a worker dies mid-send
+WEBHOOK_RETENTION = 86400 * 3
+WEBHOOK_DEAD_MAX = 10000  # Dead-lettered delivery ids kept (newest)
+
+# ============ FEEDBACK ============
+FEEDBACK_FLUSH_EVENTS = 5000  # Events aggregated in memory per Redis flush
+
+# ============ PRE-FILTER ============
+PREFILTER_DISPOSABLE_PATH = os.getenv("PREFILTER_DISPOSABLE_PATH")  # Defaults to core/disposable_domains.txt
+PREFILTER_ROLE_PATH = os.getenv("PREFILTER_ROLE_PATH")  # Defaults to core/role_accounts.txt
+PREFILTER_ROLE_ACCOUNTS = os.getenv("PREFILTER_ROLE_ACCOUNTS", "true").lower() == "true"
+PREFILTER_CHECK_MX = True
+
+# ============ DOMAIN CACHE ============
+DOMAIN_CACHE_MAX_DOMAINS = 100000
+DOMAIN_CACHE_TTLS = {  # seconds
+    "mx": 3600,
+    "mail_host": 3600,
+    "spf": 3600,
+    "provider_cap": 86400,
+    "reputation_cap": 60,
+}
+DOMAIN_CACHE_NEGATIVE_TTL = 300  # Failed/empty lookups
+DOMAIN_CACHE_STALE_TTL = 600  # Serve stale while refreshing for this long
+DOMAIN_CACHE_BETA = 1.0  # XFetch early-expiry aggressiveness
+
+# ============ TRACING ============
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")  # none | stdout | file
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))  # Head sampling
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "5000"))  # Tail: keep traces slower than this
+TRACE_KEEP_ERRORS = True  # Tail: keep traces with a failed span
+TRACE_MAX_SPANS = 2000  # Per trace; later spans are not recorded
+
+# ============ LIFECYCLE ============
+# Domains whose DNS facts are prefetched at startup; defaults to the provider cap list
+WARMUP_DOMAINS = [d.strip() for d in os.getenv("WARMUP_DOMAINS", "").split(",") if d.strip()]
+WARMUP_FIELDS = ("mx", "mail_host", "spf", "provider_cap")
+WARMUP_TIMEOUT = 10  # seconds for the whole prefetch
+DRAIN_TIMEOUT = int(os.getenv("DRAIN_TIMEOUT", "30"))  # seconds to let in-flight probes finish on shutdown
+
 # ============ QUOTAS ============
 QUOTA_LIMITS = {
     "default": {
         "per_customer_hour": 500,
         "global_hour": 5000,
+        "weight": 1,  # Share of probe capacity under contention
     },
     "high_tier": {
         "per_customer_hour": 5000,
         "global_hour": 50000,
+        "weight": 4,
     },
-}
\ No newline at end of file
+}
+# JSON object of customer_id -> tier; unlisted customers are "default"
+CUSTOMER_TIERS: Dict[str, str] = json.loads(os.getenv("CUSTOMER_TIERS", "{}"))
+
+# ============ USAGE ============
+USAGE_RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}  # Rollup bucket sizes, finest first
+USAGE_RETENTION = {"minute": 2 * 86400, "hour": 90 * 86400, "day": 730 * 86400}  # seconds
+USAGE_FLUSH_EVENTS = 5000  # Buffered counts before an early flush
+USAGE_FLUSH_INTERVAL = 5  # seconds between background flushes
+USAGE_MAX_BUCKETS = 1500  # Per query; longer ranges need a coarser resolution
+USAGE_TOP_DOMAINS = 20
+
+# ============ SCHEDULER ============
+PROBE_MAX_CONCURRENCY = int(os.getenv("PROBE_MAX_CONCURRENCY", 50))  # Concurrent SMTP probes per worker
+SCHEDULER_MAX_QUEUE = 20000  # Queued probes before new ones are turned away
+SCHEDULER_SERVICE_TIME_DEFAULT = 2.0  # seconds per probe until measured
+SCHEDULER_INTERACTIVE_MAX_EMAILS = 10  # Small synchronous requests get the priority lane
+SCHEDULER_INTERACTIVE_MAX_REQUESTED = 100  # Largest request that may ask for the priority lane
+
+# ============ SHARDING ============
+# This worker's base URL as reachable by its peers; empty disables shard routing
+SHARD_SELF_URL = os.getenv("SHARD_SELF_URL", "")
+SHARD_KEY = os.getenv("SHARD_KEY", "domain")  # domain | mx
+SHARD_VNODES = 128  # Virtual nodes per worker on the hash ring
+SHARD_HEARTBEAT_INTERVAL = 2  # seconds
+SHARD_HEARTBEAT_TTL = 10  # Workers silent this long leave the ring
+SHARD_FORWARD_TIMEOUT = 90  # seconds; a forwarded probe runs a whole SMTP session
+SHARD_TOKEN = os.getenv("SHARD_TOKEN", "")  # Shared secret for /internal/probe; required with SHARD_SELF_URL
@@ -65,6 +65,43 @@ class DNSSignalAnalyzer:
         
         return {"present": False, "count": 0, "hosts": []}
 
+    def get_primary_mx(self, domain: str) -> Optional[str]:
+        """Resolve domain to primary MX host."""
+        try:
+            mx = dns.resolver.resolve(domain, "MX")
+            primary = sorted(mx, key=lambda x: x.preference)[0]
+            return primary.exchange.to_text().rstrip(".")
+        except Exception as e:
+            logger.warning(f"MX lookup failed for {domain}: {e}")
+            return None
+
+    def has_mail_host(self, domain: str) -> Optional[bool]:
+        """
+        Check whether the domain can receive mail at all.
+        False on NXDOMAIN, null MX (RFC 7505) or no MX and no A record;
+        None when the lookup failed transiently.
+        """
+        try:
+            records = dns.resolver.resolve(domain, "MX")
+            return any(r.exchange.to_text() != "." for r in records)
+        except dns.resolver.NXDOMAIN:
+            return False
+        except dns.resolver.NoAnswer:
+            pass
+        except Exception as e:
+            logger.debug(f"MX lookup failed for {domain}: {e}")
+            return None
+
+        # No MX: RFC 5321 falls back to the A record as implicit MX
+        try:
+            dns.resolver.resolve(domain, "A")
+            return True
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            return False
+        except Exception as e:
+            logger.debug(f"A lookup failed for {domain}: {e}")
+            return None
+
     def analyze(self, domain: str) -> Dict:
         """Full DNS signal analysis."""
         spf = self.get_spf(domain)
@@ -0,0 +1,239 @@
+import asyncio
+import inspect
+import logging
+import math
+import random
+import time
+from collections import OrderedDict, defaultdict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+from ..config import (
+    DOMAIN_CACHE_MAX_DOMAINS, DOMAIN_CACHE_TTLS, DOMAIN_CACHE_NEGATIVE_TTL,
+    DOMAIN_CACHE_STALE_TTL, DOMAIN_CACHE_BETA,
+)
+from ..signals.dns_signals import dns_analyzer
+from ..signals.provider import provider_caps
+from ..protection.reputation import reputation
+from ..core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "stale_until", "load_time")
+
+    def __init__(self, value: Any, ttl: float, stale_ttl: float, load_time: float):
+        now = time.time()
+        self.value = value
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale_ttl
+        self.load_time = load_time
+
+class DomainCache:
+    """
+    In-process cache of domain-level facts (MX, SPF, provider cap,
+    reputation cap), grouped into one record per domain.
+
+    - Size-bounded LRU over domains, per-field TTLs
+    - Stale-while-revalidate: stale values are served while a background
+      refresh runs
+    - Early probabilistic expiry (XFetch) spreads refreshes of hot keys
+    - Single-flight loads so concurrent misses share one lookup
+    """
+
+    def __init__(
+        self,
+        max_domains: int = DOMAIN_CACHE_MAX_DOMAINS,
+        stale_ttl: float = DOMAIN_CACHE_STALE_TTL,
+        beta: float = DOMAIN_CACHE_BETA,
+    ):
+        self.max_domains = max_domains
+        self.stale_ttl = stale_ttl
+        self.beta = beta
+        self.records: "OrderedDict[str, Dict[str, CacheEntry]]" = OrderedDict()
+        self.loaders: Dict[str, Tuple[Callable, float, float]] = {}
+        self.inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.lock = Lock()
+        self.counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.evictions = 0
+
+    def register(
+        self,
+        field: str,
+        loader: Callable[[str], Any],
+        ttl: float,
+        negative_ttl: Optional[float] = None,
+    ) -> None:
+        """
+        Register a loader for a field. Loaders may be sync (run in a worker
+        thread) or async. None results are cached for negative_ttl.
+        """
+        self.loaders[field] = (loader, ttl, ttl if negative_ttl is None else negative_ttl)
+
+    async def get(self, domain: str, field: str) -> Any:
+        """Get a field, loading or refreshing it as needed."""
+        value = self._lookup(domain, field)
+        if value is not _MISSING:
+            return value
+
+        self.counters[field]["misses"] += 1
+        return await self._load(domain, field)
+
+    def get_sync(self, domain: str, field: str) -> Any:
+        """
+        Get a field from synchronous code. Misses are loaded inline,
+        so only use this for fields with sync loaders.
+        """
+        value = self._lookup(domain, field)
+        if value is not _MISSING:
+            return value
+
+        self.counters[field]["misses"] += 1
+        loader, _, _ = self.loaders[field]
+        start = time.time()
+        value = loader(domain)
+        self._store(domain, field, value, time.time() - start)
+        return value
+
+    def set(self, domain: str, field: str, value: Any) -> None:
+        """Seed or overwrite a field."""
+        self._store(domain, field, value, 0.0)
+
+    def invalidate(self, domain: str, field: Optional[str] = None) -> None:
+        """Drop one field or the whole domain record."""
+        with self.lock:
+            if field is None:
+                self.records.pop(domain, None)
+            elif domain in self.records:
+                self.records[domain].pop(field, None)
+
+    def record(self, domain: str) -> Dict[str, Any]:
+        """Snapshot of all cached (fresh or stale) fields for a domain."""
+        now = time.time()
+        with self.lock:
+            fields = self.records.get(domain, {})
+            return {
+                field: entry.value
+                for field, entry in fields.items()
+                if now < entry.stale_until
+            }
+
+    def stats(self) -> Dict:
+        """Hit/miss stats per field for monitoring."""
+        with self.lock:
+            domains = len(self.records)
+        fields = {}
+        for field, counts in self.counters.items():
+            lookups = counts["hits"] + counts["stale_hits"] + counts["misses"]
+            fields[field] = dict(counts, hit_rate=(
+                (counts["hits"] + counts["stale_hits"]) / lookups if lookups else 0.0
+            ))
+        return {
+            "domains": domains,
+            "max_domains": self.max_domains,
+            "evictions": self.evictions,
+            "fields": fields,
+        }
+
+    def _lookup(self, domain: str, field: str) -> Any:
+        """Return a cached value (scheduling refreshes) or _MISSING."""
+        now = time.time()
+        with self.lock:
+            entry = self.records.get(domain, {}).get(field)
+            if entry is None or now >= entry.stale_until:
+                return _MISSING
+            self.records.move_to_end(domain)
+
+        counts = self.counters[field]
+        if now >= entry.expires_at:
+            counts["stale_hits"] += 1
+            self._refresh_in_background(domain, field)
+        else:
+            counts["hits"] += 1
+            # XFetch: refresh early with probability rising towards expiry
+            if entry.load_time > 0 and now - entry.load_time * self.beta * math.log(
+                random.random() or 1e-12
+            ) >= entry.expires_at:
+                counts["early_refreshes"] += 1
+                self._refresh_in_background(domain, field)
+        return entry.value
+
+    def _refresh_in_background(self, domain: str, field: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if (domain, field) not in self.inflight:
+            loop.create_task(self._load(domain, field, background=True))
+
+    async def _load(self, domain: str, field: str, background: bool = False) -> Any:
+        """Single-flight load; concurrent callers await the same future."""
+        key = (domain, field)
+        pending = self.inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        loader, _, _ = self.loaders[field]
+        start = time.time()
+        try:
+            with tracer.span(f"cache.load.{field}", domain=domain, background=background):
+                if inspect.iscoroutinefunction(loader):
+                    value = await loader(domain)
+                else:
+                    value = await asyncio.to_thread(loader, domain)
+        except Exception as e:
+            self.counters[field]["load_errors"] += 1
+            future.set_exception(e)
+            # Retrieve so an unawaited background failure is not logged as lost
+            future.exception()
+            if background:
+                logger.warning(f"Background refresh of {field} for {domain} failed: {e}")
+                return None
+            raise
+        else:
+            self._store(domain, field, value, time.time() - start)
+            future.set_result(value)
+            return value
+        finally:
+            self.inflight.pop(key, None)
+            if not future.done():
+                # Loader was cancelled; wake waiters instead of leaving them hanging
+                future.cancel()
+            if background:
+                self.counters[field]["refreshes"] += 1
+
+    def _store(self, domain: str, field: str, value: Any, load_time: float) -> None:
+        _, ttl, negative_ttl = self.loaders.get(field, (None, 0, 0))
+        entry = CacheEntry(
+            value,
+            negative_ttl if value is None else ttl,
+            self.stale_ttl,
+            load_time,
+        )
+        with self.lock:
+            record = self.records.get(domain)
+            if record is None:
+                record = self.records[domain] = {}
+            record[field] = entry
+            self.records.move_to_end(domain)
+            while len(self.records) > self.max_domains:
+                self.records.popitem(last=False)
+                self.evictions += 1
+
+domain_cache = DomainCache()
+domain_cache.register(
+    "mx", dns_analyzer.get_primary_mx,
+    ttl=DOMAIN_CACHE_TTLS["mx"], negative_ttl=DOMAIN_CACHE_NEGATIVE_TTL,
+)
+domain_cache.register(
+    "mail_host", dns_analyzer.has_mail_host,
+    ttl=DOMAIN_CACHE_TTLS["mail_host"], negative_ttl=DOMAIN_CACHE_NEGATIVE_TTL,
+)
+domain_cache.register("spf", dns_analyzer.get_spf, ttl=DOMAIN_CACHE_TTLS["spf"])
+domain_cache.register("provider_cap", provider_caps.get_cap, ttl=DOMAIN_CACHE_TTLS["provider_cap"])
+domain_cache.register(
+    "reputation_cap", reputation.get_confidence_cap, ttl=DOMAIN_CACHE_TTLS["reputation_cap"]
+)
@@ -1,9 +1,10 @@
 import redis
 from fastapi import HTTPException
 from ..config import (
-    REDIS_HOST, REDIS_PORT, REDIS_DB, QUOTA_LIMITS
+    REDIS_HOST, REDIS_PORT, REDIS_DB, QUOTA_LIMITS, CUSTOMER_TIERS
 )
 from typing import Dict
+from ..core.tracing import traced
 
 class QuotaManager:
     """
@@ -22,6 +23,11 @@ class QuotaManager:
         """Get quota limits for tier."""
         return QUOTA_LIMITS.get(tier, QUOTA_LIMITS["default"])
 
+    def get_tier(self, customer_id: str) -> str:
+        """Get customer's tier (CUSTOMER_TIERS, else default)."""
+        return CUSTOMER_TIERS.get(customer_id, "default")
+
+    @traced("redis.quota.check")
     def check_quota(self, customer_id: str, domain: str, tier: str = "default") -> None:
         """
         Check customer and global quotas.
@@ -65,16 +71,18 @@ class QuotaManager:
                 }
             )
 
+    @traced("redis.quota.usage")
     def get_usage(self, customer_id: str, domain: str) -> Dict:
         """Get current usage stats."""
         cust_key = f"quota:cust:{customer_id}:{domain}"
         glob_key = f"quota:global:{domain}"
+        limits = self.get_limits(self.get_tier(customer_id))
         
         return {
             "customer_used": int(self.r.get(cust_key) or 0),
-            "customer_limit": self.get_limits()["per_customer_hour"],
+            "customer_limit": limits["per_customer_hour"],
             "global_used": int(self.r.get(glob_key) or 0),
-            "global_limit": self.get_limits()["global_hour"],
+            "global_limit": limits["global_hour"],
             "customer_reset_in": self.r.ttl(cust_key),
             "global_reset_in": self.r.ttl(glob_key),
         }
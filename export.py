@@ -0,0 +1,433 @@
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+import zlib
+import redis
+from typing import Dict, List, Optional
+from ..config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, JOB_TTL, EXPORT_SINK, EXPORT_LOCAL_DIR,
+    EXPORT_S3_BUCKET, EXPORT_S3_PREFIX, EXPORT_S3_ENDPOINT, EXPORT_URL_TTL,
+    EXPORT_PART_SIZE, EXPORT_PARQUET_ROWS, EXPORT_CHUNK_ROWS, EXPORT_GZIP_LEVEL,
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - Parquet export is optional
+    pyarrow = None
+
+try:
+    import boto3
+except ImportError:  # pragma: no cover - only needed for EXPORT_SINK=s3
+    boto3 = None
+
+logger = logging.getLogger(__name__)
+
+# Exported columns: VerifyResult fields with signals flattened
+EXPORT_COLUMNS = [
+    ("email", "string"),
+    ("status", "string"),
+    ("deliverable", "bool_"),
+    ("confidence", "int32"),
+    ("catch_all", "bool_"),
+    ("retry_after", "int32"),
+    ("source", "string"),
+    ("reason", "string"),
+    ("processing_time_ms", "float64"),
+    ("signal_fake_rejected", "bool_"),
+    ("signal_queue_id", "bool_"),
+    ("signal_timing_ratio", "float64"),
+    ("signal_spf_strict", "bool_"),
+    ("signal_mta", "string"),
+]
+EXPORT_FILES = {"csv": "results.csv.gz", "parquet": "results"}
+
+def _flatten(result: Dict) -> Dict:
+    row = {name: result.get(name) for name, _ in EXPORT_COLUMNS if not name.startswith("signal_")}
+    signals = result.get("signals") or {}
+    for name, _ in EXPORT_COLUMNS:
+        if name.startswith("signal_"):
+            row[name] = signals.get(name[len("signal_"):])
+    return row
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def _parquet_part(key: str, part_number: int) -> str:
+    return f"{key}/part-{part_number:05d}.parquet"
+
+class CsvGzipEncoder:
+    """
+    Encodes one part as a self-contained gzip member. Concatenated
+    members form a valid .csv.gz, so a part never depends on compressor
+    state from the part before it (which is what makes resuming work).
+    """
+
+    def __init__(self, header: bool):
+        self.buffer = io.BytesIO()
+        self.compressor = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+        self.rows = 0
+        if header:
+            self._write([[name for name, _ in EXPORT_COLUMNS]])
+
+    def write(self, results: List[Dict]) -> None:
+        self._write(
+            [_csv_value(row[name]) for name, _ in EXPORT_COLUMNS]
+            for row in map(_flatten, results)
+        )
+        self.rows += len(results)
+
+    def _write(self, rows) -> None:
+        text = io.StringIO()
+        csv.writer(text).writerows(rows)
+        self.buffer.write(self.compressor.compress(text.getvalue().encode()))
+
+    @property
+    def full(self) -> bool:
+        return self.buffer.tell() >= EXPORT_PART_SIZE
+
+    def finish(self) -> bytes:
+        self.buffer.write(self.compressor.flush())
+        return self.buffer.getvalue()
+
+class ParquetEncoder:
+    """Encodes one part as a standalone Parquet file of up to EXPORT_PARQUET_ROWS rows."""
+
+    def __init__(self, header: bool = True):
+        self.schema = pyarrow.schema(
+            [(name, getattr(pyarrow, type_name)()) for name, type_name in EXPORT_COLUMNS]
+        )
+        self.batches: List = []
+        self.rows = 0
+
+    def write(self, results: List[Dict]) -> None:
+        self.batches.append(
+            pyarrow.RecordBatch.from_pylist([_flatten(r) for r in results], schema=self.schema)
+        )
+        self.rows += len(results)
+
+    @property
+    def full(self) -> bool:
+        return self.rows >= EXPORT_PARQUET_ROWS
+
+    def finish(self) -> bytes:
+        buffer = io.BytesIO()
+        table = pyarrow.Table.from_batches(self.batches, schema=self.schema)
+        pyarrow.parquet.write_table(table, buffer, compression="zstd")
+        return buffer.getvalue()
+
+class LocalFileSink:
+    """
+    Exports on the local filesystem under EXPORT_LOCAL_DIR. Multipart
+    parts are staged as files and joined on complete, mirroring S3.
+    """
+
+    def __init__(self, root: str = EXPORT_LOCAL_DIR):
+        self.root = os.path.abspath(root)
+
+    def path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Export key outside sink root: {key}")
+        return path
+
+    def _staging(self, upload_id: str) -> str:
+        return os.path.join(self.root, ".uploads", upload_id)
+
+    async def begin(self, key: str) -> str:
+        upload_id = uuid.uuid4().hex
+        await asyncio.to_thread(os.makedirs, self._staging(upload_id), exist_ok=True)
+        return upload_id
+
+    async def put_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        path = os.path.join(self._staging(upload_id), f"{part_number:05d}")
+        await asyncio.to_thread(self._write_file, path, data)
+        return hashlib.md5(data).hexdigest()
+
+    async def complete(self, key: str, upload_id: str, parts: List[Dict]) -> None:
+        await asyncio.to_thread(self._join, key, upload_id, parts)
+
+    async def abort(self, key: str, upload_id: str) -> None:
+        await asyncio.to_thread(shutil.rmtree, self._staging(upload_id), True)
+
+    async def put(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write_file, self.path(key), data)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._remove_file, self.path(key))
+
+    def url(self, key: str) -> str:
+        return f"/exports/{key}"
+
+    def _join(self, key: str, upload_id: str, parts: List[Dict]) -> None:
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        staging = self._staging(upload_id)
+        with open(f"{target}.tmp", "wb") as out:
+            for part in sorted(parts, key=lambda p: p["part_number"]):
+                with open(os.path.join(staging, f"{part['part_number']:05d}"), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(f"{target}.tmp", target)
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def _write_file(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+
+    def _remove_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class S3Sink:
+    """
+    S3-compatible object storage (AWS S3, or MinIO via EXPORT_S3_ENDPOINT)
+    using multipart uploads. Downloads are presigned GET URLs.
+    """
+
+    def __init__(
+        self,
+        bucket: str = EXPORT_S3_BUCKET,
+        prefix: str = EXPORT_S3_PREFIX,
+        endpoint_url: Optional[str] = EXPORT_S3_ENDPOINT,
+    ):
+        if boto3 is None:
+            raise RuntimeError("EXPORT_SINK=s3 requires boto3")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    async def begin(self, key: str) -> str:
+        response = await asyncio.to_thread(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=self.prefix + key
+        )
+        return response["UploadId"]
+
+    async def put_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        response = await asyncio.to_thread(
+            self.client.upload_part, Bucket=self.bucket, Key=self.prefix + key,
+            UploadId=upload_id, PartNumber=part_number, Body=data,
+        )
+        return response["ETag"]
+
+    async def complete(self, key: str, upload_id: str, parts: List[Dict]) -> None:
+        await asyncio.to_thread(
+            self.client.complete_multipart_upload, Bucket=self.bucket, Key=self.prefix + key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": [
+                {"PartNumber": p["part_number"], "ETag": p["etag"]}
+                for p in sorted(parts, key=lambda p: p["part_number"])
+            ]},
+        )
+
+    async def abort(self, key: str, upload_id: str) -> None:
+        await asyncio.to_thread(
+            self.client.abort_multipart_upload, Bucket=self.bucket, Key=self.prefix + key,
+            UploadId=upload_id,
+        )
+
+    async def put(self, key: str, data: bytes) -> None:
+        await asyncio.to_thread(
+            self.client.put_object, Bucket=self.bucket, Key=self.prefix + key, Body=data
+        )
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(
+            self.client.delete_object, Bucket=self.bucket, Key=self.prefix + key
+        )
+
+    def url(self, key: str) -> str:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self.prefix + key},
+            ExpiresIn=EXPORT_URL_TTL,
+        )
+
+class ResultExporter:
+    """
+    Streams job results to compressed files on a sink as they arrive.
+
+    Results are read from the job's Redis list EXPORT_CHUNK_ROWS at a
+    time and encoded into the current part; full parts are uploaded and
+    recorded in a manifest (export:<job_id>). Memory per job is one part.
+    After a restart, pump() resumes from the rows of the last committed
+    part. CSV parts are multipart-upload parts of one .csv.gz object;
+    Parquet parts are separate files under <key>/.
+    """
+
+    def __init__(self, sink=None):
+        self.r = redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True
+        )
+        self._sink = sink
+        self.parts_open: Dict[str, object] = {}  # job_id -> encoder of its current part
+        self.offsets: Dict[str, int] = {}  # job_id -> results read so far
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def sink(self):
+        if self._sink is None:
+            self._sink = S3Sink() if EXPORT_SINK == "s3" else LocalFileSink()
+        return self._sink
+
+    def supports(self, fmt: str) -> bool:
+        return fmt == "csv" or (fmt == "parquet" and pyarrow is not None)
+
+    def create(self, job_id: str, customer_id: str, fmt: str) -> None:
+        """Start an export for a job; no-op if one exists."""
+        if not self.supports(fmt):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        key = f"export:{job_id}"
+        created = self.r.hsetnx(key, "format", fmt)
+        if not created:
+            return
+        pipe = self.r.pipeline()
+        pipe.hset(key, mapping={
+            "customer_id": customer_id,
+            "status": "pending",
+            "key": f"{customer_id}/{job_id}/{EXPORT_FILES[fmt]}",
+            "upload_id": "",
+            "rows": 0,
+            "parts": "[]",
+            "created_at": time.time(),
+        })
+        pipe.expire(key, JOB_TTL)
+        pipe.execute()
+
+    async def pump(self, job_id: str) -> None:
+        """Encode and upload results that arrived since the last call; finish when the job is done."""
+        lock = self.locks.setdefault(job_id, asyncio.Lock())
+        async with lock:
+            try:
+                await self._pump(job_id)
+            except Exception as e:
+                # Keep the manifest; the next pump resumes after the last committed part
+                logger.error(f"Export for job {job_id} interrupted: {e}")
+                self._forget(job_id)
+
+    async def _pump(self, job_id: str) -> None:
+        key = f"export:{job_id}"
+        manifest = self.r.hgetall(key)
+        if not manifest or manifest["status"] != "pending":
+            self._forget(job_id)
+            return
+
+        parts = json.loads(manifest["parts"])
+        if job_id not in self.offsets:
+            # First pump in this process (or a resume): restart after the last committed part
+            self.offsets[job_id] = int(manifest["rows"])
+            self.parts_open[job_id] = self._encoder(manifest["format"], header=not parts)
+
+        results_key = f"job:{job_id}:results"
+        while True:
+            offset = self.offsets[job_id]
+            batch = self.r.lrange(results_key, offset, offset + EXPORT_CHUNK_ROWS - 1)
+            if not batch:
+                break
+            encoder = self.parts_open[job_id]
+            # Encoding and compression are CPU-bound: keep them off the event loop
+            await asyncio.to_thread(encoder.write, [json.loads(r) for r in batch])
+            self.offsets[job_id] = offset + len(batch)
+            if encoder.full:
+                await self._upload_part(job_id, manifest, parts)
+
+        job_status = self.r.hget(f"job:{job_id}", "status")
+        if job_status == "failed":
+            await self._fail(job_id, "job failed")
+        elif job_status == "done":
+            encoder = self.parts_open[job_id]
+            if encoder.rows or not parts:
+                await self._upload_part(job_id, manifest, parts)
+            if manifest["format"] == "csv":
+                await self.sink.complete(manifest["key"], manifest["upload_id"], parts)
+            self.r.hset(key, mapping={"status": "done", "finished_at": time.time()})
+            self._forget(job_id)
+
+    async def _upload_part(self, job_id: str, manifest: Dict, parts: List[Dict]) -> None:
+        encoder = self.parts_open[job_id]
+        data = await asyncio.to_thread(encoder.finish)
+        part_number = len(parts) + 1
+        if manifest["format"] == "csv":
+            if not manifest["upload_id"]:
+                manifest["upload_id"] = await self.sink.begin(manifest["key"])
+            etag = await self.sink.put_part(manifest["key"], manifest["upload_id"], part_number, data)
+        else:
+            etag = None
+            await self.sink.put(_parquet_part(manifest["key"], part_number), data)
+
+        parts.append({"part_number": part_number, "etag": etag, "rows": encoder.rows, "bytes": len(data)})
+        manifest["rows"] = int(manifest["rows"]) + encoder.rows
+        self.r.hset(f"export:{job_id}", mapping={
+            "upload_id": manifest["upload_id"],
+            "rows": manifest["rows"],
+            "parts": json.dumps(parts),
+        })
+        self.parts_open[job_id] = self._encoder(manifest["format"], header=False)
+
+    async def _fail(self, job_id: str, reason: str) -> None:
+        key = f"export:{job_id}"
+        manifest = self.r.hgetall(key)
+        try:
+            if manifest.get("upload_id"):
+                await self.sink.abort(manifest["key"], manifest["upload_id"])
+            elif manifest.get("format") == "parquet":
+                # Parquet parts are standalone files: remove the ones already written
+                for part in json.loads(manifest["parts"]):
+                    await self.sink.delete(_parquet_part(manifest["key"], part["part_number"]))
+        except Exception as e:
+            logger.warning(f"Export cleanup for job {job_id} failed: {e}")
+        self.r.hset(key, mapping={"status": "failed", "error": reason})
+        self._forget(job_id)
+
+    def _forget(self, job_id: str) -> None:
+        self.parts_open.pop(job_id, None)
+        self.offsets.pop(job_id, None)
+        self.locks.pop(job_id, None)
+
+    def _encoder(self, fmt: str, header: bool):
+        return CsvGzipEncoder(header) if fmt == "csv" else ParquetEncoder(header)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Export status, with download URLs once done."""
+        manifest = self.r.hgetall(f"export:{job_id}")
+        if not manifest:
+            return None
+        parts = json.loads(manifest["parts"])
+        status = {
+            "job_id": job_id,
+            "customer_id": manifest["customer_id"],
+            "format": manifest["format"],
+            "status": manifest["status"],
+            "rows": int(manifest["rows"]),
+            "bytes": sum(p["bytes"] for p in parts),
+            "parts": len(parts),
+            "error": manifest.get("error"),
+            "files": [],
+        }
+        if manifest["status"] == "done":
+            if manifest["format"] == "csv":
+                status["files"] = [self.sink.url(manifest["key"])]
+            else:
+                status["files"] = [
+                    self.sink.url(_parquet_part(manifest["key"], p["part_number"]))
+                    for p in parts
+                ]
+        return status
+
+result_exporter = ResultExporter()
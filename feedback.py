@@ -0,0 +1,151 @@
+import argparse
+import csv
+import json
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, Optional
+from ..config import FEEDBACK_FLUSH_EVENTS
+from ..protection.reputation import reputation
+from ..protection.ip_health import ip_health
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("bounce", "false_positive")
+FORMATS = ("jsonl", "csv", "dsn", "postfix")
+
+_POSTFIX_BOUNCE = re.compile(r"\bto=<([^>@\s]+@[^>\s]+)>.*\bstatus=bounced\b")
+_DSN_FIELD = re.compile(r"^([A-Za-z-]+):\s*(.*)$")
+
+class FeedbackAggregator:
+    """
+    Aggregates bounce / false positive events in memory and flushes them
+    to ReputationMonitor and IPHealthMonitor as pipelined batches, so
+    ingestion costs a few Redis round trips per batch instead of two per
+    event.
+    """
+
+    def __init__(self, flush_every: int = FEEDBACK_FLUSH_EVENTS):
+        self.flush_every = flush_every
+        self.bounces: Counter = Counter()
+        self.false_positives: Counter = Counter()
+        self.ip_bounces: Counter = Counter()
+        self.buffered = 0
+        self.totals = Counter()
+
+    def add(self, event_type: str, domain: str, ip: Optional[str] = None) -> None:
+        domain = domain.lower()
+        if event_type == "bounce":
+            self.bounces[domain] += 1
+            if ip:
+                self.ip_bounces[(ip, domain)] += 1
+        elif event_type == "false_positive":
+            self.false_positives[domain] += 1
+        else:
+            self.totals["skipped"] += 1
+            return
+
+        self.totals[event_type] += 1
+        self.buffered += 1
+        if self.buffered >= self.flush_every:
+            self.flush()
+
+    def add_events(self, events: Iterable[Dict]) -> None:
+        for event in events:
+            domain = event.get("domain") or (event.get("email") or "").rpartition("@")[2]
+            if not domain:
+                self.totals["skipped"] += 1
+                continue
+            self.add(event.get("type", "bounce"), domain, event.get("ip"))
+
+    def flush(self) -> None:
+        """Write buffered counts to Redis in pipelined batches."""
+        if not self.buffered:
+            return
+
+        degraded = reputation.record_feedback_bulk(self.bounces, self.false_positives)
+        blocked = ip_health.mark_bounces_bulk(self.ip_bounces) if self.ip_bounces else []
+
+        self.totals["flushes"] += 1
+        self.totals["domains_degraded"] += len(degraded)
+        self.totals["ips_blocked"] += len(blocked)
+        self.bounces.clear()
+        self.false_positives.clear()
+        self.ip_bounces.clear()
+        self.buffered = 0
+
+    def summary(self) -> Dict:
+        return dict(self.totals)
+
+def iter_events(lines: Iterable[str], fmt: str) -> Iterator[Dict]:
+    """Parse a stream of lines into feedback events without loading it whole."""
+    if fmt == "jsonl":
+        for line in lines:
+            line = line.strip()
+            if line:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                if isinstance(event, dict):
+                    yield event
+                else:
+                    logger.debug(f"Skipping malformed feedback line: {line[:80]}")
+    elif fmt == "csv":
+        # Header row with any of: type, email, domain, ip
+        yield from csv.DictReader(lines)
+    elif fmt == "postfix":
+        for line in lines:
+            match = _POSTFIX_BOUNCE.search(line)
+            if match:
+                yield {"type": "bounce", "email": match.group(1)}
+    elif fmt == "dsn":
+        yield from _iter_dsn(lines)
+    else:
+        raise ValueError(f"Unknown feedback format: {fmt}")
+
+def _iter_dsn(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    RFC 3464 delivery status notifications: one bounce per recipient
+    block with Action: failed and a permanent (5.x.x) Status.
+    """
+    fields: Dict[str, str] = {}
+    for line in lines:
+        line = line.rstrip("\r\n")
+        match = _DSN_FIELD.match(line)
+        if match:
+            fields[match.group(1).lower()] = match.group(2).strip()
+            continue
+        if not line.strip():
+            event = _dsn_event(fields)
+            if event:
+                yield event
+            fields = {}
+    event = _dsn_event(fields)
+    if event:
+        yield event
+
+def _dsn_event(fields: Dict[str, str]) -> Optional[Dict]:
+    recipient = fields.get("final-recipient") or fields.get("original-recipient")
+    if not recipient or fields.get("action", "").lower() != "failed":
+        return None
+    if not fields.get("status", "5").startswith("5"):
+        return None
+    # "rfc822; user@example.com"
+    email = recipient.rpartition(";")[2].strip().strip("<>")
+    return {"type": "bounce", "email": email}
+
+def import_file(path: str, fmt: str) -> Dict:
+    """Stream a bounce log / DSN file into reputation tracking."""
+    aggregator = FeedbackAggregator()
+    with open(path, errors="replace", newline="") as f:
+        aggregator.add_events(iter_events(f, fmt))
+    aggregator.flush()
+    return aggregator.summary()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import bounce feedback into reputation tracking")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    args = parser.parse_args()
+    print(json.dumps(import_file(args.path, args.format)))
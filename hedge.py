@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+async def hedge(
+    primary: "asyncio.Future",
+    start_backup: Callable[[], Awaitable],
+    delay: float,
+    primary_usable: Callable[[Any], bool],
+    backup_usable: Callable[[Any], bool],
+    started: Optional["asyncio.Future"] = None,
+) -> Tuple[str, Any]:
+    """
+    Hedged request: give `primary` `delay` seconds, then start the backup
+    and take whichever usable result arrives first. With `started`, the
+    delay counts from when it resolves, so time the primary spends queued
+    (rate limits, connection slots) never triggers the backup.
+
+    An unusable primary result starts the backup immediately. Returns
+    ("primary" | "backup", result); when neither is usable the backup's
+    result is returned. The primary future is never cancelled (it may be
+    shared), the backup is cancelled if the primary wins.
+    """
+    if started is not None:
+        await asyncio.wait({primary, started}, return_when=asyncio.FIRST_COMPLETED)
+    done, _ = await asyncio.wait({primary}, timeout=delay)
+    if done and _safe_result(primary, primary_usable):
+        return "primary", primary.result()
+
+    backup = asyncio.ensure_future(start_backup())
+    waiting = {backup} if done else {primary, backup}
+
+    try:
+        while waiting:
+            done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if primary in done and _safe_result(primary, primary_usable):
+                backup.cancel()
+                return "primary", primary.result()
+            if backup in done and _safe_result(backup, backup_usable):
+                return "backup", backup.result()
+    finally:
+        if not backup.done():
+            backup.cancel()
+
+    return "backup", backup.result()
+
+def _safe_result(future: "asyncio.Future", usable: Callable[[Any], bool]) -> bool:
+    """True when the future finished without error and its result is usable."""
+    if future.cancelled() or future.exception() is not None:
+        return False
+    return usable(future.result())
@@ -1,6 +1,7 @@
 import redis
 from ..config import REDIS_HOST, REDIS_PORT, REDIS_DB
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from ..core.tracing import traced
 
 class IPHealthMonitor:
     """
@@ -15,6 +16,7 @@ class IPHealthMonitor:
             decode_responses=True
         )
 
+    @traced("redis.ip_health.mark_bounce")
     def mark_bounce(self, ip: str, domain: str) -> None:
         """Record a bounce from this IP to domain."""
         key = f"ip:bounces:{ip}:{domain}"
@@ -24,20 +26,47 @@ class IPHealthMonitor:
         if count >= 5:
             self.block_ip(ip, domain, "too_many_bounces")
 
+    @traced("redis.ip_health.mark_bounces_bulk")
+    def mark_bounces_bulk(self, counts: Dict[Tuple[str, str], int]) -> List[Tuple[str, str]]:
+        """
+        Apply aggregated (ip, domain) bounce counts in one pipeline.
+        Returns the (ip, domain) pairs blocked by this batch.
+        """
+        keys = list(counts)
+        pipe = self.r.pipeline(transaction=False)
+        for ip, domain in keys:
+            key = f"ip:bounces:{ip}:{domain}"
+            pipe.incrby(key, counts[(ip, domain)])
+            pipe.expire(key, 3600)
+        totals = pipe.execute()[::2]
+
+        blocked = [k for k, total in zip(keys, totals) if total >= 5]
+        if blocked:
+            pipe = self.r.pipeline(transaction=False)
+            for ip, domain in blocked:
+                pipe.setex(f"ip:blocked:{ip}:{domain}", 3600, "too_many_bounces")
+            pipe.execute()
+
+        return blocked
+
+    @traced("redis.ip_health.mark_blacklist")
     def mark_blacklist(self, ip: str, domain: str) -> None:
         """Record blacklist hit."""
         self.block_ip(ip, domain, "blacklist")
 
+    @traced("redis.ip_health.block")
     def block_ip(self, ip: str, domain: str, reason: str) -> None:
         """Block IP from accessing domain."""
         key = f"ip:blocked:{ip}:{domain}"
         self.r.setex(key, 3600, reason)
 
+    @traced("redis.ip_health.is_blocked")
     def is_blocked(self, ip: str, domain: str) -> bool:
         """Check if IP is blocked."""
         key = f"ip:blocked:{ip}:{domain}"
         return self.r.exists(key) > 0
 
+    @traced("redis.ip_health.get")
     def get_health(self, ip: str, domain: str) -> Dict:
         """Get health status of IP."""
         bounces = int(self.r.get(f"ip:bounces:{ip}:{domain}") or 0)
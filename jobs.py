@@ -0,0 +1,85 @@
+import json
+import time
+import uuid
+import redis
+from typing import Dict, List, Optional
+from ..config import REDIS_HOST, REDIS_PORT, REDIS_DB, JOB_TTL
+
+class JobStore:
+    """
+    Redis-backed store for verification work finished after the HTTP
+    response (deadline-queued probes, callback-mode requests). Results
+    are appended as they complete and polled via GET /jobs/{job_id}.
+    """
+
+    def __init__(self):
+        self.r = redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True
+        )
+
+    def create(self, customer_id: str, total: int, callback_url: Optional[str] = None) -> str:
+        """Create a job expecting `total` results."""
+        job_id = uuid.uuid4().hex
+        key = f"job:{job_id}"
+        pipe = self.r.pipeline()
+        pipe.hset(key, mapping={
+            "customer_id": customer_id,
+            "status": "pending",
+            "total": total,
+            "completed": 0,
+            "callback_url": callback_url or "",
+            "created_at": time.time(),
+        })
+        pipe.expire(key, JOB_TTL)
+        pipe.execute()
+        return job_id
+
+    def append_results(self, job_id: str, results: List[Dict]) -> None:
+        """Append finished results and mark the job done when complete."""
+        if not results:
+            return
+        key = f"job:{job_id}"
+        results_key = f"{key}:results"
+        pipe = self.r.pipeline()
+        pipe.rpush(results_key, *[json.dumps(r) for r in results])
+        pipe.expire(results_key, JOB_TTL)
+        pipe.hincrby(key, "completed", len(results))
+        pipe.hget(key, "total")
+        _, _, completed, total = pipe.execute()
+
+        if total is not None and completed >= int(total):
+            self.r.hset(key, mapping={"status": "done", "finished_at": time.time()})
+
+    def customer_of(self, job_id: str) -> Optional[str]:
+        """Owning customer, or None if the job does not exist."""
+        return self.r.hget(f"job:{job_id}", "customer_id")
+
+    def fail(self, job_id: str, reason: str) -> None:
+        self.r.hset(f"job:{job_id}", mapping={"status": "failed", "error": reason})
+
+    def get(self, job_id: str, offset: int = 0) -> Optional[Dict]:
+        """Get job status and results from `offset` on."""
+        key = f"job:{job_id}"
+        pipe = self.r.pipeline()
+        pipe.hgetall(key)
+        pipe.lrange(f"{key}:results", offset, -1)
+        meta, results = pipe.execute()
+
+        if not meta:
+            return None
+
+        return {
+            "job_id": job_id,
+            "customer_id": meta["customer_id"],
+            "status": meta["status"],
+            "total": int(meta["total"]),
+            "completed": int(meta["completed"]),
+            "callback_url": meta.get("callback_url") or None,
+            "error": meta.get("error"),
+            "results": [json.loads(r) for r in results],
+        }
+
+job_store = JobStore()
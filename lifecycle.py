@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import signal
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+from ..config import (
+    OMKAR_URL, WARMUP_DOMAINS, WARMUP_FIELDS, WARMUP_TIMEOUT, DRAIN_TIMEOUT
+)
+from ..core.domain_cache import domain_cache
+from ..core.jobs import job_store
+from ..core.omkar import omkar_client
+from ..core.sharding import shard_router
+from ..core.prefilter import prefilter
+from ..core.webhooks import webhook_dispatcher
+from ..protection.domain_quota import quota_manager
+from ..protection.ip_health import ip_health
+from ..protection.reputation import reputation
+from ..protection.scheduler import probe_scheduler
+from ..protection.usage import usage_meter
+from ..signals.banner import fingerprinter
+from ..signals.provider import provider_caps
+
+logger = logging.getLogger(__name__)
+
+STARTING = "starting"
+READY = "ready"
+DRAINING = "draining"
+
+class Lifecycle:
+    """
+    Startup warm-up and shutdown draining for the API process.
+
+    Startup opens Redis and HTTP pools, prefetches DNS facts for the top
+    domains into domain_cache and reports what was loaded. Readiness
+    (GET /ready) flips to draining on SIGTERM so the load balancer stops
+    routing here while in-flight probes finish, up to DRAIN_TIMEOUT.
+    """
+
+    def __init__(self):
+        self.state = STARTING
+        self.warmup: Dict = {}
+        self.warmup_domains = WARMUP_DOMAINS or [d for d in provider_caps.CAPS if d != "default"]
+        self.redis_clients = {
+            "quota": quota_manager.r,
+            "reputation": reputation.r,
+            "ip_health": ip_health.r,
+            "jobs": job_store.r,
+            "webhooks": webhook_dispatcher.r,
+            "shards": shard_router.r,
+            "usage": usage_meter.r,
+        }
+
+    @property
+    def draining(self) -> bool:
+        return self.state == DRAINING
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        self._install_sigterm_hook()
+        await self.start()
+        try:
+            yield
+        finally:
+            await self.stop()
+
+    async def start(self) -> None:
+        started = time.time()
+        redis_ok = await self.ping_redis()
+        await self._warm_http()
+        prefetched = await self._prefetch_domains()
+        webhook_dispatcher.start()
+        shard_router.start()
+        usage_meter.start()
+
+        self.warmup = {
+            "redis": redis_ok,
+            "domains_prefetched": prefetched,
+            "fingerprints": len(fingerprinter.fingerprints),
+            "disposable_domains": len(prefilter.disposable),
+            "warmup_ms": int((time.time() - started) * 1000),
+        }
+        self.state = READY
+        logger.info(f"Warm-up complete: {self.warmup}")
+
+    async def stop(self) -> None:
+        self.state = DRAINING
+        await shard_router.stop()
+        drained = await self.drain(DRAIN_TIMEOUT)
+        if not drained:
+            logger.warning(
+                f"Drain timed out with {probe_scheduler.in_flight} probes in flight, "
+                f"{probe_scheduler.depth} queued"
+            )
+        await webhook_dispatcher.stop()
+        await usage_meter.stop()
+        await omkar_client.close()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait for queued (including domain-parked) and in-flight probes to finish. False on timeout."""
+        deadline = time.monotonic() + timeout
+        while probe_scheduler.in_flight or probe_scheduler.depth:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.1)
+        return True
+
+    async def ping_redis(self) -> Dict[str, bool]:
+        """Ping every Redis client, which also opens its first pooled connection."""
+        async def ping(name, client):
+            try:
+                return await asyncio.to_thread(client.ping)
+            except Exception as e:
+                logger.error(f"Redis ping failed for {name}: {e}")
+                return False
+
+        results = await asyncio.gather(
+            *(ping(name, client) for name, client in self.redis_clients.items())
+        )
+        return dict(zip(self.redis_clients, results))
+
+    async def readiness(self) -> Dict:
+        """Readiness for the load balancer; Redis is re-checked each time."""
+        if self.state != READY:
+            return {"ready": False, "status": self.state}
+        redis_ok = await self.ping_redis()
+        return {
+            "ready": all(redis_ok.values()),
+            "status": self.state,
+            "redis": redis_ok,
+            "scheduler": probe_scheduler.stats(),
+            "warmup": self.warmup,
+        }
+
+    async def _warm_http(self) -> None:
+        # Open the TLS connection to Omkar now rather than on the first lookup
+        try:
+            await omkar_client._get_session().head(OMKAR_URL, timeout=WARMUP_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Omkar warm-up failed: {e}")
+        webhook_dispatcher._get_client()
+
+    async def _prefetch_domains(self) -> int:
+        async def prefetch(domain):
+            for field in WARMUP_FIELDS:
+                await domain_cache.get(domain, field)
+
+        tasks = [asyncio.ensure_future(prefetch(domain)) for domain in self.warmup_domains]
+        if not tasks:
+            return 0
+        done, not_done = await asyncio.wait(tasks, timeout=WARMUP_TIMEOUT)
+        for task in not_done:
+            task.cancel()
+        return sum(1 for task in done if task.exception() is None)
+
+    def _install_sigterm_hook(self) -> None:
+        """
+        Mark the process draining as soon as SIGTERM arrives, then hand
+        the signal on to the server's own handler (which stops accepting
+        connections and finishes open requests before shutdown runs).
+        """
+        try:
+            previous = signal.getsignal(signal.SIGTERM)
+
+            def on_sigterm(signum, frame):
+                self.state = DRAINING
+                if callable(previous):
+                    previous(signum, frame)
+                elif previous == signal.SIG_DFL:
+                    raise SystemExit(128 + signum)
+
+            signal.signal(signal.SIGTERM, on_sigterm)
+        except ValueError:
+            # Not in the main thread (e.g. embedded in a test client)
+            pass
+
+lifecycle = Lifecycle()
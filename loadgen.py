@@ -0,0 +1,499 @@
+"""
+Load generator for sizing Redis, workers and IP pools.
+
+Runs the API in-process (uvicorn, real lifespan) against local stand-ins
+for SMTP (asyncio servers on 127.0.0.x), Omkar (httpx.MockTransport) and
+DNS (facts seeded into domain_cache), then drives /verify or the job API
+at stepped open-loop request rates. Redis is the real one from config;
+point REDIS_DB at a scratch database.
+
+    python -m app.loadgen --rates 5,10,20,40 --step-seconds 30
+    python -m app.loadgen --profile profile.json --api job --out run.json
+    python -m app.loadgen --replay requests.jsonl --speed 2 --baseline run.json
+
+Requests are generated from a fixed seed and the report carries a hash
+of the profile and run parameters, so two reports with the same hash
+compare like for like.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+
+from .main import app, ERROR_REASONS
+from .core.domain_cache import domain_cache
+from .core.lifecycle import lifecycle
+from .core.omkar import omkar_client
+from .core.probe_engine import probe_engine
+from .core.webhooks import webhook_dispatcher
+from .protection.domain_quota import quota_manager
+
+DEFAULT_PROFILE = {
+    # Share of addresses per customer / domain (Gmail-heavy, long tail of corporate)
+    "customers": {"cust_bulk": 0.7, "cust_app": 0.3},
+    "domains": {
+        "gmail.com": 0.35,
+        "yahoo.com": 0.08,
+        "outlook.com": 0.08,
+        "hotmail.com": 0.05,
+        "corp-a.example": 0.12,
+        "corp-b.example": 0.12,
+        "corp-c.example": 0.1,
+        "corp-d.example": 0.1,
+    },
+    # Domains whose MX accepts every RCPT (Omkar reports catch_all)
+    "catch_all_domains": ["corp-b.example", "corp-c.example"],
+    "valid_ratio": 0.7,
+    "batch_size": [1, 20],
+    # Lognormal SMTP reply latency per RCPT, with per-domain overrides
+    "smtp_latency_ms": {"median": 150, "sigma": 0.6},
+    "domain_smtp_latency_ms": {"gmail.com": {"median": 60, "sigma": 0.3}},
+    # Real mailboxes on catch-all MXes answer this much slower than fakes
+    "valid_rcpt_factor": 1.3,
+    "omkar_latency_ms": {"median": 250, "sigma": 0.5},
+    "omkar_error_ratio": 0.01,
+    # Extra /verify fields sent with every request
+    "request": {"mode": "hybrid"},
+}
+
+# ============ STAND-INS ============
+
+def _latency(rng: random.Random, dist: Dict) -> float:
+    """Seconds, from a lognormal with the given median (ms) and sigma."""
+    return rng.lognormvariate(math.log(dist["median"]), dist["sigma"]) / 1000
+
+def _is_valid_local(local: str) -> bool:
+    # Generated valid mailboxes start with "u", invalid ones with "x"
+    return local.startswith("u")
+
+class SMTPStandIn:
+    """Minimal ESMTP servers on loopback addresses with PIPELINING and profile latencies."""
+
+    def __init__(self, profile: Dict, seed: int):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.catch_all = set(profile["catch_all_domains"])
+        self.servers: List[asyncio.AbstractServer] = []
+        self.port = 0
+        self.hosts: Dict[str, str] = {}
+
+    async def start(self, domains: List[str]) -> None:
+        for i, domain in enumerate(domains):
+            # One loopback address per domain keeps per-MX caches apart;
+            # falls back to a shared 127.0.0.1 where aliases are unavailable
+            host = f"127.0.0.{2 + i}" if i < 250 else self.hosts[domains[i % 250]]
+            if host not in self.hosts.values():
+                try:
+                    await self._listen(host, domain)
+                except OSError:
+                    host = "127.0.0.1"
+                    if host not in self.hosts.values():
+                        await self._listen(host, domain)
+            self.hosts[domain] = host
+
+    async def _listen(self, host: str, domain: str) -> None:
+        server = await asyncio.start_server(
+            lambda r, w: self._session(domain, r, w), host=host, port=self.port
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self.servers.append(server)
+
+    async def stop(self) -> None:
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+
+    async def _session(self, domain: str, reader, writer) -> None:
+        writer.write(f"220 mx.{domain} ESMTP Postfix\r\n".encode())
+        try:
+            while True:
+                line = (await reader.readline()).decode(errors="replace").strip()
+                if not line:
+                    break
+                verb = line.split(" ", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    writer.write(
+                        f"250-mx.{domain}\r\n250-PIPELINING\r\n250-SIZE 10240000\r\n"
+                        "250-ENHANCEDSTATUSCODES\r\n250 8BITMIME\r\n".encode()
+                    )
+                elif verb == "MAIL":
+                    writer.write(b"250 2.1.0 Ok\r\n")
+                elif verb == "RSET":
+                    writer.write(b"250 2.0.0 Ok\r\n")
+                elif verb == "RCPT":
+                    await writer.drain()
+                    address = line.partition("<")[2].rstrip(">")
+                    local, _, rcpt_domain = address.partition("@")
+                    dist = self.profile["domain_smtp_latency_ms"].get(
+                        rcpt_domain, self.profile["smtp_latency_ms"]
+                    )
+                    delay = _latency(self.rng, dist)
+                    if _is_valid_local(local):
+                        delay *= self.profile["valid_rcpt_factor"]
+                    await asyncio.sleep(delay)
+                    if rcpt_domain in self.catch_all or _is_valid_local(local):
+                        writer.write(b"250 2.1.5 Ok\r\n")
+                    else:
+                        writer.write(
+                            f"550 5.1.1 <{address}>: Recipient address rejected: User unknown\r\n".encode()
+                        )
+                elif verb == "QUIT":
+                    writer.write(b"221 2.0.0 Bye\r\n")
+                    break
+                else:
+                    writer.write(b"502 5.5.2 Error: command not recognized\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def _omkar_transport(profile: Dict, seed: int) -> httpx.MockTransport:
+    rng = random.Random(seed)
+    catch_all = set(profile["catch_all_domains"])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return httpx.Response(200)
+        await asyncio.sleep(_latency(rng, profile["omkar_latency_ms"]))
+        if rng.random() < profile["omkar_error_ratio"]:
+            return httpx.Response(503)
+        local, _, domain = request.url.params.get("email", "").partition("@")
+        if domain in catch_all:
+            body = {"is_valid": None, "status": "catch_all", "catch_all": True, "reason": "catch_all"}
+        elif _is_valid_local(local):
+            body = {"is_valid": True, "status": "valid", "score": 95, "reason": "verified"}
+        else:
+            body = {"is_valid": False, "status": "invalid", "score": 5, "reason": "mailbox_not_found"}
+        return httpx.Response(200, json=body)
+
+    return httpx.MockTransport(handler)
+
+async def install_stand_ins(profile: Dict, domains: List[str], seed: int) -> SMTPStandIn:
+    """Point the app's SMTP, Omkar, DNS and webhook I/O at local stand-ins."""
+    smtp = SMTPStandIn(profile, seed + 1)
+    await smtp.start(domains)
+    probe_engine.port = smtp.port
+
+    for domain in domains:
+        domain_cache.set(domain, "mx", smtp.hosts[domain])
+        domain_cache.set(domain, "mail_host", True)
+        domain_cache.set(domain, "spf", {"present": True, "strict": True, "text": "v=spf1 -all"})
+
+    omkar_client.session = httpx.AsyncClient(transport=_omkar_transport(profile, seed + 2))
+    webhook_dispatcher.transport = httpx.MockTransport(lambda request: httpx.Response(200))
+    webhook_dispatcher.secret = webhook_dispatcher.secret or "loadgen"
+    webhook_dispatcher.allow_private = True
+    lifecycle.warmup_domains = domains
+    return smtp
+
+# ============ TRAFFIC ============
+
+def _pick(rng: random.Random, weights: Dict[str, float]) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _email(rng: random.Random, domain: str, valid_ratio: float) -> str:
+    prefix = "u" if rng.random() < valid_ratio else "x"
+    return f"{prefix}{rng.randrange(10**9):09d}@{domain}"
+
+def generate_requests(
+    profile: Dict, rng: random.Random, rate: float, seconds: float
+) -> List[Tuple[float, Dict]]:
+    """Open-loop (Poisson) arrivals at `rate` requests/s for `seconds`."""
+    requests = []
+    t = rng.expovariate(rate)
+    while t < seconds:
+        size = rng.randint(*profile["batch_size"])
+        body = dict(
+            profile["request"],
+            customer_id=_pick(rng, profile["customers"]),
+            emails=[
+                _email(rng, _pick(rng, profile["domains"]), profile["valid_ratio"])
+                for _ in range(size)
+            ],
+        )
+        requests.append((t, body))
+        t += rng.expovariate(rate)
+    return requests
+
+def load_replay(
+    path: str, profile: Dict, rng: random.Random, speed: float
+) -> List[Tuple[float, Dict]]:
+    """
+    Captured request log, one JSON object per line:
+    {"t": seconds_from_start, "customer_id": "...", "domains": ["gmail.com", ...]}
+    Anonymised logs keep domains only; local parts are regenerated.
+    Full "emails" lists are used as-is.
+    """
+    requests = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            emails = entry.get("emails") or [
+                _email(rng, domain, profile["valid_ratio"]) for domain in entry["domains"]
+            ]
+            body = dict(
+                profile["request"],
+                customer_id=entry.get("customer_id") or _pick(rng, profile["customers"]),
+                emails=emails,
+            )
+            requests.append((float(entry.get("t", 0)) / speed, body))
+    requests.sort(key=lambda item: item[0])
+    return requests
+
+def reset_quotas(customers: List[str], domains: List[str]) -> None:
+    """Delete hourly quota counters for the run's customers and domains."""
+    keys = [f"quota:global:{d}" for d in domains]
+    keys += [f"quota:cust:{c}:{d}" for c in customers for d in domains]
+    quota_manager.r.delete(*keys)
+
+# ============ DRIVER ============
+
+async def _send(
+    client: httpx.AsyncClient, api: str, body: Dict, timeout: float
+) -> Dict:
+    """One request; returns latency, status, result reasons and backpressure."""
+    start = time.monotonic()
+    if api == "job":
+        body = dict(body, callback_url="http://loadgen.invalid/hook")
+    try:
+        response = await client.post("/verify", json=body, timeout=timeout)
+        data = response.json() if response.status_code == 200 else {}
+        results = data.get("results", [])
+
+        if api == "job" and data.get("job_id"):
+            while time.monotonic() - start < timeout:
+                await asyncio.sleep(0.2)
+                job = (await client.get(f"/jobs/{data['job_id']}", timeout=timeout)).json()
+                if job.get("status") in ("done", "failed"):
+                    results = job.get("results", [])
+                    break
+
+        return {
+            "latency": time.monotonic() - start,
+            "status": response.status_code,
+            "emails": len(body["emails"]),
+            "reasons": [r.get("reason") for r in results],
+            "backpressure": data.get("backpressure") or {},
+        }
+    except httpx.HTTPError as e:
+        return {
+            "latency": time.monotonic() - start,
+            "status": type(e).__name__,
+            "emails": len(body["emails"]),
+            "reasons": [],
+            "backpressure": {},
+        }
+
+async def run_step(
+    client: httpx.AsyncClient,
+    api: str,
+    requests: List[Tuple[float, Dict]],
+    timeout: float,
+) -> Dict:
+    """Fire requests at their arrival offsets and collect outcomes."""
+    started = time.monotonic()
+
+    async def fire(offset: float, body: Dict) -> Dict:
+        await asyncio.sleep(max(0.0, started + offset - time.monotonic()))
+        outcome = await _send(client, api, body, timeout)
+        outcome["finished"] = time.monotonic() - started
+        return outcome
+
+    queue_samples = []
+
+    async def sample_queue():
+        while True:
+            queue_samples.append((await client.get("/scheduler/stats")).json()["queue_depth"])
+            await asyncio.sleep(1.0)
+
+    sampler = asyncio.ensure_future(sample_queue())
+    try:
+        outcomes = await asyncio.gather(*(fire(offset, body) for offset, body in requests))
+    finally:
+        sampler.cancel()
+    return summarize(outcomes, requests, queue_samples)
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def summarize(
+    outcomes: List[Dict], requests: List[Tuple[float, Dict]], queue_samples: List[int]
+) -> Dict:
+    # Rates over inter-arrival / inter-completion spans, so a step's
+    # request latency does not read as lost throughput
+    arrivals = [r[0] for r in requests]
+    finishes = [o["finished"] for o in outcomes]
+    span = (max(arrivals) - min(arrivals)) if len(arrivals) > 1 else 0.0
+    elapsed = (max(finishes) - min(finishes)) if len(finishes) > 1 else 0.0
+    intervals = max(len(outcomes) - 1, 1)
+    latencies = sorted(o["latency"] * 1000 for o in outcomes)
+    reasons = Counter(reason for o in outcomes for reason in o["reasons"])
+    results = sum(reasons.values())
+    http_errors = sum(1 for o in outcomes if o["status"] != 200)
+    waits = [o["backpressure"]["expected_wait_ms"] for o in outcomes if o["backpressure"]]
+
+    return {
+        "requests": len(outcomes),
+        "emails": sum(o["emails"] for o in outcomes),
+        "offered_rps": round(intervals / span, 2) if span else None,
+        "achieved_rps": round(intervals / elapsed, 2) if elapsed else None,
+        "emails_per_s": round(sum(o["emails"] for o in outcomes) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None,
+        },
+        "http_error_rate": round(http_errors / len(outcomes), 4) if outcomes else 0.0,
+        "result_error_rate": round(
+            sum(reasons[r] for r in ERROR_REASONS) / results, 4
+        ) if results else 0.0,
+        "queue_depth": {
+            "max": max(queue_samples, default=0),
+            "mean": round(sum(queue_samples) / len(queue_samples), 1) if queue_samples else 0,
+        },
+        "expected_wait_ms_mean": round(sum(waits) / len(waits), 1) if waits else 0,
+        "reasons": dict(reasons.most_common()),
+    }
+
+def find_saturation(steps: List[Dict], slo_ms: float, max_error_rate: float) -> Dict:
+    """First step that falls behind its offered rate, misses the p99 SLO or errors."""
+    last_ok = None
+    for step in steps:
+        p99 = step["latency_ms"]["p99"] or 0
+        saturated = (
+            (step["achieved_rps"] or 0) < 0.9 * (step["offered_rps"] or 0)
+            or p99 > slo_ms
+            or max(step["http_error_rate"], step["result_error_rate"]) > max_error_rate
+        )
+        if saturated:
+            return {"saturated_at_rps": step["offered_rps"], "last_ok_rps": last_ok}
+        last_ok = step["offered_rps"]
+    return {"saturated_at_rps": None, "last_ok_rps": last_ok}
+
+def profile_hash(profile: Dict, params: Dict) -> str:
+    canonical = json.dumps({"profile": profile, "params": params}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+async def run(args: argparse.Namespace, profile: Dict) -> Dict:
+    rng = random.Random(args.seed)
+    if args.replay:
+        steps_plan = [("replay", load_replay(args.replay, profile, rng, args.speed))]
+    else:
+        steps_plan = [
+            (rate, generate_requests(profile, rng, rate, args.step_seconds))
+            for rate in args.rates
+        ]
+
+    domains = sorted(
+        set(profile["domains"])
+        | {e.rpartition("@")[2] for _, reqs in steps_plan for _, b in reqs for e in b["emails"]}
+    )
+    customers = sorted({b["customer_id"] for _, reqs in steps_plan for _, b in reqs})
+    if args.reset_quotas:
+        reset_quotas(customers, domains)
+
+    smtp = await install_stand_ins(profile, domains, args.seed)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    serve = asyncio.ensure_future(server.serve())
+    while not server.started:
+        if serve.done():
+            serve.result()
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    steps = []
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            for rate, requests in steps_plan:
+                step = await run_step(client, args.api, requests, args.timeout)
+                step["rate"] = rate
+                steps.append(step)
+                print(
+                    f"rate={rate} offered={step['offered_rps']} achieved={step['achieved_rps']} "
+                    f"p99={step['latency_ms']['p99']}ms errors={step['result_error_rate']}",
+                    file=sys.stderr,
+                )
+    finally:
+        server.should_exit = True
+        await serve
+        await smtp.stop()
+
+    params = {
+        "seed": args.seed, "api": args.api, "rates": args.rates, "step_seconds": args.step_seconds,
+        "replay": args.replay, "speed": args.speed,
+    }
+    return {
+        "meta": {
+            "profile_hash": profile_hash(profile, params),
+            "params": params,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "steps": steps,
+        "saturation": find_saturation(steps, args.slo_ms, args.max_error_rate),
+    }
+
+def compare(report: Dict, baseline: Dict) -> None:
+    """Print per-step deltas against a previous report."""
+    if report["meta"]["profile_hash"] != baseline["meta"]["profile_hash"]:
+        print("warning: baseline was produced with a different profile/params", file=sys.stderr)
+    for new, old in zip(report["steps"], baseline["steps"]):
+        print(
+            f"rate={new['rate']} achieved {old['achieved_rps']} -> {new['achieved_rps']} rps, "
+            f"p99 {old['latency_ms']['p99']} -> {new['latency_ms']['p99']} ms, "
+            f"errors {old['result_error_rate']} -> {new['result_error_rate']}",
+            file=sys.stderr,
+        )
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay or generate /verify load against local stand-ins")
+    parser.add_argument("--profile", help="Traffic profile JSON (merged over the default profile)")
+    parser.add_argument("--replay", help="Captured request log (JSONL) to replay instead of --rates")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up factor")
+    parser.add_argument("--rates", default="5,10,20,40", help="Comma-separated request rates (req/s) to step through")
+    parser.add_argument("--step-seconds", type=float, default=30)
+    parser.add_argument("--api", choices=("sync", "job"), default="sync", help="/verify, or callback jobs polled via /jobs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request client timeout (s)")
+    parser.add_argument("--slo-ms", type=float, default=5000, help="p99 latency beyond which a step counts as saturated")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--reset-quotas", action="store_true", help="Clear hourly quota counters for the run's customers/domains first")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+    args.rates = [float(r) for r in args.rates.split(",")]
+
+    profile = dict(DEFAULT_PROFILE)
+    if args.profile:
+        with open(args.profile) as f:
+            profile.update(json.load(f))
+
+    report = asyncio.run(run(args, profile))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,56 @@
+import asyncio
+import math
+import os
+import tempfile
 import time
 import logging
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+import httpx
+from typing import Awaitable, Dict, List, Optional, Tuple
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi.responses import JSONResponse, FileResponse
 
-from .schemas import VerifyRequest, VerifyResponse, VerifyResult, StatusEnum, SourceEnum
-from .core import omkar, probe_engine, scoring
+from .schemas import (
+    VerifyRequest, VerifyResponse, VerifyResult, StatusEnum, SourceEnum, ModeEnum,
+    DeadlineActionEnum, PriorityEnum, ResponseFormatEnum, ExportFormatEnum, BackpressureModel, FeedbackRequest, ShardProbeRequest,
+)
+from .serialization import FastJSONResponse, render_verify_response
+from .core import probe_engine, scoring
+from .core.domain_cache import domain_cache
+from .core.prefilter import prefilter
+from .core.jobs import job_store
+from .core.omkar_dispatcher import omkar_dispatcher
+from .core.hedge import hedge
+from .core.webhooks import webhook_dispatcher
+from .core.lifecycle import lifecycle
+from .core.tracing import tracer
+from .core.sharding import shard_router, TOKEN_HEADER
+from .core.probe_strategy import probe_strategy
+from .core.export import result_exporter, LocalFileSink
 from .protection.breaker import breaker
 from .protection.domain_quota import quota_manager
 from .protection.reputation import reputation
-from .signals.provider import provider_caps
+from .protection.feedback import FeedbackAggregator, FORMATS, import_file
+from .protection.scheduler import probe_scheduler, SchedulerFull
+from .protection.usage import usage_meter
+from .config import WEBHOOK_BATCH_SIZE, SCHEDULER_INTERACTIVE_MAX_EMAILS, SCHEDULER_INTERACTIVE_MAX_REQUESTED
 
 logger = logging.getLogger(__name__)
 
+# Result reasons counted in total_errors
+ERROR_REASONS = {
+    "circuit_breaker_open", "quota_exceeded", "probe_engine_error", "omkar_error",
+    "omkar_unavailable", "probe_capacity_exceeded",
+}
+
+# (customer_id, tier, interactive) a probe is scheduled under
+Lane = Tuple[str, str, bool]
+
 app = FastAPI(
     title="Bounso Email Verification API",
     version="1.0.0",
     description="Production-grade email verification with catch-all detection",
+    lifespan=lifecycle.lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # ============ HEALTH CHECK ============
@@ -23,28 +58,155 @@ app = FastAPI(
 async def health():
     return {"status": "ok", "version": "1.0.0"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness: warm-up finished, Redis reachable and not draining."""
+    readiness = await lifecycle.readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
 # ============ MAIN VERIFY ENDPOINT ============
 @app.post("/verify", response_model=VerifyResponse)
 async def verify_emails(req: VerifyRequest, background_tasks: BackgroundTasks):
     """
     Verify multiple emails with hybrid strategy:
-    1. Try Omkar API (fast, cached)
-    2. For catch-all results, run probe engine
-    3. Apply quotas, reputation, and circuit breaker
+    1. Settle junk locally (syntax, disposable, role, no MX)
+    2. Try Omkar API concurrently (rate-limited), unless mode is probe_only
+    3. For catch-all results, run probe engine, unless mode is omkar_only;
+       in hybrid mode the probe also starts once Omkar exceeds its p95
+    4. Apply quotas, reputation, and circuit breaker
+
+    With deadline_ms set, probes that do not fit the budget return
+    partial results or are queued to /jobs/{job_id} (on_deadline).
+
+    With callback_url set, the request returns a job_id immediately and
+    results are POSTed to the callback in batches (deadline_ms is ignored).
+
+    Probes share capacity fairly across customers (weighted by tier), with
+    small synchronous requests in a priority lane; backpressure reports
+    the probe queue so clients can pace bulk submissions.
     """
     
+    if lifecycle.draining:
+        raise HTTPException(
+            status_code=503, detail={"error": "Server draining", "retry_after": 1}
+        )
+    if req.callback_url and not webhook_dispatcher.secret:
+        raise HTTPException(
+            status_code=503, detail={"error": "Callbacks are disabled: WEBHOOK_SIGNING_SECRET is not set"}
+        )
+    if req.export_format and not result_exporter.supports(req.export_format.value):
+        raise HTTPException(
+            status_code=400, detail={"error": f"Export format {req.export_format.value} is not available"}
+        )
+
     start_time = time.time()
-    results = []
-    errors = 0
 
-    for email in req.emails:
-        domain = email.split("@")[1].lower()
+    # ===== CALLBACK MODE =====
+    if req.callback_url:
+        job_id = job_store.create(
+            req.customer_id, len(req.emails), callback_url=str(req.callback_url)
+        )
+        if req.export_format:
+            result_exporter.create(job_id, req.customer_id, req.export_format.value)
+        background_tasks.add_task(_verify_with_callback, req, job_id)
+        return render_verify_response(VerifyResponse(
+            results=[],
+            total_processed=0,
+            total_errors=0,
+            processing_time_ms=(time.time() - start_time) * 1000,
+            job_id=job_id,
+            pending=len(req.emails),
+            backpressure=probe_scheduler.backpressure(req.customer_id),
+        ), req.response_format == ResponseFormatEnum.COLUMNAR)
+
+    deadline = start_time + req.deadline_ms / 1000 if req.deadline_ms else None
+    lane = _lane(req)
+    with tracer.span(
+        "verify", customer_id=req.customer_id, emails=len(req.emails),
+        mode=req.execution_mode.value, interactive=lane[2],
+    ) as span:
+        results, deferred = await _verify_batch(req, req.emails, deadline, lane)
+
+        # ===== QUEUE PROBES THAT MISSED THE DEADLINE =====
+        job_id = None
+        if deferred:
+            job_id = job_store.create(req.customer_id, len(deferred))
+            if req.export_format:
+                result_exporter.create(job_id, req.customer_id, req.export_format.value)
+            background_tasks.add_task(
+                _complete_deferred, job_id, deferred, (req.customer_id, lane[1], False)
+            )
 
-        # ===== CIRCUIT BREAKER CHECK =====
-        if breaker.is_open(domain):
-            retry_after = breaker.get_time_until_retry(domain)
-            results.append(
-                VerifyResult(
+        total_errors = sum(r.reason in ERROR_REASONS for r in results)
+        span.set(errors=total_errors, deferred=len(deferred))
+
+    processing_time_ms = (time.time() - start_time) * 1000
+    
+    # Results were validated as they were built; construct() skips a second pass
+    response = VerifyResponse.construct(
+        results=results,
+        total_processed=len(req.emails),
+        total_errors=total_errors,
+        processing_time_ms=processing_time_ms,
+        job_id=job_id,
+        pending=len(deferred),
+        backpressure=BackpressureModel(**probe_scheduler.backpressure(req.customer_id, lane[2])),
+        trace_id=span.trace_id,
+    )
+    return render_verify_response(response, req.response_format == ResponseFormatEnum.COLUMNAR)
+
+def _lane(req: VerifyRequest) -> Lane:
+    """Scheduling lane: explicit priority, else interactive for small or deadline-bound requests.
+
+    A requested interactive lane is only honoured for synchronous requests
+    of at most SCHEDULER_INTERACTIVE_MAX_REQUESTED emails, so large batches
+    cannot claim it.
+    """
+    if req.priority is not None:
+        interactive = req.priority == PriorityEnum.INTERACTIVE and not req.callback_url and (
+            len(req.emails) <= SCHEDULER_INTERACTIVE_MAX_REQUESTED
+        )
+    else:
+        interactive = not req.callback_url and (
+            req.deadline_ms is not None or len(req.emails) <= SCHEDULER_INTERACTIVE_MAX_EMAILS
+        )
+    return req.customer_id, quota_manager.get_tier(req.customer_id), interactive
+
+async def _verify_batch(
+    req: VerifyRequest, emails: List[str], deadline: Optional[float], lane: Lane
+) -> Tuple[List[VerifyResult], List[Tuple[str, str]]]:
+    """
+    Run the verification pipeline over emails.
+    Returns results in input order and the (email, domain) probes
+    deferred by the deadline when on_deadline is queue.
+    """
+    results: List[Optional[VerifyResult]] = [None] * len(emails)
+    mode = req.execution_mode
+    deferred: List[Tuple[str, str]] = []
+    pending: List[Tuple[int, str, str]] = []
+
+    with tracer.span("verify.gate", emails=len(emails)) as gate:
+        for i, email in enumerate(emails):
+            domain = email.split("@")[1].lower()
+
+            # ===== PRE-FILTER =====
+            verdict = await prefilter.check(email)
+            if verdict:
+                results[i] = VerifyResult(
+                    email=email,
+                    status=StatusEnum(verdict["status"]),
+                    deliverable=verdict["deliverable"],
+                    confidence=verdict["confidence"],
+                    catch_all=None,
+                    source=SourceEnum.PREFILTER,
+                    reason=verdict["reason"],
+                )
+                continue
+
+            # ===== CIRCUIT BREAKER CHECK =====
+            if breaker.is_open(domain):
+                retry_after = breaker.get_time_until_retry(domain)
+                results[i] = VerifyResult(
                     email=email,
                     status=StatusEnum.RISKY,
                     confidence=0,
@@ -53,16 +215,13 @@ async def verify_emails(req: VerifyRequest, background_tasks: BackgroundTasks):
                     reason="circuit_breaker_open",
                     retry_after=retry_after,
                 )
-            )
-            errors += 1
-            continue
+                continue
 
-        # ===== QUOTA CHECK =====
-        try:
-            quota_manager.check_quota(req.customer_id, domain)
-        except HTTPException as e:
-            results.append(
-                VerifyResult(
+            # ===== QUOTA CHECK =====
+            try:
+                quota_manager.check_quota(req.customer_id, domain, lane[1])
+            except HTTPException as e:
+                results[i] = VerifyResult(
                     email=email,
                     status=StatusEnum.RISKY,
                     confidence=0,
@@ -71,95 +230,379 @@ async def verify_emails(req: VerifyRequest, background_tasks: BackgroundTasks):
                     reason="quota_exceeded",
                     retry_after=e.detail.get("reset_in"),
                 )
+                continue
+
+            pending.append((i, email, domain))
+
+        gate.set(settled=len(emails) - len(pending))
+
+    # ===== OMKAR FAST PATH (concurrent, rate-limited) =====
+    # Skipped while Omkar's own circuit is open; hybrid then probes directly
+    omkar_lookups: Dict[str, Tuple[asyncio.Future, asyncio.Future]] = {}
+    omkar_results: Optional[Dict[str, Dict]] = None
+    if mode == ModeEnum.OMKAR_ONLY:
+        # No probe to hedge with: one bounded wait over the whole batch
+        if omkar_dispatcher.is_healthy():
+            omkar_results = await omkar_dispatcher.verify_many(
+                [email for _, email, _ in pending], timeout=_budget_left(deadline)
             )
-            errors += 1
-            continue
+    elif mode != ModeEnum.PROBE_ONLY and omkar_dispatcher.is_healthy():
+        omkar_lookups = {email: omkar_dispatcher.submit(email) for _, email, _ in pending}
 
-        # ===== OMKAR FAST PATH =====
-        try:
-            omkar_result = await omkar.omkar_client.verify(email)
-            
-            # Not catch-all → return Omkar result
-            if not omkar_result.get("catch_all"):
-                status = StatusEnum.VALID if omkar_result.get("is_valid") else StatusEnum.INVALID
-                confidence = 90 if omkar_result.get("is_valid") else 10
-                
-                results.append(
-                    VerifyResult(
-                        email=email,
-                        status=status,
-                        deliverable=omkar_result.get("is_valid"),
-                        confidence=confidence,
-                        catch_all=False,
-                        source=SourceEnum.OMKAR,
-                        reason=omkar_result.get("reason"),
-                    )
-                )
-                breaker.record_success(domain)
-                continue
-            
-        except Exception as e:
-            logger.error(f"Omkar error for {email}: {e}")
-            breaker.record_failure(domain)
+    async def settle(i: int, email: str, domain: str) -> None:
+        omkar_task, omkar_sent = omkar_lookups.get(email, (None, None))
+        with tracer.span("verify.email", domain=domain) as span:
+            try:
+                if mode == ModeEnum.OMKAR_ONLY:
+                    results[i] = await _omkar_only_result(email, domain, omkar_results)
+                elif omkar_task is None:
+                    # ===== PROBE ENGINE =====
+                    results[i] = await _within_budget(_run_probe(email, domain, lane, deadline), deadline)
+                else:
+                    # ===== OMKAR, HEDGED WITH THE PROBE =====
+                    results[i] = await _within_budget(_hedged(email, domain, omkar_task, omkar_sent, lane, deadline), deadline)
+            except asyncio.TimeoutError:
+                queued = mode != ModeEnum.OMKAR_ONLY and req.on_deadline == DeadlineActionEnum.QUEUE
+                if queued:
+                    deferred.append((email, domain))
+                results[i] = _deadline_result(email, _omkar_catch_all(omkar_task), queued)
+            span.set(source=results[i].source.value, reason=results[i].reason)
 
-        # ===== PROBE ENGINE FOR CATCH-ALL =====
-        try:
-            probe_result = await probe_engine.probe_engine.verify(email)
-            
-            confidence = probe_result["confidence"]
-            # Apply provider cap
-            confidence = provider_caps.apply_cap(confidence, domain)
-            
-            status = StatusEnum.VALID if confidence >= 80 else StatusEnum.RISKY
-            
-            # Build signal response
-            signals_raw = probe_result.get("signals", {})
-            signals_response = {
-                "fake_rejected": signals_raw.get("fake_rejected"),
-                "queue_id": signals_raw.get("queue_id", {}).get("detected"),
-                "timing_ratio": signals_raw.get("timing_ratio", {}).get("ratio"),
-                "spf_strict": signals_raw.get("spf_signal", {}).get("strict"),
-                "mta": signals_raw.get("mta", {}).get("mta"),
-            }
-            
-            results.append(
-                VerifyResult(
-                    email=email,
-                    status=status,
-                    confidence=confidence,
-                    catch_all=True,
-                    source=SourceEnum.PROBE_ENGINE,
-                    reason="catch_all_probed",
-                    signals=signals_response,
-                )
+    # Probe concurrency is bounded by the scheduler, not by this loop
+    await asyncio.gather(*(settle(i, email, domain) for i, email, domain in pending))
+
+    # Only answers are billed: system results (errors, deadlines) are not, and
+    # queued probes are counted when they finish (_complete_deferred)
+    for email, result in zip(emails, results):
+        if result.source != SourceEnum.SYSTEM:
+            usage_meter.record(req.customer_id, email.split("@")[1], result.source.value)
+
+    return results, deferred
+
+async def _verify_with_callback(req: VerifyRequest, job_id: str) -> None:
+    """Verify in batches and deliver each batch to the callback URL."""
+    url = str(req.callback_url)
+    total = len(req.emails)
+    lane = _lane(req)
+    try:
+        for batch, offset in enumerate(range(0, total, WEBHOOK_BATCH_SIZE)):
+            chunk = req.emails[offset:offset + WEBHOOK_BATCH_SIZE]
+            with tracer.span("verify.callback_batch", job_id=job_id, batch=batch, emails=len(chunk)):
+                results, _ = await _verify_batch(req, chunk, None, lane)
+            payload = [r.dict() for r in results]
+            job_store.append_results(job_id, payload)
+            webhook_dispatcher.enqueue_results(
+                url, job_id, payload, batch, final=offset + WEBHOOK_BATCH_SIZE >= total
             )
-            breaker.record_success(domain)
+            await result_exporter.pump(job_id)
+    except Exception as e:
+        logger.error(f"Callback job {job_id} failed: {e}")
+        job_store.fail(job_id, str(e))
+        await result_exporter.pump(job_id)
+        webhook_dispatcher.enqueue(url, {"job_id": job_id, "final": True, "error": str(e)}, job_id)
+
+def _budget_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left before the request deadline (None = unbounded)."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+async def _within_budget(coro: Awaitable, deadline: Optional[float]):
+    """Await coro, raising asyncio.TimeoutError once the deadline passes."""
+    remaining = _budget_left(deadline)
+    if remaining is None:
+        return await coro
+    if remaining <= 0:
+        if asyncio.iscoroutine(coro):
+            coro.close()
+        raise asyncio.TimeoutError()
+    return await asyncio.wait_for(coro, timeout=remaining)
+
+async def _run_probe(
+    email: str, domain: str, lane: Lane, deadline: Optional[float] = None
+) -> VerifyResult:
+    """Probe on the worker that owns the domain; locally if that is us or it is unreachable."""
+    owner = shard_router.owner(await shard_router.key_for(domain))
+    if owner is not None:
+        customer_id, tier, interactive = lane
+        remaining = _budget_left(deadline)
+        try:
+            return VerifyResult(**await shard_router.forward(owner, {
+                "email": email,
+                "customer_id": customer_id,
+                "tier": tier,
+                "interactive": interactive,
+                # Relative, so the owner's clock does not matter
+                "budget_ms": None if remaining is None else int(remaining * 1000),
+            }))
+        except httpx.HTTPError as e:
+            logger.warning(f"Probe forward to {owner} failed, probing locally: {e}")
+    return await _probe_locally(email, domain, lane)
+
+async def _probe_locally(email: str, domain: str, lane: Lane) -> VerifyResult:
+    """Run the probe engine for a catch-all address and build its result."""
+    customer_id, tier, interactive = lane
+    try:
+        probe_result = await probe_scheduler.run(
+            customer_id, tier, interactive, lambda: probe_engine.probe_engine.verify(email),
+            domain=await shard_router.key_for(domain),
+        )
         
-        except Exception as e:
-            logger.error(f"Probe engine error for {email}: {e}")
-            breaker.record_failure(domain)
-            
-            results.append(
-                VerifyResult(
-                    email=email,
-                    status=StatusEnum.UNKNOWN,
-                    confidence=0,
-                    catch_all=None,
-                    source=SourceEnum.SYSTEM,
-                    reason="probe_engine_error",
-                )
-            )
-            errors += 1
+        confidence = probe_result["confidence"]
+        # Apply provider cap
+        confidence = min(confidence, await domain_cache.get(domain, "provider_cap"))
+        
+        status = StatusEnum.VALID if confidence >= 80 else StatusEnum.RISKY
+        deliverable, catch_all, reason = None, True, "catch_all_probed"
+        
+        # Build signal response
+        signals_raw = probe_result.get("signals") or {}
+        real_code = signals_raw.get("real_code")
+        if real_code is not None and not 200 <= real_code < 300:
+            # The MX refused (5xx) or deferred the real address, so it is not accepting everything
+            rejected = real_code >= 500
+            status = StatusEnum.INVALID if rejected else StatusEnum.UNKNOWN
+            deliverable = False if rejected else None
+            catch_all = False if rejected else None
+            reason = probe_result["reason"]
+        signals_response = {
+            "fake_rejected": signals_raw.get("fake_rejected"),
+            "queue_id": signals_raw.get("queue_id", {}).get("detected"),
+            "timing_ratio": signals_raw.get("timing_ratio", {}).get("ratio"),
+            "spf_strict": signals_raw.get("spf_signal", {}).get("strict"),
+            "mta": signals_raw.get("mta", {}).get("mta"),
+        }
+        
+        breaker.record_success(domain)
+        return VerifyResult(
+            email=email,
+            status=status,
+            deliverable=deliverable,
+            confidence=confidence,
+            catch_all=catch_all,
+            source=SourceEnum.PROBE_ENGINE,
+            reason=reason,
+            signals=signals_response,
+        )
 
-    processing_time_ms = (time.time() - start_time) * 1000
+    except SchedulerFull as e:
+        return VerifyResult(
+            email=email,
+            status=StatusEnum.UNKNOWN,
+            confidence=0,
+            catch_all=None,
+            source=SourceEnum.SYSTEM,
+            reason="probe_capacity_exceeded",
+            retry_after=math.ceil(e.expected_wait),
+        )
     
-    return VerifyResponse(
-        results=results,
-        total_processed=len(req.emails),
-        total_errors=errors,
-        processing_time_ms=processing_time_ms,
+    except Exception as e:
+        logger.error(f"Probe engine error for {email}: {e}")
+        breaker.record_failure(domain)
+        
+        return VerifyResult(
+            email=email,
+            status=StatusEnum.UNKNOWN,
+            confidence=0,
+            catch_all=None,
+            source=SourceEnum.SYSTEM,
+            reason="probe_engine_error",
+        )
+
+def _omkar_settles(omkar_result: Dict) -> bool:
+    """Omkar answered definitively (not catch-all, not an API error)."""
+    return omkar_result.get("is_valid") is not None and not omkar_result.get("catch_all")
+
+def _omkar_catch_all(omkar_task: Optional[asyncio.Future]) -> Optional[bool]:
+    """True if Omkar already flagged the address as catch-all."""
+    if omkar_task is None or not omkar_task.done() or omkar_task.cancelled():
+        return None
+    if omkar_task.exception() is not None:
+        return None
+    return True if omkar_task.result().get("catch_all") else None
+
+def _omkar_result(email: str, domain: str, omkar_result: Dict) -> VerifyResult:
+    """Result for an address Omkar settled."""
+    is_valid = omkar_result.get("is_valid")
+    breaker.record_success(domain)
+    return VerifyResult(
+        email=email,
+        status=StatusEnum.VALID if is_valid else StatusEnum.INVALID,
+        deliverable=is_valid,
+        confidence=90 if is_valid else 10,
+        catch_all=False,
+        source=SourceEnum.OMKAR,
+        reason=omkar_result.get("reason"),
+    )
+
+async def _hedged(
+    email: str,
+    domain: str,
+    omkar_task: asyncio.Future,
+    omkar_sent: asyncio.Future,
+    lane: Lane,
+    deadline: Optional[float] = None,
+) -> VerifyResult:
+    """
+    Wait for Omkar up to its recent p95 latency, counted from when the
+    request was sent, then start the probe in parallel and use whichever
+    usable result comes first. A catch-all or failed Omkar answer starts
+    the probe straight away.
+    """
+    winner, result = await hedge(
+        omkar_task,
+        lambda: _run_probe(email, domain, lane, deadline),
+        omkar_dispatcher.hedge_delay(),
+        primary_usable=_omkar_settles,
+        backup_usable=lambda r: r.source == SourceEnum.PROBE_ENGINE,
+        started=omkar_sent,
+    )
+
+    if winner == "primary":
+        return _omkar_result(email, domain, result)
+
+    if result.reason == "catch_all_probed" and not _omkar_catch_all(omkar_task):
+        # Probe won before Omkar said catch-all; catch-all status is unknown
+        result = result.copy(update={"catch_all": None, "reason": "probe_hedged"})
+    return result
+
+async def _omkar_only_result(
+    email: str, domain: str, omkar_results: Optional[Dict[str, Dict]]
+) -> VerifyResult:
+    """Result for omkar_only mode; never falls through to the probe."""
+    if omkar_results is None:
+        return VerifyResult(
+            email=email,
+            status=StatusEnum.UNKNOWN,
+            confidence=0,
+            catch_all=None,
+            source=SourceEnum.SYSTEM,
+            reason="omkar_unavailable",
+            retry_after=omkar_dispatcher.retry_after(),
+        )
+
+    omkar_result = omkar_results.get(email)
+    if omkar_result is None:
+        # Not finished within the latency budget
+        raise asyncio.TimeoutError()
+    if _omkar_settles(omkar_result):
+        return _omkar_result(email, domain, omkar_result)
+
+    if omkar_result.get("catch_all"):
+        return VerifyResult(
+            email=email,
+            status=StatusEnum.RISKY,
+            confidence=min(50, await domain_cache.get(domain, "provider_cap")),
+            catch_all=True,
+            source=SourceEnum.OMKAR,
+            reason="catch_all_unprobed",
+        )
+
+    return VerifyResult(
+        email=email,
+        status=StatusEnum.UNKNOWN,
+        confidence=0,
+        catch_all=None,
+        source=SourceEnum.SYSTEM,
+        reason="omkar_error",
     )
 
+def _deadline_result(email: str, catch_all: Optional[bool], queued: bool) -> VerifyResult:
+    """Placeholder for a probe that did not fit in the latency budget."""
+    return VerifyResult(
+        email=email,
+        status=StatusEnum.RISKY if catch_all else StatusEnum.UNKNOWN,
+        confidence=0,
+        catch_all=catch_all,
+        source=SourceEnum.SYSTEM,
+        reason="probe_queued" if queued else "deadline_exceeded",
+    )
+
+async def _complete_deferred(
+    job_id: str, deferred: List[Tuple[str, str]], lane: Lane
+) -> None:
+    """Finish deadline-queued probes after the response has been sent."""
+    try:
+        for email, domain in deferred:
+            result = await _run_probe(email, domain, lane)
+            if result.source != SourceEnum.SYSTEM:
+                usage_meter.record(lane[0], domain, result.source.value)
+            job_store.append_results(job_id, [result.dict()])
+            await result_exporter.pump(job_id)
+    except Exception as e:
+        logger.error(f"Queued probe job {job_id} failed: {e}")
+        job_store.fail(job_id, str(e))
+        await result_exporter.pump(job_id)
+
+# ============ JOB STATUS ============
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, offset: int = 0):
+    """Get results of probes queued after a request deadline."""
+    job = job_store.get(job_id, offset)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error": "Job not found"})
+    return job
+
+# ============ RESULT EXPORT ============
+@app.post("/jobs/{job_id}/export")
+async def export_job(job_id: str, background_tasks: BackgroundTasks, format: ExportFormatEnum = ExportFormatEnum.CSV):
+    """
+    Export a job's results to a compressed file. Also resumes an
+    interrupted export from its last uploaded part.
+    """
+    customer_id = job_store.customer_of(job_id)
+    if customer_id is None:
+        raise HTTPException(status_code=404, detail={"error": "Job not found"})
+    if not result_exporter.supports(format.value):
+        raise HTTPException(status_code=400, detail={"error": f"Export format {format.value} is not available"})
+    result_exporter.create(job_id, customer_id, format.value)
+    background_tasks.add_task(result_exporter.pump, job_id)
+    return result_exporter.get(job_id)
+
+@app.get("/jobs/{job_id}/export")
+async def get_job_export(job_id: str):
+    """Get export progress and, once done, download URLs."""
+    export = result_exporter.get(job_id)
+    if export is None:
+        raise HTTPException(status_code=404, detail={"error": "Export not found"})
+    return export
+
+@app.get("/exports/{key:path}")
+async def download_export(key: str):
+    """Download a finished export from the local sink."""
+    sink = result_exporter.sink
+    if not isinstance(sink, LocalFileSink):
+        raise HTTPException(status_code=404, detail={"error": "Export not found"})
+    try:
+        path = sink.path(key)
+    except ValueError:
+        raise HTTPException(status_code=404, detail={"error": "Export not found"})
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail={"error": "Export not found"})
+    return FileResponse(path, filename=os.path.basename(path))
+
+# ============ USAGE ============
+@app.get("/usage")
+@app.get("/usage/{customer_id}")
+async def get_usage(
+    customer_id: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    resolution: Optional[str] = None,
+    domain: Optional[str] = None,
+):
+    """
+    Verified emails per minute/hour/day bucket, by source and domain.
+    Without customer_id, totals across all customers. Defaults to the
+    last 24 hours.
+    """
+    end = end if end is not None else time.time()
+    start = start if start is not None else end - 86400
+    try:
+        return usage_meter.query(customer_id, start, end, resolution, domain)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={"error": str(e)})
+
 # ============ QUOTA STATUS ============
 @app.get("/quota/{customer_id}/{domain}")
 async def get_quota(customer_id: str, domain: str):
@@ -172,6 +615,101 @@ async def get_reputation(domain: str):
     """Get domain reputation stats."""
     return reputation.get_reputation(domain)
 
+# ============ FEEDBACK INGESTION ============
+@app.post("/feedback")
+async def ingest_feedback(req: FeedbackRequest):
+    """Ingest bounce / false positive events into reputation tracking."""
+    aggregator = FeedbackAggregator()
+    aggregator.add_events(event.dict() for event in req.events)
+    aggregator.flush()
+    return aggregator.summary()
+
+@app.post("/feedback/import")
+async def import_feedback(request: Request, format: str = "jsonl"):
+    """
+    Bulk import a bounce log or DSN file sent as the raw request body.
+    The body is spooled to disk and parsed as a stream.
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail={"error": f"format must be one of {FORMATS}"})
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        path = f.name
+        async for chunk in request.stream():
+            f.write(chunk)
+    try:
+        return await asyncio.to_thread(import_file, path, format)
+    finally:
+        os.unlink(path)
+
+# ============ CACHE STATS ============
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get domain cache hit/miss stats."""
+    return domain_cache.stats()
+
+# ============ WEBHOOK STATS ============
+@app.get("/webhooks/stats")
+async def get_webhook_stats():
+    """Get webhook outbox and delivery stats."""
+    return webhook_dispatcher.stats()
+
+# ============ OMKAR DISPATCHER STATS ============
+@app.get("/omkar/stats")
+async def get_omkar_stats():
+    """Get Omkar dispatcher rate and throttling stats."""
+    return omkar_dispatcher.stats()
+
+@app.get("/scheduler/stats")
+async def get_scheduler_stats():
+    """Get probe queue depth and capacity."""
+    return probe_scheduler.stats()
+
+@app.get("/probe/stats")
+async def get_probe_stats():
+    """Get fake RCPTs per probe, early exits and extra fakes."""
+    return probe_strategy.stats()
+
+@app.get("/tracing/stats")
+async def get_tracing_stats():
+    """Get trace sampling counters and exporter."""
+    return tracer.stats()
+
+@app.get("/shards/stats")
+async def get_shard_stats():
+    """Get shard ring membership and routing counters."""
+    return shard_router.stats()
+
+# ============ SHARD ROUTING ============
+@app.post("/internal/probe", response_model=VerifyResult)
+async def internal_probe(req: ShardProbeRequest, request: Request):
+    """Run a probe forwarded by a peer; this worker owns the domain."""
+    if not shard_router.authorized(request.headers.get(TOKEN_HEADER, "")):
+        raise HTTPException(status_code=403, detail={"error": "Invalid shard token"})
+    if lifecycle.draining:
+        # The peer falls back to probing locally
+        raise HTTPException(status_code=503, detail={"error": "Server draining"})
+
+    domain = req.email.split("@")[1].lower()
+    if breaker.is_open(domain):
+        return VerifyResult(
+            email=req.email,
+            status=StatusEnum.RISKY,
+            confidence=0,
+            catch_all=None,
+            source=SourceEnum.SYSTEM,
+            reason="circuit_breaker_open",
+            retry_after=breaker.get_time_until_retry(domain),
+        )
+    probe = _probe_locally(req.email, domain, (req.customer_id, req.tier, req.interactive))
+    if req.budget_ms is None:
+        return await probe
+    try:
+        # Give up with the caller instead of probing for a result nobody waits for
+        return await asyncio.wait_for(probe, timeout=req.budget_ms / 1000)
+    except asyncio.TimeoutError:
+        return _deadline_result(req.email, None, False)
+
 # ============ ERROR HANDLERS ============
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
@@ -0,0 +1,69 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+from ..config import MATCHER_CACHE_SIZE
+
+class PatternMatcher:
+    """
+    Matcher over named regex alternatives, first pattern wins.
+
+    All patterns are compiled once into one alternation, so text that
+    matches none of them is rejected in a single pass. The alternation
+    returns the leftmost match; only the patterns listed before that one
+    are then tried on their own, so the result is the same as trying
+    each pattern in order. Results are memoized per input in a bounded
+    LRU.
+    """
+
+    def __init__(
+        self,
+        patterns: Iterable[Tuple[str, str]],
+        flags: int = 0,
+        cache_size: int = MATCHER_CACHE_SIZE,
+    ):
+        self.patterns = list(patterns)
+        names = [name for _, name in self.patterns]
+        for name in names:
+            if not name.isidentifier():
+                raise ValueError(f"Pattern name {name!r} is not a valid regex group name")
+        if len(set(names)) != len(names):
+            raise ValueError("Pattern names must be unique")
+        self.priority = {name: i for i, name in enumerate(names)}
+        self.compiled = [re.compile(pattern, flags) for pattern, _ in self.patterns]
+        self.regex = re.compile(
+            "|".join(f"(?P<{name}>{pattern})" for pattern, name in self.patterns),
+            flags,
+        )
+        self._search = lru_cache(maxsize=cache_size)(self._search_uncached)
+
+    @classmethod
+    def from_keywords(cls, keywords: Iterable[Tuple[str, Iterable[str]]], **kwargs) -> "PatternMatcher":
+        """Build a case-insensitive substring matcher from name -> keywords."""
+        patterns = [
+            ("|".join(re.escape(kw) for kw in kws), name)
+            for name, kws in keywords
+        ]
+        return cls(patterns, flags=re.IGNORECASE, **kwargs)
+
+    def search(self, text: str) -> Optional[Tuple[str, str]]:
+        """Return (pattern_name, matched_text) or None."""
+        if not text:
+            return None
+        return self._search(text)
+
+    def _search_uncached(self, text: str) -> Optional[Tuple[str, str]]:
+        match = self.regex.search(text)
+        if match is None:
+            return None
+        # Earlier patterns that matched further right still take priority
+        for i in range(self.priority[match.lastgroup]):
+            earlier = self.compiled[i].search(text)
+            if earlier is not None:
+                return self.patterns[i][1], earlier.group(0)
+        return match.lastgroup, match.group(0)
+
+    def cache_info(self):
+        return self._search.cache_info()
+
+    def cache_clear(self) -> None:
+        self._search.cache_clear()
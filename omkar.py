@@ -1,7 +1,8 @@
 import httpx
 import logging
 from typing import Dict, Optional
-from ..config import OMKAR_API_KEY, OMKAR_URL, OMKAR_TIMEOUT
+from ..config import OMKAR_API_KEY, OMKAR_URL, OMKAR_TIMEOUT, OMKAR_MAX_CONCURRENCY
+from ..core.tracing import traced, current_span
 
 logger = logging.getLogger(__name__)
 
@@ -10,36 +11,56 @@ class OmkarClient:
     Omkar email verification API client.
     Handles fast-path verification before probe engine.
     """
-    
+
     def __init__(self):
         self.api_key = OMKAR_API_KEY
         self.url = OMKAR_URL
         self.timeout = OMKAR_TIMEOUT
-        self.session = None
+        self.session: Optional[httpx.AsyncClient] = None
+
+    def _get_session(self) -> httpx.AsyncClient:
+        """Shared pooled client so concurrent lookups reuse connections."""
+        if self.session is None or self.session.is_closed:
+            self.session = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=OMKAR_MAX_CONCURRENCY,
+                    max_keepalive_connections=OMKAR_MAX_CONCURRENCY,
+                ),
+            )
+        return self.session
 
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+
+    @traced("omkar.request")
     async def verify(self, email: str) -> Dict:
         """
         Verify email via Omkar API.
         Returns dict with status, is_valid, score, catch_all detection.
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    self.url,
-                    headers={"API-Key": self.api_key},
-                    params={"email": email}
-                )
-            
+            response = await self._get_session().get(
+                self.url,
+                headers={"API-Key": self.api_key},
+                params={"email": email}
+            )
+
+            current_span().set(http_status=response.status_code)
             if response.status_code != 200:
                 logger.warning(f"Omkar API error for {email}: {response.status_code}")
                 return {
                     "is_valid": None,
                     "status": "api_error",
                     "score": 0,
+                    "http_status": response.status_code,
+                    "retry_after": response.headers.get("Retry-After"),
                 }
-            
+
             data = response.json()
-            
+
             return {
                 "is_valid": data.get("is_valid"),
                 "status": data.get("status"),
@@ -47,7 +68,7 @@ class OmkarClient:
                 "catch_all": data.get("catch_all", False),
                 "reason": data.get("reason"),
             }
-        
+
         except Exception as e:
             logger.error(f"Omkar verification error: {e}")
             return {
@@ -56,4 +77,4 @@ class OmkarClient:
                 "score": 0,
             }
 
-omkar_client = OmkarClient()
\ No newline at end of file
+omkar_client = OmkarClient()
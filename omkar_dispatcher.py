@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+from ..config import (
+    OMKAR_MAX_RPS, OMKAR_MIN_RPS, OMKAR_MAX_CONCURRENCY, OMKAR_MAX_RETRIES,
+    OMKAR_BACKOFF_DEFAULT, OMKAR_LATENCY_WINDOW, OMKAR_HEDGE_QUANTILE,
+    OMKAR_HEDGE_MIN_SAMPLES, OMKAR_HEDGE_DEFAULT_DELAY, OMKAR_BREAKER_THRESHOLD,
+    OMKAR_BREAKER_COOLDOWN,
+)
+from ..core.omkar import omkar_client, OmkarClient
+from ..protection.breaker import CircuitBreaker
+from ..core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+class OmkarDispatcher:
+    """
+    Runs Omkar lookups concurrently under a requests-per-second and
+    concurrency budget.
+
+    - Token bucket paces requests at the current rate
+    - Rate adapts AIMD-style: halved on 429, crept back up on success
+    - Duplicate in-flight emails share one lookup
+    - Tracks Omkar's own latency (for hedging) and health, separate from
+      per-domain SMTP health
+    """
+
+    def __init__(
+        self,
+        client: OmkarClient = omkar_client,
+        max_rps: float = OMKAR_MAX_RPS,
+        min_rps: float = OMKAR_MIN_RPS,
+        concurrency: int = OMKAR_MAX_CONCURRENCY,
+    ):
+        self.client = client
+        self.max_rps = max_rps
+        self.min_rps = min_rps
+        self.rate = max_rps
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.bucket_lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.inflight: Dict[str, Tuple[asyncio.Future, asyncio.Future]] = {}  # email -> (result, sent)
+        self.counters = {
+            "requests": 0, "coalesced": 0, "throttled": 0, "retries": 0, "failures": 0,
+        }
+        self.latencies = deque(maxlen=OMKAR_LATENCY_WINDOW)
+        self.health = CircuitBreaker(
+            threshold=OMKAR_BREAKER_THRESHOLD, cooldown=OMKAR_BREAKER_COOLDOWN
+        )
+
+    def is_healthy(self) -> bool:
+        """False while Omkar's own circuit is open (brownout)."""
+        return not self.health.is_open("omkar")
+
+    def retry_after(self) -> int:
+        return self.health.get_time_until_retry("omkar")
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on Omkar before hedging: its recent p95 latency."""
+        if len(self.latencies) < OMKAR_HEDGE_MIN_SAMPLES:
+            return OMKAR_HEDGE_DEFAULT_DELAY
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * OMKAR_HEDGE_QUANTILE))]
+
+    def submit(self, email: str) -> Tuple[asyncio.Future, asyncio.Future]:
+        """
+        Start a lookup, or join an identical in-flight one.
+
+        Returns (result, sent) futures, shared between callers, so do not
+        cancel them. `sent` resolves once the request holds a rate token
+        and a connection slot, i.e. when its hedge_delay() clock starts.
+        """
+        key = email.lower()
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.counters["coalesced"] += 1
+            return pending
+
+        sent = asyncio.get_running_loop().create_future()
+        future = asyncio.ensure_future(self._dispatch(email, sent))
+        self.inflight[key] = future, sent
+        future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return future, sent
+
+    async def verify(self, email: str) -> Dict:
+        """Verify one email, joining an identical in-flight lookup if any."""
+        future, _ = self.submit(email)
+        # Shield so one cancelled caller does not cancel the shared lookup
+        return await asyncio.shield(future)
+
+    async def verify_many(
+        self, emails: Iterable[str], timeout: Optional[float] = None
+    ) -> Dict[str, Dict]:
+        """
+        Verify many emails concurrently.
+        Returns email -> result; emails not finished within timeout are omitted.
+        """
+        tasks = {email: asyncio.ensure_future(self.verify(email)) for email in set(emails)}
+        if not tasks:
+            return {}
+
+        done, not_done = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in not_done:
+            task.cancel()
+
+        return {
+            email: task.result()
+            for email, task in tasks.items()
+            if task in done and not task.cancelled()
+        }
+
+    async def _dispatch(self, email: str, sent: asyncio.Future) -> Dict:
+        for attempt in range(OMKAR_MAX_RETRIES + 1):
+            await self._acquire_token()
+            async with self.semaphore:
+                if not sent.done():
+                    sent.set_result(None)
+                self.counters["requests"] += 1
+                start = time.monotonic()
+                result = await self.client.verify(email)
+                elapsed = time.monotonic() - start
+
+            if result.get("http_status") != 429:
+                self._on_success()
+                self._record_health(result, elapsed)
+                return result
+
+            self._on_throttled(result.get("retry_after"))
+            if attempt < OMKAR_MAX_RETRIES:
+                self.counters["retries"] += 1
+
+        return result
+
+    @traced("omkar.rate_wait")
+    async def _acquire_token(self) -> None:
+        async with self.bucket_lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+
+                self.tokens = min(1.0, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+    def _record_health(self, result: Dict, elapsed: float) -> None:
+        if result.get("is_valid") is None and not result.get("catch_all"):
+            self.counters["failures"] += 1
+            self.health.record_failure("omkar")
+        else:
+            self.latencies.append(elapsed)
+            self.health.record_success("omkar")
+
+    def _on_success(self) -> None:
+        # Additive increase: ~5% of the ceiling per successful call
+        self.rate = min(self.max_rps, self.rate + self.max_rps * 0.05)
+
+    def _on_throttled(self, retry_after: Optional[str]) -> None:
+        # Multiplicative decrease, and honour Retry-After when present
+        self.counters["throttled"] += 1
+        self.rate = max(self.min_rps, self.rate / 2)
+        try:
+            backoff = float(retry_after) if retry_after else OMKAR_BACKOFF_DEFAULT
+        except ValueError:
+            backoff = OMKAR_BACKOFF_DEFAULT
+        self.paused_until = max(self.paused_until, time.monotonic() + backoff)
+        logger.warning(f"Omkar throttled; rate now {self.rate:.1f} rps, pausing {backoff:.1f}s")
+
+    def stats(self) -> Dict:
+        return dict(
+            self.counters,
+            rate=self.rate,
+            max_rps=self.max_rps,
+            inflight=len(self.inflight),
+            healthy=self.is_healthy(),
+            hedge_delay=self.hedge_delay(),
+        )
+
+omkar_dispatcher = OmkarDispatcher()
@@ -0,0 +1,94 @@
+import os
+import re
+from typing import Dict, FrozenSet, Optional
+from ..config import (
+    PREFILTER_DISPOSABLE_PATH, PREFILTER_ROLE_PATH, PREFILTER_ROLE_ACCOUNTS, PREFILTER_CHECK_MX
+)
+from ..core.domain_cache import domain_cache
+
+_DATA_DIR = os.path.dirname(__file__)
+
+def _load_list(path: str) -> FrozenSet[str]:
+    """Load a one-entry-per-line list, skipping blanks and # comments."""
+    with open(path) as f:
+        return frozenset(
+            line.strip().lower()
+            for line in f
+            if line.strip() and not line.startswith("#")
+        )
+
+class PreFilter:
+    """
+    Local pre-filter that settles obvious junk before Omkar or SMTP:
+    bad syntax, disposable domains, role accounts and domains without
+    any mail host. Everything except the MX check is in-memory.
+    """
+
+    def __init__(
+        self,
+        disposable_path: Optional[str] = PREFILTER_DISPOSABLE_PATH,
+        role_path: Optional[str] = PREFILTER_ROLE_PATH,
+    ):
+        self.disposable = _load_list(
+            disposable_path or os.path.join(_DATA_DIR, "disposable_domains.txt")
+        )
+        roles = _load_list(role_path or os.path.join(_DATA_DIR, "role_accounts.txt"))
+        self.roles = frozenset(r for r in roles if not r.endswith("*"))
+        prefixes = sorted(r[:-1] for r in roles if r.endswith("*"))
+        self.role_prefix = re.compile(
+            "|".join(re.escape(p) for p in prefixes) if prefixes else r"(?!)"
+        )
+
+    def check_local(self, email: str) -> Optional[Dict]:
+        """In-memory checks. Returns a verdict, or None to continue."""
+        local, _, domain = email.rpartition("@")
+        domain = domain.lower()
+
+        if not self._syntax_ok(local, domain):
+            return {"status": "invalid", "deliverable": False, "confidence": 0, "reason": "invalid_syntax"}
+
+        if self.is_disposable(domain):
+            return {"status": "risky", "deliverable": None, "confidence": 20, "reason": "disposable_domain"}
+
+        if PREFILTER_ROLE_ACCOUNTS and self.is_role(local):
+            return {"status": "risky", "deliverable": None, "confidence": 50, "reason": "role_account"}
+
+        return None
+
+    async def check(self, email: str) -> Optional[Dict]:
+        """Full pre-filter including the cached mail-host check."""
+        verdict = self.check_local(email)
+        if verdict is not None or not PREFILTER_CHECK_MX:
+            return verdict
+
+        domain = email.rpartition("@")[2].lower()
+        # None means the lookup failed transiently; let later stages decide
+        if await domain_cache.get(domain, "mail_host") is False:
+            return {"status": "invalid", "deliverable": False, "confidence": 0, "reason": "no_mx_record"}
+
+        return None
+
+    def is_disposable(self, domain: str) -> bool:
+        """Match the domain or any parent domain against the list."""
+        labels = domain.split(".")
+        return any(
+            ".".join(labels[i:]) in self.disposable
+            for i in range(len(labels) - 1)
+        )
+
+    def is_role(self, local: str) -> bool:
+        local = local.lower().split("+", 1)[0]
+        return local in self.roles or self.role_prefix.match(local) is not None
+
+    def _syntax_ok(self, local: str, domain: str) -> bool:
+        return (
+            0 < len(local) <= 64
+            and 0 < len(domain) <= 253
+            and "." in domain
+            and ".." not in local
+            and ".." not in domain
+            and not domain.startswith((".", "-"))
+            and not domain.endswith((".", "-"))
+        )
+
+prefilter = PreFilter()
@@ -1,18 +1,20 @@
 import asyncio
 import random
 import string
-import aiosmtplib
-import dns.resolver
 import logging
 from typing import Dict, List, Optional
 from ..config import (
-    SMTP_TIMEOUT, SMTP_PORT, SMTP_SENDER, SMTP_EHLO_NAME, FAKE_EMAIL_LENGTH
+    SMTP_TIMEOUT, SMTP_PORT, SMTP_SENDER, SMTP_EHLO_NAME, FAKE_EMAIL_LENGTH,
 )
 from ..signals.timing import timing_analyzer
+from ..signals.timing_baseline import timing_baselines
 from ..signals.queue_id import detector
-from ..signals.dns_signals import dns_analyzer
 from ..signals.banner import fingerprinter
 from ..core.scoring import scorer
+from ..core.domain_cache import domain_cache
+from ..core.probe_strategy import probe_strategy
+from ..core.smtp_session import SMTPSession, SMTPSessionError, SMTPReply
+from ..core.tracing import traced, current_span
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,10 @@ class ProbeEngine:
     Tests real email against fake addresses to detect catch-all patterns.
     """
 
+    def __init__(self, port: int = SMTP_PORT):
+        self.port = port
+
+    @traced("probe.verify")
     async def verify(self, email: str, ip: Optional[str] = None) -> Dict:
         """
         Full probe verification for catch-all detection.
@@ -41,6 +47,7 @@ class ProbeEngine:
                 }
             
             # Connect and test
+            current_span().set(domain=domain, mx_host=mx_host)
             signals = await self._test_address(email, mx_host, domain)
             
             if signals is None:
@@ -53,16 +60,24 @@ class ProbeEngine:
             
             # Score results
             confidence = scorer.score(signals, domain)
-            status = "valid" if confidence >= 80 else "risky"
+            real_code = signals["real_code"]
+            if real_code >= 500:
+                status, reason = "invalid", "mailbox_rejected"
+            elif not 200 <= real_code < 300:
+                status, reason = "unknown", "rcpt_deferred"
+            else:
+                status = "valid" if confidence >= 80 else "risky"
+                reason = "probe_analysis"
             
             return {
                 "status": status,
                 "confidence": confidence,
-                "reason": "probe_analysis",
+                "reason": reason,
                 "signals": signals,
             }
         
         except Exception as e:
+            current_span().fail(str(e))
             logger.error(f"Probe engine error for {email}: {e}")
             return {
                 "status": "unknown",
@@ -72,87 +87,168 @@ class ProbeEngine:
             }
 
     async def _get_mx_host(self, domain: str) -> Optional[str]:
-        """Resolve domain to primary MX host."""
-        try:
-            mx = dns.resolver.resolve(domain, "MX")
-            primary = sorted(mx, key=lambda x: x.preference)[0]
-            return primary.exchange.to_text().rstrip(".")
-        except Exception as e:
-            logger.warning(f"MX lookup failed for {domain}: {e}")
-            return None
+        """Resolve domain to primary MX host (cached per domain)."""
+        return await domain_cache.get(domain, "mx")
 
+    @traced("probe.smtp")
     async def _test_address(self, email: str, mx_host: str, domain: str) -> Optional[Dict]:
         """
         Core SMTP testing:
-        1. Send RCPT TO for real email
-        2. Send RCPT TO for fake emails
-        3. Compare timing and responses
+        1. Send RCPT TO for real email; if it is refused or deferred,
+           stop there (fakes cannot tell us more)
+        2. Send RCPT TO for fake emails, as many as probe_strategy asks for:
+           stop on a definitive rejection, add fakes while timing is ambiguous
+        3. Compare timing against the learned baseline and responses
         4. Detect catch-all vs valid
+
+        When the server advertises PIPELINING, untimed commands (RSET, MAIL,
+        and RCPTs on MTAs without a timing signal) are sent as one group.
+        Timed RCPTs always get their own round trip, since pipelining
+        servers may hold replies until the end of a group.
         """
         try:
-            async with aiosmtplib.SMTP(
-                hostname=mx_host,
-                port=SMTP_PORT,
-                timeout=SMTP_TIMEOUT,
-            ) as smtp:
+            async with SMTPSession(mx_host, self.port, SMTP_TIMEOUT) as smtp:
                 # Connect
-                await smtp.connect()
-                banner = smtp.server_name or ""
-                mta_info = fingerprinter.parse(banner)
+                greeting = await smtp.connect()
+                banner = greeting.message
                 
-                await smtp.ehlo(SMTP_EHLO_NAME)
-                await smtp.mail(SMTP_SENDER)
+                ehlo = await smtp.ehlo(SMTP_EHLO_NAME)
+                round_trips = 1
+                mta_info = fingerprinter.fingerprint_host(
+                    mx_host, banner, ehlo.message, smtp.extensions
+                )
+                pipelining = smtp.supports("pipelining")
+                mail_from = f"MAIL FROM:<{SMTP_SENDER}>"
                 
                 # ===== TEST REAL ADDRESS =====
-                start_real = asyncio.get_event_loop().time()
-                real_code, real_msg = await smtp.rcpt(email)
-                real_time_ms = (asyncio.get_event_loop().time() - start_real) * 1000
+                if mta_info["supports_timing"]:
+                    self._expect_ok(await self._command_group(smtp, [mail_from], pipelining))
+                    start_real = asyncio.get_event_loop().time()
+                    real = await smtp.command(f"RCPT TO:<{email}>")
+                    real_time_ms = (asyncio.get_event_loop().time() - start_real) * 1000
+                    round_trips += 2
+                else:
+                    start_real = asyncio.get_event_loop().time()
+                    *setup, real = await self._command_group(
+                        smtp, [mail_from, f"RCPT TO:<{email}>"], pipelining
+                    )
+                    real_time_ms = (asyncio.get_event_loop().time() - start_real) * 1000
+                    self._expect_ok(setup)
+                    round_trips += 1 if pipelining else 2
+                real_code, real_msg = real.code, real.message
+                mta_info = fingerprinter.refine(mx_host, mta_info, str(real_msg))
+                spf_signal = await domain_cache.get(domain, "spf")
                 
-                await smtp.rset()
-                await smtp.mail(SMTP_SENDER)
+                if not 200 <= real_code < 300:
+                    current_span().set(real_code=real_code, fakes=0)
+                    return {
+                        "mta": mta_info,
+                        "fake_rejected": None,
+                        "queue_id": {"detected": False, "pattern": None, "value": None},
+                        "timing_ratio": {"status": "skipped", "ratio": None, "confidence": 0},
+                        "spf_signal": spf_signal,
+                        "real_code": real_code,
+                        "fake_codes": [],
+                        "real_time_ms": real_time_ms,
+                        "fake_times_ms": [],
+                        "pipelining": pipelining,
+                        "round_trips": round_trips,
+                        "probe_plan": None,
+                    }
                 
                 # ===== TEST FAKE ADDRESSES =====
                 fake_times = []
+                fake_codes = []
                 fake_rejected = None
+                timing = None
+                baseline = timing_baselines.get(mx_host, mta_info["mta"])
+                plan = probe_strategy.plan(domain, mta_info, baseline)
                 
-                for i in range(2):
+                while True:
                     fake_email = self._generate_fake(domain)
+                    reset = ["RSET", mail_from]
                     
-                    start_fake = asyncio.get_event_loop().time()
-                    fake_code, fake_msg = await smtp.rcpt(fake_email)
-                    fake_time_ms = (asyncio.get_event_loop().time() - start_fake) * 1000
-                    
-                    fake_times.append(fake_time_ms)
+                    if mta_info["supports_timing"]:
+                        self._expect_ok(await self._command_group(smtp, reset, pipelining))
+                        start_fake = asyncio.get_event_loop().time()
+                        fake = await smtp.command(f"RCPT TO:<{fake_email}>")
+                        fake_times.append((asyncio.get_event_loop().time() - start_fake) * 1000)
+                        round_trips += 2 if pipelining else 3
+                    else:
+                        *setup, fake = await self._command_group(
+                            smtp, reset + [f"RCPT TO:<{fake_email}>"], pipelining
+                        )
+                        self._expect_ok(setup)
+                        round_trips += 1 if pipelining else 3
                     
-                    if i == 0 and fake_code != 250:
+                    fake_codes.append(fake.code)
+                    if len(fake_codes) == 1 and fake.code >= 500:
+                        # Only a definitive refusal counts; the real RCPT was accepted (2xx) above
                         fake_rejected = True
-                    
-                    if i < 1:
-                        await smtp.rset()
-                        await smtp.mail(SMTP_SENDER)
+                    if mta_info["supports_timing"]:
+                        timing = timing_analyzer.analyze_pattern(
+                            real_time_ms, fake_times, baseline=baseline, mta_info=mta_info
+                        )
+                    if not probe_strategy.next_fake(plan, fake_codes, timing):
+                        break
+                
+                if mta_info["supports_timing"]:
+                    timing_baselines.record(mx_host, mta_info["mta"], fake_times)
+                else:
+                    timing = {"status": "unsupported", "ratio": None, "confidence": 0}
+                probe_strategy.record(domain, plan, fake_codes, timing["status"])
+                current_span().set(fakes=len(fake_codes), plan=plan["basis"])
+                
+                if mta_info["supports_queue_id"]:
+                    queue_id = detector.detect(str(real_msg))
+                else:
+                    queue_id = {"detected": False, "pattern": None, "value": None}
                 
                 # ===== BUILD SIGNALS =====
                 signals = {
                     "mta": mta_info,
                     "fake_rejected": fake_rejected,
-                    "queue_id": detector.detect(str(real_msg)),
-                    "timing_ratio": timing_analyzer.analyze_pattern(real_time_ms, fake_times),
-                    "spf_signal": dns_analyzer.get_spf(domain),
+                    "queue_id": queue_id,
+                    "timing_ratio": timing,
+                    "spf_signal": spf_signal,
                     "real_code": real_code,
-                    "fake_codes": [250 if fake_rejected else 550],  # Simplified
+                    "fake_codes": fake_codes,
                     "real_time_ms": real_time_ms,
                     "fake_times_ms": fake_times,
+                    "pipelining": pipelining,
+                    "round_trips": round_trips,
+                    "probe_plan": plan["basis"],
                 }
                 
                 return signals
         
         except asyncio.TimeoutError:
+            current_span().fail("timeout")
             logger.warning(f"SMTP timeout for {mx_host}")
             return None
         except Exception as e:
+            current_span().fail(str(e))
             logger.error(f"SMTP test error: {e}")
             return None
 
+    async def _command_group(
+        self, smtp: SMTPSession, commands: List[str], pipelining: bool
+    ) -> List[SMTPReply]:
+        """
+        Send commands and return their replies in order.
+        With PIPELINING (RFC 2920) the group is written at once and the
+        replies read back as a batch: one round trip instead of one each.
+        """
+        if not pipelining:
+            return [await smtp.command(command) for command in commands]
+        return await smtp.pipeline(commands)
+
+    def _expect_ok(self, replies: List[SMTPReply]) -> None:
+        """Raise if a RSET/MAIL in a group was refused (the probe cannot continue)."""
+        for reply in replies:
+            if reply.code != 250:
+                raise SMTPSessionError(reply.code, reply.message)
+
     def _generate_fake(self, domain: str) -> str:
         """Generate random fake email for testing."""
         random_part = ''.join(
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+from ..config import (
+    FAKE_PROBES_COLD, FAKE_PROBES_WARM, FAKE_PROBES_MAX, PROBE_HISTORY_MAX_DOMAINS,
+    PROBE_HISTORY_MIN_PROBES, PROBE_HISTORY_REJECT_RATE, PROBE_EXTRA_MIN_YIELD,
+)
+
+class DomainHistory:
+    """Outcomes of past probes on one domain."""
+
+    __slots__ = ("probes", "rejects", "extra_probes", "extra_resolved")
+
+    def __init__(self):
+        self.probes = 0
+        self.rejects = 0  # First fake refused with a 5xx
+        self.extra_probes = 0  # Probes that went past their minimum fakes
+        self.extra_resolved = 0  # ...and ended with a timing verdict
+
+    def to_dict(self) -> Dict:
+        return {
+            "probes": self.probes,
+            "rejects": self.rejects,
+            "extra_probes": self.extra_probes,
+            "extra_resolved": self.extra_resolved,
+        }
+
+class ProbeStrategy:
+    """
+    Decides how many fake RCPTs a probe sends, one step at a time.
+
+    - A definitive (5xx) rejection of a fake settles fake_rejected, and
+      scoring returns on it, so the probe stops there
+    - MTAs without a timing signal get a single fake
+    - Otherwise the minimum is FAKE_PROBES_WARM once the MX baseline is
+      learned, else FAKE_PROBES_COLD; further fakes (up to
+      FAKE_PROBES_MAX) are sent only while the timing verdict is ambiguous
+    - Per-domain history: domains that nearly always reject fakes get one,
+      and domains where extra fakes rarely resolve the timing get none
+    """
+
+    def __init__(self, max_domains: int = PROBE_HISTORY_MAX_DOMAINS):
+        self.max_domains = max_domains
+        self.history: "OrderedDict[str, DomainHistory]" = OrderedDict()
+        self.lock = Lock()
+        self.counters = {"probes": 0, "fakes": 0, "early_exits": 0, "extra_fakes": 0}
+
+    def plan(self, domain: str, mta_info: Dict, baseline: Dict) -> Dict:
+        """Fake RCPT bounds for a probe, before any fake is sent."""
+        if not mta_info["supports_timing"]:
+            return {"min_fakes": 1, "max_fakes": 1, "basis": "untimed"}
+
+        min_fakes = FAKE_PROBES_WARM if baseline["source"] == "mx" else FAKE_PROBES_COLD
+        plan = {"min_fakes": min_fakes, "max_fakes": max(min_fakes, FAKE_PROBES_MAX), "basis": "timing"}
+
+        with self.lock:
+            history = self.history.get(domain)
+            if history is None or history.probes < PROBE_HISTORY_MIN_PROBES:
+                return plan
+            if history.rejects / history.probes >= PROBE_HISTORY_REJECT_RATE:
+                plan.update(min_fakes=1, max_fakes=1, basis="rejects_fakes")
+            elif (
+                history.extra_probes >= PROBE_HISTORY_MIN_PROBES
+                and history.extra_resolved / history.extra_probes < PROBE_EXTRA_MIN_YIELD
+            ):
+                plan.update(max_fakes=min_fakes, basis="extras_unhelpful")
+        return plan
+
+    def next_fake(self, plan: Dict, fake_codes: List[int], timing: Optional[Dict]) -> bool:
+        """Whether to send another fake RCPT given the replies and timing so far."""
+        sent = len(fake_codes)
+        if fake_codes[-1] >= 500:
+            if sent < plan["min_fakes"]:
+                self.counters["early_exits"] += 1
+            return False
+        if sent >= plan["max_fakes"]:
+            return False
+        if sent < plan["min_fakes"]:
+            return True
+        if timing is not None and timing["status"] == "ambiguous":
+            self.counters["extra_fakes"] += 1
+            return True
+        return False
+
+    def record(self, domain: str, plan: Dict, fake_codes: List[int], timing_status: Optional[str]) -> None:
+        """Feed the outcome of a finished probe into the domain's history."""
+        self.counters["probes"] += 1
+        self.counters["fakes"] += len(fake_codes)
+        with self.lock:
+            history = self.history.get(domain)
+            if history is None:
+                history = self.history[domain] = DomainHistory()
+                if len(self.history) > self.max_domains:
+                    self.history.popitem(last=False)
+            else:
+                self.history.move_to_end(domain)
+
+            history.probes += 1
+            # 4xx (greylisting) and 251/252 say nothing about fakes being refused
+            if fake_codes and fake_codes[0] >= 500:
+                history.rejects += 1
+            if len(fake_codes) > plan["min_fakes"]:
+                history.extra_probes += 1
+                if timing_status != "ambiguous":
+                    history.extra_resolved += 1
+
+    def get_history(self, domain: str) -> Optional[Dict]:
+        with self.lock:
+            history = self.history.get(domain)
+            return history.to_dict() if history else None
+
+    def stats(self) -> Dict:
+        probes = self.counters["probes"]
+        return dict(
+            self.counters,
+            fakes_per_probe=round(self.counters["fakes"] / probes, 3) if probes else None,
+            domains=len(self.history),
+        )
+
+probe_strategy = ProbeStrategy()
@@ -1,12 +1,13 @@
-import re
 from typing import Optional, Dict
+from ..config import QUEUE_ID_PATTERNS_EXTRA
+from ..signals.matcher import PatternMatcher
 
 class QueueIDDetector:
     """
     Detects queue IDs in SMTP responses.
     Queue IDs indicate legitimate server queuing, suggesting valid address.
     """
-    
+
     PATTERNS = [
         # Postfix: 10-14 hex chars
         (r'[0-9A-F]{10,14}', "postfix_hex"),
@@ -18,6 +19,12 @@ class QueueIDDetector:
         (r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', "uuid"),
     ]
 
+    def __init__(self):
+        # Extra patterns from config are tried before the built-ins
+        self.matcher = PatternMatcher(
+            [tuple(p) for p in QUEUE_ID_PATTERNS_EXTRA] + self.PATTERNS
+        )
+
     def detect(self, message: str) -> Dict[str, bool]:
         """
         Detect queue ID in message.
@@ -25,18 +32,16 @@ class QueueIDDetector:
         """
         if not message:
             return {"detected": False, "pattern": None, "value": None}
-        
-        message_str = str(message).strip()
-        
-        for pattern, pattern_name in self.PATTERNS:
-            match = re.search(pattern, message_str)
-            if match:
-                return {
-                    "detected": True,
-                    "pattern": pattern_name,
-                    "value": match.group(0),
-                }
-        
+
+        match = self.matcher.search(str(message).strip())
+        if match:
+            pattern_name, value = match
+            return {
+                "detected": True,
+                "pattern": pattern_name,
+                "value": value,
+            }
+
         return {"detected": False, "pattern": None, "value": None}
 
-detector = QueueIDDetector()
\ No newline at end of file
+detector = QueueIDDetector()
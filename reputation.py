@@ -1,6 +1,7 @@
 import redis
 from ..config import REDIS_HOST, REDIS_PORT, REDIS_DB
-from typing import Dict
+from typing import Dict, List
+from ..core.tracing import traced
 
 class ReputationMonitor:
     """
@@ -15,6 +16,7 @@ class ReputationMonitor:
             decode_responses=True
         )
 
+    @traced("redis.reputation.record_false_positive")
     def record_false_positive(self, domain: str) -> None:
         """Record a false positive (marked valid but bounced later)."""
         key = f"reputation:fp:{domain}"
@@ -24,17 +26,49 @@ class ReputationMonitor:
         if count >= 10:
             self.degrade_domain(domain, "high_false_positive_rate")
 
+    @traced("redis.reputation.record_bounce")
     def record_bounce(self, domain: str) -> None:
         """Record a bounce."""
         key = f"reputation:bounces:{domain}"
         self.r.incr(key)
         self.r.expire(key, 3600)
 
+    @traced("redis.reputation.record_feedback_bulk")
+    def record_feedback_bulk(self, bounces: Dict[str, int], false_positives: Dict[str, int]) -> List[str]:
+        """
+        Apply aggregated bounce / false positive counts in one pipeline.
+        Same TTLs and degrade threshold as the single-event methods.
+        Returns the domains degraded by this batch.
+        """
+        pipe = self.r.pipeline(transaction=False)
+        for domain, count in bounces.items():
+            pipe.incrby(f"reputation:bounces:{domain}", count)
+            pipe.expire(f"reputation:bounces:{domain}", 3600)
+        fp_domains = list(false_positives)
+        for domain in fp_domains:
+            pipe.incrby(f"reputation:fp:{domain}", false_positives[domain])
+            pipe.expire(f"reputation:fp:{domain}", 86400 * 7)  # 7 days
+        replies = pipe.execute()
+
+        # fp INCRBY replies follow the bounce pairs, one pair per domain
+        fp_counts = replies[2 * len(bounces)::2]
+        degraded = [d for d, count in zip(fp_domains, fp_counts) if count >= 10]
+
+        if degraded:
+            pipe = self.r.pipeline(transaction=False)
+            for domain in degraded:
+                pipe.setex(f"reputation:degraded:{domain}", 3600, "high_false_positive_rate")
+            pipe.execute()
+
+        return degraded
+
+    @traced("redis.reputation.degrade")
     def degrade_domain(self, domain: str, reason: str) -> None:
         """Mark domain as degraded."""
         key = f"reputation:degraded:{domain}"
         self.r.setex(key, 3600, reason)
 
+    @traced("redis.reputation.confidence_cap")
     def get_confidence_cap(self, domain: str) -> int:
         """
         Get max confidence for domain based on reputation.
@@ -52,11 +86,13 @@ class ReputationMonitor:
         
         return 100
 
+    @traced("redis.reputation.is_degraded")
     def is_degraded(self, domain: str) -> bool:
         """Check if domain reputation is degraded."""
         key = f"reputation:degraded:{domain}"
         return self.r.exists(key) > 0
 
+    @traced("redis.reputation.get")
     def get_reputation(self, domain: str) -> Dict:
         """Get full reputation data."""
         return {
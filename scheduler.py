@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+from ..config import (
+    PROBE_MAX_CONCURRENCY, SCHEDULER_MAX_QUEUE, SCHEDULER_SERVICE_TIME_DEFAULT, QUOTA_LIMITS,
+    MAX_DOMAIN_CONCURRENCY,
+)
+from ..core.tracing import tracer
+
+T = TypeVar("T")
+
+INTERACTIVE = 0
+BULK = 1
+
+class SchedulerFull(Exception):
+    """Raised when the probe queue is at SCHEDULER_MAX_QUEUE."""
+
+    def __init__(self, expected_wait: float):
+        super().__init__("probe queue full")
+        self.expected_wait = expected_wait
+
+class ProbeScheduler:
+    """
+    Weighted fair scheduler in front of the probe engine.
+
+    Start-time fair queueing across customers: each request is tagged
+    with max(virtual time, customer's last tag) and the customer's next
+    tag advances by 1/weight, so a 1M-row job only gets its weighted
+    share while other customers have work queued. Interactive requests
+    use a strict-priority lane ahead of bulk work. Tier weights come from
+    QUOTA_LIMITS.
+
+    At most domain_limit probes run per domain (MAX_DOMAIN_CONCURRENCY).
+    A queued probe whose domain is at its cap is parked on that domain
+    and goes back into the fair queue, in its original order, when one
+    of the domain's probes finishes. Lane and fair-share order therefore
+    decide among the probes that can actually start.
+    """
+
+    def __init__(
+        self,
+        capacity: int = PROBE_MAX_CONCURRENCY,
+        max_queue: int = SCHEDULER_MAX_QUEUE,
+        domain_limit: int = MAX_DOMAIN_CONCURRENCY,
+    ):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.domain_limit = domain_limit
+        self.in_flight = 0
+        self.in_flight_by_domain: Counter = Counter()
+        self.parked: Dict[str, List] = {}  # Domain at its cap -> heap of queue entries
+        self.vtime = 0.0
+        self.last_tag: Dict[str, float] = {}
+        self.queue: list = []  # Entries that can start as soon as capacity frees
+        self.queued_by_customer: Counter = Counter()
+        self.queued_by_lane: Counter = Counter()
+        self.seq = itertools.count()
+        self.service_time = SCHEDULER_SERVICE_TIME_DEFAULT  # EWMA seconds per probe
+
+    async def run(
+        self,
+        customer_id: str,
+        tier: str,
+        interactive: bool,
+        factory: Callable[[], Awaitable[T]],
+        domain: Optional[str] = None,
+    ) -> T:
+        """Wait for a fair share of probe capacity and a slot on domain, then run factory()."""
+        with tracer.span("scheduler.wait", customer_id=customer_id, interactive=interactive) as span:
+            await self._acquire(customer_id, tier, INTERACTIVE if interactive else BULK, domain)
+            span.set(queue_depth=self.depth)
+        start = time.monotonic()
+        try:
+            return await factory()
+        finally:
+            self.service_time = 0.9 * self.service_time + 0.1 * (time.monotonic() - start)
+            self._release(domain)
+
+    @property
+    def depth(self) -> int:
+        """Probes waiting to start, including those parked on a busy domain."""
+        return sum(self.queued_by_lane.values())
+
+    def _domain_full(self, domain: Optional[str]) -> bool:
+        return domain is not None and self.in_flight_by_domain[domain] >= self.domain_limit
+
+    def _start(self, domain: Optional[str]) -> None:
+        self.in_flight += 1
+        if domain is not None:
+            self.in_flight_by_domain[domain] += 1
+
+    def _release(self, domain: Optional[str]) -> None:
+        self.in_flight -= 1
+        if domain is not None:
+            self.in_flight_by_domain[domain] -= 1
+            if not self.in_flight_by_domain[domain]:
+                del self.in_flight_by_domain[domain]
+            parked = self.parked.get(domain)
+            while parked:
+                # The domain has a free slot: its best live parked probe competes again
+                entry = heapq.heappop(parked)
+                heapq.heappush(self.queue, entry)
+                if not entry[3].done():
+                    break
+            if domain in self.parked and not parked:
+                del self.parked[domain]
+        self._dispatch()
+
+    async def _acquire(self, customer_id: str, tier: str, lane: int, domain: Optional[str]) -> None:
+        if self.in_flight < self.capacity and not self.queue and not self._domain_full(domain):
+            self._start(domain)
+            self._tag(customer_id, tier)
+            return
+
+        if self.depth >= self.max_queue:
+            raise SchedulerFull(self.expected_wait(lane))
+
+        start_tag = self._tag(customer_id, tier)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.queue, (lane, start_tag, next(self.seq), future, customer_id, domain))
+        self.queued_by_customer[customer_id] += 1
+        self.queued_by_lane[lane] += 1
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we were cancelled; hand it on
+                self._release(domain)
+            raise
+
+    def _tag(self, customer_id: str, tier: str) -> float:
+        weight = QUOTA_LIMITS.get(tier, QUOTA_LIMITS["default"]).get("weight", 1)
+        start_tag = max(self.vtime, self.last_tag.get(customer_id, 0.0))
+        self.last_tag[customer_id] = start_tag + 1.0 / weight
+        return start_tag
+
+    def _dispatch(self) -> None:
+        while self.queue and self.in_flight < self.capacity:
+            entry = heapq.heappop(self.queue)
+            lane, start_tag, _, future, customer_id, domain = entry
+            if not future.done() and self._domain_full(domain):
+                heapq.heappush(self.parked.setdefault(domain, []), entry)
+                continue
+            self.queued_by_customer[customer_id] -= 1
+            if not self.queued_by_customer[customer_id]:
+                del self.queued_by_customer[customer_id]
+            self.queued_by_lane[lane] -= 1
+            if future.done():
+                continue  # Waiter gave up (deadline, hedge lost)
+            self.vtime = max(self.vtime, start_tag)
+            self._start(domain)
+            future.set_result(None)
+
+        if not self.queue and not self.in_flight:
+            # Idle: drop per-customer tags so the dict does not grow forever
+            self.last_tag.clear()
+            self.vtime = 0.0
+
+    def expected_wait(self, lane: int = BULK) -> float:
+        """Rough seconds until a new request in `lane` starts."""
+        ahead = self.queued_by_lane[INTERACTIVE]
+        if lane == BULK:
+            ahead += self.queued_by_lane[BULK]
+        if self.in_flight < self.capacity and not ahead:
+            return 0.0
+        return (ahead + 1) * self.service_time / self.capacity
+
+    def backpressure(self, customer_id: str, interactive: bool = False) -> Dict:
+        """Signals returned to clients so they can pace submissions."""
+        return {
+            "queue_depth": self.depth,
+            "customer_queue_depth": self.queued_by_customer.get(customer_id, 0),
+            "in_flight": self.in_flight,
+            "capacity": self.capacity,
+            "expected_wait_ms": int(self.expected_wait(INTERACTIVE if interactive else BULK) * 1000),
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "queue_depth": self.depth,
+            "parked": sum(len(parked) for parked in self.parked.values()),
+            "interactive_queued": self.queued_by_lane[INTERACTIVE],
+            "bulk_queued": self.queued_by_lane[BULK],
+            "customers_queued": len(self.queued_by_customer),
+            "in_flight": self.in_flight,
+            "capacity": self.capacity,
+            "busy_domains": len(self.in_flight_by_domain),
+            "domain_limit": self.domain_limit,
+            "service_time_ms": int(self.service_time * 1000),
+        }
+
+probe_scheduler = ProbeScheduler()
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import AnyHttpUrl, BaseModel, EmailStr, Field, validator
 from typing import List, Optional, Dict
 from enum import Enum
+from .core.webhooks import check_callback_host
 
 class StatusEnum(str, Enum):
     VALID = "valid"
@@ -13,12 +14,53 @@ class SourceEnum(str, Enum):
     PROBE_ENGINE = "probe_engine"
     SYSTEM = "system"
     CACHE = "cache"
+    PREFILTER = "prefilter"
+
+class ModeEnum(str, Enum):
+    HYBRID = "hybrid"
+    OMKAR_ONLY = "omkar_only"
+    PROBE_ONLY = "probe_only"
+
+class DeadlineActionEnum(str, Enum):
+    PARTIAL = "partial"
+    QUEUE = "queue"
+
+class PriorityEnum(str, Enum):
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+class ResponseFormatEnum(str, Enum):
+    ROWS = "rows"
+    COLUMNAR = "columnar"
+
+class ExportFormatEnum(str, Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
 
 class VerifyRequest(BaseModel):
     emails: List[EmailStr] = Field(..., min_items=1, max_items=1000)
     customer_id: str = Field(..., min_length=1, max_length=255)
     use_probe: bool = Field(default=True, description="Enable probe engine for catch-all detection")
+    mode: Optional[ModeEnum] = Field(default=None, description="Execution policy; defaults to hybrid, or omkar_only when use_probe is false")
+    deadline_ms: Optional[int] = Field(default=None, ge=100, le=600000, description="Latency budget for the whole request")
+    on_deadline: DeadlineActionEnum = Field(default=DeadlineActionEnum.PARTIAL, description="Return partial results or queue remaining probes when the budget runs out")
+    callback_url: Optional[AnyHttpUrl] = Field(default=None, description="Return a job_id immediately and POST results here in batches")
+    priority: Optional[PriorityEnum] = Field(default=None, description="Probe scheduling lane; defaults to interactive for small or deadline-bound synchronous requests")
     ip_index: Optional[int] = Field(default=None, description="IP pool index to use")
+    export_format: Optional[ExportFormatEnum] = Field(default=None, description="Also write job results (callback or queued probes) to a compressed file, see /jobs/{job_id}/export")
+    response_format: ResponseFormatEnum = Field(default=ResponseFormatEnum.ROWS, description="columnar returns one list per result field instead of a list of results")
+
+    @validator("callback_url")
+    def callback_url_is_public(cls, url):
+        if url is not None:
+            check_callback_host(url.host)
+        return url
+
+    @property
+    def execution_mode(self) -> ModeEnum:
+        if self.mode is not None:
+            return self.mode
+        return ModeEnum.HYBRID if self.use_probe else ModeEnum.OMKAR_ONLY
 
 class SignalsModel(BaseModel):
     fake_rejected: Optional[bool] = None
@@ -39,8 +81,40 @@ class VerifyResult(BaseModel):
     signals: Optional[SignalsModel] = None
     processing_time_ms: Optional[float] = None
 
+class BackpressureModel(BaseModel):
+    queue_depth: int
+    customer_queue_depth: int
+    in_flight: int
+    capacity: int
+    expected_wait_ms: int
+
 class VerifyResponse(BaseModel):
     results: List[VerifyResult]
     total_processed: int
     total_errors: int
-    processing_time_ms: float
\ No newline at end of file
+    processing_time_ms: float
+    job_id: Optional[str] = None
+    pending: int = 0
+    backpressure: Optional[BackpressureModel] = None
+    trace_id: Optional[str] = None
+
+class ShardProbeRequest(BaseModel):
+    """A probe forwarded to the worker that owns its domain."""
+    email: str
+    customer_id: str
+    tier: str = "default"
+    interactive: bool = False
+    budget_ms: Optional[int] = Field(default=None, description="Caller's remaining latency budget; the owner gives up after it")
+
+class FeedbackTypeEnum(str, Enum):
+    BOUNCE = "bounce"
+    FALSE_POSITIVE = "false_positive"
+
+class FeedbackEvent(BaseModel):
+    type: FeedbackTypeEnum = FeedbackTypeEnum.BOUNCE
+    email: Optional[str] = None
+    domain: Optional[str] = None
+    ip: Optional[str] = Field(default=None, description="Sending IP, for IP health tracking")
+
+class FeedbackRequest(BaseModel):
+    events: List[FeedbackEvent] = Field(..., min_items=1, max_items=10000)
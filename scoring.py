@@ -1,6 +1,5 @@
 from typing import Dict
-from ..signals.provider import provider_caps
-from ..protection.reputation import reputation
+from ..core.domain_cache import domain_cache
 
 class ScoringEngine:
     """
@@ -13,14 +12,20 @@ class ScoringEngine:
         Compute confidence (0-100) from signals.
         
         Scoring logic:
+        - Real address refused or deferred (non-2xx)? 0 — nothing to score
         - Start at 50
         - Fake address rejected? +45 (95 total) — strong indicator
         - Queue ID detected? +20 — indicates legitimate server
-        - Timing ratio > 1.4? +15 — real takes longer to verify
+        - Timing verdict valid? +15 — real takes longer than the learned fake baseline
         - SPF strict (-all)? +5 — domain controls email
         - Cap by provider (Gmail max 70, etc.)
         - Cap by domain reputation (false positive rate, bounces)
         """
+        # ===== REAL ADDRESS NOT ACCEPTED =====
+        real_code = signals.get("real_code")
+        if real_code is not None and not 200 <= real_code < 300:
+            return 0
+        
         score = 50
         
         # ===== CATCH-ALL DETECTION (Fake rejected) =====
@@ -33,10 +38,10 @@ class ScoringEngine:
             score += 20
         
         # ===== TIMING RATIO =====
-        ratio = signals.get("timing_ratio", {}).get("ratio", 1.0)
-        if ratio > 1.4:
+        timing_status = signals.get("timing_ratio", {}).get("status")
+        if timing_status == "valid":
             score += 15
-        elif ratio < 0.8:
+        elif timing_status == "catch_all":
             score -= 10  # Penalize catch-all-like timing
         
         # ===== SPF SIGNAL =====
@@ -49,11 +54,10 @@ class ScoringEngine:
     def _apply_caps(self, score: int, domain: str) -> int:
         """Apply provider and reputation caps."""
         # Provider cap
-        score = provider_caps.apply_cap(score, domain)
+        score = min(score, domain_cache.get_sync(domain, "provider_cap"))
         
         # Reputation cap
-        rep = reputation.get_reputation(domain)
-        score = min(score, rep["confidence_cap"])
+        score = min(score, domain_cache.get_sync(domain, "reputation_cap"))
         
         return max(0, min(100, score))
 
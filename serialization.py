@@ -0,0 +1,65 @@
+import json
+from typing import Any, Dict, List
+from fastapi.responses import JSONResponse
+from .schemas import VerifyResponse, VerifyResult, SignalsModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+ROW_FIELDS = list(VerifyResult.__fields__)
+RESULT_FIELDS = [name for name in ROW_FIELDS if name != "signals"]
+SIGNAL_FIELDS = list(SignalsModel.__fields__)
+
+def dumps(content: Any) -> bytes:
+    """JSON-encode to bytes with orjson when installed, else compact stdlib json."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode()
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (falls back to json)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def to_rows(results: List[VerifyResult]) -> List[Dict]:
+    """Same as [r.dict() for r in results], without pydantic's recursive walk."""
+    rows = []
+    for result in results:
+        row = {name: getattr(result, name) for name in ROW_FIELDS}
+        signals = row["signals"]
+        if signals is not None:
+            row["signals"] = {name: getattr(signals, name) for name in SIGNAL_FIELDS}
+        rows.append(row)
+    return rows
+
+def to_columns(results: List[VerifyResult]) -> Dict[str, list]:
+    """
+    Column-per-field layout: one list per result field, signals flattened
+    to signal_<name> columns. Field names are sent once instead of once
+    per row, which roughly halves the payload of a large batch.
+    """
+    columns: Dict[str, list] = {name: [] for name in RESULT_FIELDS}
+    columns.update({f"signal_{name}": [] for name in SIGNAL_FIELDS})
+    for result in results:
+        for name in RESULT_FIELDS:
+            columns[name].append(getattr(result, name))
+        signals = result.signals
+        for name in SIGNAL_FIELDS:
+            columns[f"signal_{name}"].append(getattr(signals, name) if signals is not None else None)
+    return columns
+
+def render_verify_response(response: VerifyResponse, columnar: bool = False) -> FastJSONResponse:
+    """
+    Serialize a VerifyResponse whose results were already validated when
+    they were built. Returning a Response skips FastAPI's second
+    validation pass and jsonable_encoder walk over every result.
+    """
+    if columnar:
+        content = {"format": "columnar", "columns": to_columns(response.results)}
+    else:
+        content = {"results": to_rows(response.results)}
+    content.update(response.dict(exclude={"results"}))
+    return FastJSONResponse(content=content)
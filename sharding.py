@@ -0,0 +1,183 @@
+import asyncio
+import bisect
+import hashlib
+import hmac
+import logging
+import time
+import httpx
+import redis
+from typing import Dict, List, Optional, Set
+from ..config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, SHARD_SELF_URL, SHARD_KEY, SHARD_VNODES,
+    SHARD_HEARTBEAT_INTERVAL, SHARD_HEARTBEAT_TTL, SHARD_FORWARD_TIMEOUT, SHARD_TOKEN,
+)
+from ..core.domain_cache import domain_cache
+
+logger = logging.getLogger(__name__)
+
+MEMBERS_KEY = "shard:workers"
+TOKEN_HEADER = "X-Bounso-Shard-Token"
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+class ShardRing:
+    """Consistent-hash ring with virtual nodes; a join or leave moves ~1/N of keys."""
+
+    def __init__(self, vnodes: int = SHARD_VNODES):
+        self.vnodes = vnodes
+        self.nodes: Set[str] = set()
+        self.points: List[int] = []
+        self.owners: List[str] = []
+
+    def rebuild(self, nodes: Set[str]) -> None:
+        ring = sorted(
+            (_hash(f"{node}#{i}"), node) for node in nodes for i in range(self.vnodes)
+        )
+        self.nodes = set(nodes)
+        self.points = [point for point, _ in ring]
+        self.owners = [node for _, node in ring]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self.points:
+            return None
+        i = bisect.bisect(self.points, _hash(key)) % len(self.points)
+        return self.owners[i]
+
+class ShardRouter:
+    """
+    Routes probe work to the worker that owns the domain (or its MX
+    host, SHARD_KEY=mx), so breaker state, caches and per-domain limits
+    for a domain live on one node.
+
+    Workers announce themselves with a heartbeat in a Redis sorted set
+    (scored by time); those silent for SHARD_HEARTBEAT_TTL leave the
+    ring and their keys move to the remaining workers. Sharding is off
+    when SHARD_SELF_URL is unset: every probe runs locally.
+    """
+
+    def __init__(
+        self,
+        self_url: str = SHARD_SELF_URL,
+        token: str = SHARD_TOKEN,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.r = redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True
+        )
+        self.self_url = self_url.rstrip("/")
+        self.token = token
+        self.ring = ShardRing()
+        self.transport = transport
+        self.client: Optional[httpx.AsyncClient] = None
+        self.task: Optional[asyncio.Task] = None
+        self.counters = {"local": 0, "forwarded": 0, "forward_errors": 0, "rebalances": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.self_url)
+
+    def start(self) -> None:
+        if self.enabled and not self.token:
+            # /internal/probe skips the quota and prefilter gates
+            raise RuntimeError("SHARD_SELF_URL is set but SHARD_TOKEN is empty")
+        if self.enabled and (self.task is None or self.task.done()):
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        """Leave the ring at once so peers stop forwarding here while we drain."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.enabled:
+            try:
+                await asyncio.to_thread(self.r.zrem, MEMBERS_KEY, self.self_url)
+            except Exception as e:
+                logger.warning(f"Shard leave failed: {e}")
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def run(self) -> None:
+        """Background heartbeat and membership refresh."""
+        while True:
+            try:
+                await asyncio.to_thread(self.heartbeat)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Shard heartbeat error: {e}")
+            await asyncio.sleep(SHARD_HEARTBEAT_INTERVAL)
+
+    def heartbeat(self) -> None:
+        now = time.time()
+        pipe = self.r.pipeline()
+        pipe.zadd(MEMBERS_KEY, {self.self_url: now})
+        pipe.zremrangebyscore(MEMBERS_KEY, 0, now - SHARD_HEARTBEAT_TTL)
+        pipe.zrange(MEMBERS_KEY, 0, -1)
+        members = set(pipe.execute()[-1])
+        if members != self.ring.nodes:
+            logger.info(f"Shard ring now {sorted(members)}")
+            self.ring.rebuild(members)
+            self.counters["rebalances"] += 1
+
+    async def key_for(self, domain: str) -> str:
+        if SHARD_KEY == "mx":
+            mx_host = await domain_cache.get(domain, "mx")
+            if mx_host:
+                return mx_host.lower().rstrip(".")
+        return domain
+
+    def owner(self, key: str) -> Optional[str]:
+        """Peer URL that owns key, or None when it is ours (or sharding is off)."""
+        if not self.enabled:
+            return None
+        owner = self.ring.owner(key)
+        if owner is None or owner == self.self_url:
+            self.counters["local"] += 1
+            return None
+        return owner
+
+    def authorized(self, token: str) -> bool:
+        """Check a peer's token; always False while no token is configured."""
+        return bool(self.token) and hmac.compare_digest(token, self.token)
+
+    async def forward(self, owner: str, payload: Dict) -> Dict:
+        """
+        Run a probe on its owner. A peer that cannot be reached is dropped
+        from the ring until its next heartbeat shows up; the caller then
+        probes locally.
+        """
+        try:
+            response = await self._get_client().post(
+                f"{owner}/internal/probe", json=payload, headers={TOKEN_HEADER: self.token}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError:
+            self.counters["forward_errors"] += 1
+            self.ring.rebuild(self.ring.nodes - {owner})
+            raise
+        self.counters["forwarded"] += 1
+        return response.json()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=SHARD_FORWARD_TIMEOUT, transport=self.transport)
+        return self.client
+
+    def stats(self) -> Dict:
+        return dict(
+            self.counters,
+            enabled=self.enabled,
+            self_url=self.self_url or None,
+            workers=sorted(self.ring.nodes),
+        )
+
+shard_router = ShardRouter()
@@ -0,0 +1,119 @@
+import asyncio
+from collections import namedtuple
+from typing import Dict, List, Optional
+from ..core.tracing import traced, current_span
+
+SMTPReply = namedtuple("SMTPReply", ["code", "message"])
+
+class SMTPSessionError(Exception):
+    """Unexpected or malformed reply, or the server hung up."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.message = message
+
+class SMTPSession:
+    """
+    Minimal SMTP client for probing: greeting, EHLO and plain commands,
+    plus PIPELINING (RFC 2920) groups written at once and read back as a
+    batch. aiosmtplib expects exactly one reply per write and drops the
+    rest, so it cannot pipeline.
+
+    Every read is bounded by `timeout` (asyncio.TimeoutError).
+    """
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.extensions: Dict[str, str] = {}
+
+    async def __aenter__(self) -> "SMTPSession":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.quit()
+
+    @traced("smtp.connect")
+    async def connect(self) -> SMTPReply:
+        """Open the connection and return the 220 greeting."""
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        greeting = await self._read_reply()
+        current_span().set(host=self.host, code=greeting.code)
+        if greeting.code != 220:
+            raise SMTPSessionError(greeting.code, greeting.message)
+        return greeting
+
+    async def ehlo(self, hostname: str) -> SMTPReply:
+        """EHLO, recording advertised extensions (lowercased keyword -> params)."""
+        reply = await self.command(f"EHLO {hostname}")
+        if reply.code != 250:
+            raise SMTPSessionError(reply.code, reply.message)
+        self.extensions = {}
+        for line in reply.message.splitlines()[1:]:
+            keyword, _, params = line.strip().partition(" ")
+            if keyword:
+                self.extensions[keyword.lower()] = params
+        return reply
+
+    def supports(self, extension: str) -> bool:
+        return extension.lower() in self.extensions
+
+    @traced("smtp.command")
+    async def command(self, line: str) -> SMTPReply:
+        """One command, one round trip."""
+        self._write(line)
+        await self.writer.drain()
+        reply = await self._read_reply()
+        current_span().set(verb=line.split(" ", 1)[0], code=reply.code)
+        return reply
+
+    @traced("smtp.pipeline")
+    async def pipeline(self, lines: List[str]) -> List[SMTPReply]:
+        """Write a command group at once and read its replies in order."""
+        for line in lines:
+            self._write(line)
+        await self.writer.drain()
+        replies = [await self._read_reply() for _ in lines]
+        current_span().set(
+            verbs=[line.split(" ", 1)[0] for line in lines], codes=[r.code for r in replies]
+        )
+        return replies
+
+    async def quit(self) -> None:
+        if self.writer is None:
+            return
+        try:
+            if not self.writer.is_closing():
+                await self.command("QUIT")
+        except (OSError, asyncio.TimeoutError, SMTPSessionError):
+            pass
+        finally:
+            self.writer.close()
+            self.writer = None
+
+    def _write(self, line: str) -> None:
+        if "\r" in line or "\n" in line:
+            raise ValueError("SMTP command contains a line break")
+        self.writer.write(f"{line}\r\n".encode())
+
+    async def _read_reply(self) -> SMTPReply:
+        """Read one (possibly multiline) reply."""
+        lines = []
+        while True:
+            raw = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if not raw:
+                raise SMTPSessionError(-1, "Connection closed by server")
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            try:
+                code = int(line[:3])
+            except ValueError:
+                raise SMTPSessionError(-1, f"Malformed reply: {line[:80]}") from None
+            lines.append(line[4:].strip())
+            if line[3:4] != "-":
+                return SMTPReply(code, "\n".join(lines))
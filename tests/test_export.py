@@ -0,0 +1,105 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+from app.core.export import CsvGzipEncoder, ResultExporter, EXPORT_COLUMNS
+
+def result(i, signals=None):
+    return {
+        "email": f"user{i}@example.com",
+        "status": "valid" if i % 2 else "risky",
+        "deliverable": True if i % 2 else None,
+        "confidence": 90 if i % 2 else 40,
+        "catch_all": False,
+        "retry_after": None,
+        "source": "omkar",
+        "reason": "verified, \"quoted\"",
+        "processing_time_ms": 12.5,
+        "signals": signals,
+    }
+
+def encode_parts(batches):
+    parts = []
+    for n, batch in enumerate(batches):
+        encoder = CsvGzipEncoder(header=n == 0)
+        encoder.write(batch)
+        parts.append(encoder.finish())
+    return parts
+
+def read_csv(data: bytes):
+    return list(csv.reader(io.StringIO(gzip.decompress(data).decode())))
+
+def test_parts_concatenate_into_one_csv_gz():
+    batches = [[result(i) for i in range(start, start + 50)] for start in (0, 50, 100)]
+    rows = read_csv(b"".join(encode_parts(batches)))
+
+    assert rows[0] == [name for name, _ in EXPORT_COLUMNS]
+    assert [row[0] for row in rows[1:]] == [f"user{i}@example.com" for i in range(150)]
+
+def test_each_part_is_a_standalone_gzip_member():
+    first, second = encode_parts([[result(0)], [result(1)]])
+    assert len(read_csv(first)) == 2  # Header + row
+    assert read_csv(second)[0][0] == "user1@example.com"  # No header after the first part
+
+def test_values_and_signals_are_flattened():
+    encoder = CsvGzipEncoder(header=True)
+    encoder.write([result(1, signals={"fake_rejected": True, "mta": "postfix", "timing_ratio": 1.7})])
+    header, row = read_csv(encoder.finish())
+    values = dict(zip(header, row))
+
+    assert encoder.rows == 1
+    assert values["deliverable"] == "true"
+    assert values["retry_after"] == ""
+    assert values["reason"] == "verified, \"quoted\""
+    assert values["signal_fake_rejected"] == "true"
+    assert values["signal_mta"] == "postfix"
+    assert values["signal_timing_ratio"] == "1.7"
+    assert values["signal_queue_id"] == ""
+
+class FakeRedis:
+    """The hash commands ResultExporter._fail uses, in memory."""
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+class RecordingSink:
+    def __init__(self):
+        self.aborted = []
+        self.deleted = []
+
+    async def abort(self, key, upload_id):
+        self.aborted.append((key, upload_id))
+
+    async def delete(self, key):
+        self.deleted.append(key)
+
+def fail_export(fmt, upload_id=""):
+    sink = RecordingSink()
+    exporter = ResultExporter(sink=sink)
+    exporter.r = FakeRedis({"export:job1": {
+        "format": fmt,
+        "key": f"cust/job1/results.{fmt}",
+        "upload_id": upload_id,
+        "parts": json.dumps([{"part_number": 1}, {"part_number": 2}]),
+    }})
+    asyncio.run(exporter._fail("job1", "job failed"))
+    return sink, exporter.r.hashes["export:job1"]
+
+def test_failed_parquet_export_deletes_written_parts():
+    sink, manifest = fail_export("parquet")
+    assert sink.deleted == ["cust/job1/results.parquet/part-00001.parquet", "cust/job1/results.parquet/part-00002.parquet"]
+    assert manifest["status"] == "failed"
+
+def test_failed_csv_export_aborts_the_upload():
+    sink, manifest = fail_export("csv", upload_id="up1")
+    assert sink.aborted == [("cust/job1/results.csv", "up1")]
+    assert not sink.deleted
+    assert manifest["status"] == "failed"
@@ -0,0 +1,60 @@
+import asyncio
+
+from app.core.hedge import hedge
+from app.core.omkar_dispatcher import OmkarDispatcher
+
+def latency(i):
+    """Omkar response times: 90% at 5ms, a tail spread over 10-100ms."""
+    k = i * 37 % 100
+    return 0.005 if k < 90 else 0.01 * (k - 89)
+
+class SteadyOmkar:
+    """Healthy Omkar: every lookup answers, none throttled."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def verify(self, email):
+        self.calls += 1
+        await asyncio.sleep(latency(self.calls))
+        return {"is_valid": True, "catch_all": False}
+
+def test_backlog_does_not_trigger_hedges():
+    async def scenario():
+        dispatcher = OmkarDispatcher(client=SteadyOmkar(), max_rps=100000, concurrency=10)
+        dispatcher.latencies.extend(latency(i) for i in range(200))
+        backups = []
+
+        async def backup():
+            backups.append(1)
+            return None
+
+        async def hedged(email):
+            result, sent = dispatcher.submit(email)
+            return await hedge(
+                result, backup, dispatcher.hedge_delay(),
+                primary_usable=lambda r: True, backup_usable=lambda r: False, started=sent,
+            )
+
+        # 300 lookups through 10 connections: most wait far longer than p95 to be sent
+        outcomes = await asyncio.gather(*(hedged(f"user{i}@example.com") for i in range(300)))
+        return outcomes, len(backups)
+
+    outcomes, backups = asyncio.run(scenario())
+    assert all(winner == "primary" for winner, _ in outcomes)
+    assert 0.02 <= backups / len(outcomes) <= 0.08  # ~5%: only lookups slower than p95 once sent
+
+def test_primary_failing_before_it_is_sent_starts_the_backup():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        primary, started = loop.create_future(), loop.create_future()
+        primary.set_exception(ConnectionError("omkar unreachable"))
+
+        async def backup():
+            return "probed"
+
+        return await hedge(
+            primary, backup, 10.0, primary_usable=lambda r: True, backup_usable=lambda r: True, started=started,
+        )
+
+    assert asyncio.run(scenario()) == ("backup", "probed")
@@ -0,0 +1,50 @@
+import re
+
+import pytest
+
+from app.signals.matcher import PatternMatcher
+
+def test_earlier_pattern_wins_even_when_it_matches_further_right():
+    matcher = PatternMatcher([(r"ID=[A-Z0-9]{6}", "custom"), (r"[0-9A-F]{10}", "hex")])
+    assert matcher.search("queued as 3C5F21A0B7 ID=ABC123") == ("custom", "ID=ABC123")
+
+def test_falls_back_to_the_leftmost_match_of_the_winning_pattern():
+    matcher = PatternMatcher([(r"nomatch", "first"), (r"\d+", "digits")])
+    assert matcher.search("a 12 b 345") == ("digits", "12")
+
+@pytest.mark.parametrize("text", [
+    "2.0.0 Ok: queued as 3C5F21A0B7",
+    "250 OK id=1qAbCd-0005xY-Zz 3C5F21A0B7",
+    "nothing here",
+    "",
+])
+def test_same_result_as_trying_patterns_in_order(text):
+    patterns = [(r"id=\S+", "exim"), (r"[0-9A-F]{10,14}", "postfix_hex"), (r"[A-Za-z0-9]{14,}", "generic")]
+    expected = None
+    for pattern, name in patterns:
+        match = re.search(pattern, text)
+        if match:
+            expected = (name, match.group(0))
+            break
+    assert PatternMatcher(patterns).search(text) == expected
+
+def test_keywords_are_case_insensitive_substrings():
+    matcher = PatternMatcher.from_keywords([("exchange", ["microsoft esmtp"]), ("postfix", ["postfix"])])
+    assert matcher.search("mx.example.com ESMTP Postfix")[0] == "postfix"
+    assert matcher.search("EXCH01 Microsoft ESMTP MAIL Service ready")[0] == "exchange"
+    assert matcher.search("smtp.example.net ESMTP") is None
+
+def test_results_are_memoized():
+    matcher = PatternMatcher([(r"\d+", "digits")])
+    matcher.search("abc 123")
+    matcher.search("abc 123")
+    assert matcher.cache_info().hits == 1
+
+@pytest.mark.parametrize("name", ["bad-name", "1digit", "has space", ""])
+def test_rejects_invalid_group_names(name):
+    with pytest.raises(ValueError):
+        PatternMatcher([(r"x", name)])
+
+def test_rejects_duplicate_names():
+    with pytest.raises(ValueError):
+        PatternMatcher([(r"x", "dup"), (r"y", "dup")])
@@ -0,0 +1,72 @@
+import pytest
+
+from app.config import (
+    FAKE_PROBES_COLD, FAKE_PROBES_WARM, FAKE_PROBES_MAX, PROBE_HISTORY_MIN_PROBES,
+)
+from app.core.probe_strategy import ProbeStrategy
+
+TIMED = {"supports_timing": True}
+UNTIMED = {"supports_timing": False}
+WARM = {"source": "mx"}
+COLD = {"source": None}
+AMBIGUOUS = {"status": "ambiguous"}
+SETTLED = {"status": "valid"}
+
+def test_plan_untimed_mta_gets_one_fake():
+    assert ProbeStrategy().plan("example.com", UNTIMED, COLD) == {
+        "min_fakes": 1, "max_fakes": 1, "basis": "untimed",
+    }
+
+@pytest.mark.parametrize("baseline, min_fakes", [(WARM, FAKE_PROBES_WARM), (COLD, FAKE_PROBES_COLD)])
+def test_plan_timed_mta_uses_baseline_warmth(baseline, min_fakes):
+    plan = ProbeStrategy().plan("example.com", TIMED, baseline)
+    assert plan == {
+        "min_fakes": min_fakes, "max_fakes": max(min_fakes, FAKE_PROBES_MAX), "basis": "timing",
+    }
+
+def test_plan_domain_that_rejects_fakes_gets_one():
+    strategy = ProbeStrategy()
+    plan = strategy.plan("strict.example", TIMED, COLD)
+    for _ in range(PROBE_HISTORY_MIN_PROBES):
+        strategy.record("strict.example", plan, [550], "valid")
+    assert strategy.plan("strict.example", TIMED, COLD)["basis"] == "rejects_fakes"
+
+@pytest.mark.parametrize("code", [450, 451, 251, 252])
+def test_non_5xx_first_fake_is_not_a_reject(code):
+    strategy = ProbeStrategy()
+    plan = strategy.plan("grey.example", TIMED, COLD)
+    for _ in range(PROBE_HISTORY_MIN_PROBES):
+        strategy.record("grey.example", plan, [code, 250], "valid")
+    assert strategy.get_history("grey.example")["rejects"] == 0
+    assert strategy.plan("grey.example", TIMED, COLD)["basis"] == "timing"
+
+def test_plan_drops_extra_fakes_that_never_resolve_timing():
+    strategy = ProbeStrategy()
+    plan = strategy.plan("noisy.example", TIMED, WARM)
+    for _ in range(PROBE_HISTORY_MIN_PROBES):
+        strategy.record("noisy.example", plan, [250] * FAKE_PROBES_MAX, "ambiguous")
+    assert strategy.plan("noisy.example", TIMED, WARM) == {
+        "min_fakes": FAKE_PROBES_WARM, "max_fakes": FAKE_PROBES_WARM, "basis": "extras_unhelpful",
+    }
+
+def test_history_is_bounded():
+    strategy = ProbeStrategy(max_domains=2)
+    plan = {"min_fakes": 1, "max_fakes": 1, "basis": "untimed"}
+    for domain in ("a.example", "b.example", "c.example"):
+        strategy.record(domain, plan, [250], None)
+    assert strategy.get_history("a.example") is None
+    assert strategy.get_history("c.example") is not None
+
+PLAN = {"min_fakes": 2, "max_fakes": 4, "basis": "timing"}
+
+@pytest.mark.parametrize("fake_codes, timing, expected", [
+    ([550], None, False),  # Definitive rejection settles it, even below the minimum
+    ([250], AMBIGUOUS, True),  # Below the minimum
+    ([450], None, True),  # A deferral is not a rejection
+    ([250, 250], AMBIGUOUS, True),  # At the minimum, timing still ambiguous
+    ([250, 250], SETTLED, False),
+    ([250, 250], None, False),
+    ([250] * 4, AMBIGUOUS, False),  # Maximum reached
+])
+def test_next_fake(fake_codes, timing, expected):
+    assert ProbeStrategy().next_fake(PLAN, fake_codes, timing) is expected
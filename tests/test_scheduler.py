@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.core import lifecycle
+from app.protection.scheduler import ProbeScheduler, SchedulerFull
+
+class Probes:
+    """Probe factories that run until released, recording start order per domain."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.started = []
+        self.active = {}
+        self.peak = {}
+        self.gates = {}
+
+    def submit(self, name, domain, customer_id="bulk", tier="default", interactive=False):
+        gate = self.gates[name] = asyncio.Event()
+
+        async def probe():
+            self.started.append(name)
+            self.active[domain] = self.active.get(domain, 0) + 1
+            self.peak[domain] = max(self.peak.get(domain, 0), self.active[domain])
+            await gate.wait()
+            self.active[domain] -= 1
+
+        return asyncio.ensure_future(self.scheduler.run(customer_id, tier, interactive, probe, domain=domain))
+
+    async def finish(self, name):
+        self.gates[name].set()
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+def test_interactive_probe_overtakes_bulk_on_a_saturated_domain():
+    async def scenario():
+        scheduler = ProbeScheduler(capacity=10, domain_limit=2)
+        probes = Probes(scheduler)
+        tasks = [probes.submit(f"bulk{i}", "busy.example") for i in range(100)]
+        await asyncio.sleep(0)
+        tasks.append(probes.submit("vip", "busy.example", "vip", "high_tier", interactive=True))
+        await asyncio.sleep(0)
+
+        assert probes.started == ["bulk0", "bulk1"]
+        assert scheduler.stats()["parked"] == 99
+        await probes.finish("bulk0")
+        assert probes.started[2] == "vip"
+
+        for gate in probes.gates.values():
+            gate.set()
+        await asyncio.gather(*tasks)
+        return scheduler, probes
+
+    scheduler, probes = asyncio.run(scenario())
+    assert probes.peak == {"busy.example": 2}
+    assert scheduler.stats()["queue_depth"] == scheduler.stats()["parked"] == 0
+    assert scheduler.in_flight == 0 and not scheduler.in_flight_by_domain
+
+def test_busy_domain_does_not_hold_capacity_from_others():
+    async def scenario():
+        scheduler = ProbeScheduler(capacity=4, domain_limit=1)
+        probes = Probes(scheduler)
+        tasks = [probes.submit(f"a{i}", "a.example") for i in range(5)]
+        tasks += [probes.submit(f"b{i}", "b.example") for i in range(5)]
+        tasks += [probes.submit("c0", "c.example")]
+        await asyncio.sleep(0)
+        started = sorted(probes.started)
+        for gate in probes.gates.values():
+            gate.set()
+        await asyncio.gather(*tasks)
+        return started, probes
+
+    started, probes = asyncio.run(scenario())
+    assert started == ["a0", "b0", "c0"]
+    assert probes.peak == {"a.example": 1, "b.example": 1, "c.example": 1}
+
+def test_cancelled_parked_probe_does_not_block_its_domain():
+    async def scenario():
+        scheduler = ProbeScheduler(capacity=4, domain_limit=1)
+        probes = Probes(scheduler)
+        first = probes.submit("first", "a.example")
+        abandoned = probes.submit("abandoned", "a.example")
+        last = probes.submit("last", "a.example")
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        await probes.finish("first")
+        started = list(probes.started)
+        await probes.finish("last")
+        await asyncio.gather(first, last)
+        return scheduler, started
+
+    scheduler, started = asyncio.run(scenario())
+    assert started == ["first", "last"]
+    assert scheduler.stats()["queue_depth"] == 0
+
+def test_parked_probes_count_towards_the_queue_limit():
+    async def scenario():
+        scheduler = ProbeScheduler(capacity=4, max_queue=3, domain_limit=1)
+        probes = Probes(scheduler)
+        tasks = [probes.submit(f"a{i}", "a.example") for i in range(4)]
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerFull):
+            await scheduler.run("bulk", "default", False, asyncio.sleep, domain="a.example")
+        for gate in probes.gates.values():
+            gate.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+def test_drain_waits_for_parked_probes(monkeypatch):
+    async def scenario():
+        scheduler = ProbeScheduler(capacity=4, domain_limit=1)
+        monkeypatch.setattr(lifecycle, "probe_scheduler", scheduler)
+        probes = Probes(scheduler)
+        tasks = [probes.submit(f"a{i}", "a.example") for i in range(3)]
+        await asyncio.sleep(0)
+        assert scheduler.depth == 2  # a1 and a2 parked behind a0
+        drained = await lifecycle.Lifecycle().drain(0.05)
+        for gate in probes.gates.values():
+            gate.set()
+        await asyncio.gather(*tasks)
+        return drained, await lifecycle.Lifecycle().drain(0.05)
+
+    assert asyncio.run(scenario()) == (False, True)
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.core.domain_cache import domain_cache
+from app.core.probe_engine import ProbeEngine
+from app.core.scoring import ScoringEngine
+
+DOMAIN = "scoring.example"
+
+@pytest.fixture(autouse=True)
+def uncapped():
+    domain_cache.set(DOMAIN, "provider_cap", 100)
+    domain_cache.set(DOMAIN, "reputation_cap", 100)
+    domain_cache.set(DOMAIN, "spf", {"present": True, "strict": False, "text": "v=spf1 ~all"})
+    yield
+    domain_cache.invalidate(DOMAIN)
+
+def signals(real_code, fake_codes, fake_rejected=None, timing="ambiguous", queue_id=False):
+    return {
+        "real_code": real_code,
+        "fake_codes": fake_codes,
+        "fake_rejected": fake_rejected,
+        "queue_id": {"detected": queue_id},
+        "timing_ratio": {"status": timing},
+        "spf_signal": {"strict": False},
+    }
+
+@pytest.mark.parametrize("real_code, fake_codes, fake_rejected, expected", [
+    (250, [550], True, 95),  # Real accepted, fake refused: not a catch-all
+    (250, [250, 250], None, 50),  # Both accepted: nothing to go on
+    (550, [550], True, 0),  # Everything refused: the mailbox does not exist
+    (550, [], None, 0),
+    (450, [], None, 0),  # Greylisted
+    (451, [450], None, 0),
+])
+def test_score_by_reply_codes(real_code, fake_codes, fake_rejected, expected):
+    assert ScoringEngine().score(signals(real_code, fake_codes, fake_rejected), DOMAIN) == expected
+
+def test_refused_real_address_is_never_valid_despite_other_signals():
+    score = ScoringEngine().score(
+        signals(550, [550], fake_rejected=True, timing="valid", queue_id=True), DOMAIN
+    )
+    assert score < 80
+
+class RejectingMX:
+    """ESMTP server that answers 550 to every RCPT TO."""
+
+    def __init__(self):
+        self.rcpts = []
+
+    async def handle(self, reader, writer):
+        writer.write(b"220 mx.scoring.example ESMTP Postfix\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            verb = line.decode().strip().upper()
+            if verb.startswith("EHLO"):
+                writer.write(b"250-mx.scoring.example\r\n250 PIPELINING\r\n")
+            elif verb.startswith("RCPT"):
+                self.rcpts.append(verb)
+                writer.write(b"550 5.1.1 User unknown\r\n")
+            elif verb.startswith("QUIT"):
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+def test_probe_stops_after_refused_real_rcpt():
+    async def probe():
+        mx = RejectingMX()
+        server = await asyncio.start_server(mx.handle, "127.0.0.1", 0)
+        domain_cache.set(DOMAIN, "mx", "127.0.0.1")
+        engine = ProbeEngine(port=server.sockets[0].getsockname()[1])
+        async with server:
+            result = await engine.verify(f"nobody@{DOMAIN}")
+        return result, mx.rcpts
+
+    result, rcpts = asyncio.run(probe())
+    assert result["status"] == "invalid"
+    assert result["reason"] == "mailbox_rejected"
+    assert result["confidence"] == 0
+    assert rcpts == [f"RCPT TO:<NOBODY@{DOMAIN.upper()}>"]  # No fake RCPT was sent
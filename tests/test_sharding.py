@@ -0,0 +1,58 @@
+import pytest
+
+from app.core.sharding import ShardRing, ShardRouter
+
+KEYS = [f"domain{i}.example" for i in range(5000)]
+NODES = {"http://w1:8000", "http://w2:8000", "http://w3:8000"}
+
+def owners(ring):
+    return {key: ring.owner(key) for key in KEYS}
+
+def test_empty_ring_has_no_owner():
+    assert ShardRing().owner("example.com") is None
+
+def test_owner_is_stable_across_rebuilds():
+    ring, other = ShardRing(), ShardRing()
+    ring.rebuild(NODES)
+    other.rebuild(set(sorted(NODES, reverse=True)))
+    assert owners(ring) == owners(other)
+
+def test_join_only_moves_keys_to_the_new_node():
+    ring = ShardRing()
+    ring.rebuild(NODES)
+    before = owners(ring)
+    ring.rebuild(NODES | {"http://w4:8000"})
+    after = owners(ring)
+
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == "http://w4:8000" for key in moved)
+    assert 0.15 < len(moved) / len(KEYS) < 0.35  # ~1/4
+
+def test_leave_only_moves_the_leaving_nodes_keys():
+    ring = ShardRing()
+    ring.rebuild(NODES)
+    before = owners(ring)
+    ring.rebuild(NODES - {"http://w2:8000"})
+    after = owners(ring)
+    assert all(before[key] == "http://w2:8000" for key in KEYS if before[key] != after[key])
+
+def test_every_node_gets_a_share():
+    ring = ShardRing()
+    ring.rebuild(NODES)
+    counts = {node: 0 for node in NODES}
+    for owner in owners(ring).values():
+        counts[owner] += 1
+    assert min(counts.values()) > len(KEYS) / len(NODES) / 2
+
+@pytest.mark.parametrize("configured, presented, expected", [
+    ("", "", False),  # No token configured: nothing is authorized
+    ("s3cret", "", False),
+    ("s3cret", "wrong", False),
+    ("s3cret", "s3cret", True),
+])
+def test_authorized(configured, presented, expected):
+    assert ShardRouter(self_url="http://w1:8000", token=configured).authorized(presented) is expected
+
+def test_sharding_requires_a_token():
+    with pytest.raises(RuntimeError):
+        ShardRouter(self_url="http://w1:8000", token="").start()
@@ -0,0 +1,106 @@
+import asyncio
+from collections import defaultdict
+
+import pytest
+
+from app.protection import usage
+from app.protection.usage import UsageMeter
+
+class FakeRedis:
+    """The hash commands UsageMeter pipelines, in memory."""
+
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+        self.ttls = {}
+        self.queued = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def hincrby(self, key, field, count):
+        self.queued.append(lambda: self.hashes[key].__setitem__(field, self.hashes[key].get(field, 0) + count))
+
+    def expire(self, key, seconds):
+        self.queued.append(lambda: self.ttls.__setitem__(key, seconds))
+
+    def hgetall(self, key):
+        self.queued.append(lambda: {f: str(v) for f, v in self.hashes.get(key, {}).items()})
+
+    def execute(self):
+        queued, self.queued = self.queued, []
+        return [command() for command in queued]
+
+NOW = 1_760_000_000  # 2025-10-09 08:53:20 UTC
+
+@pytest.fixture
+def meter(monkeypatch):
+    monkeypatch.setattr(usage.time, "time", lambda: NOW)
+    meter = UsageMeter()
+    meter.r = FakeRedis()
+    meter.record("cust", "Gmail.com", "omkar", 3)
+    meter.record("cust", "corp.example", "probe_engine")
+    meter.record("other", "gmail.com", "omkar")
+    asyncio.run(meter.flush())
+    return meter
+
+def test_buckets_are_aligned_to_the_resolution(meter):
+    result = meter.query("cust", NOW - 7200, NOW, resolution="hour")
+    assert result["start"] == (NOW - 7200) // 3600 * 3600
+    assert result["end"] == NOW // 3600 * 3600 + 3600
+    assert [b["start"] for b in result["buckets"]] == list(range(result["start"], result["end"], 3600))
+    assert result["buckets"][-1] == {"start": NOW // 3600 * 3600, "total": 4, "sources": {"omkar": 3, "probe_engine": 1}}
+
+def test_picks_the_finest_resolution_that_fits(meter):
+    assert meter.query("cust", NOW - 3600, NOW)["resolution"] == "minute"
+    assert meter.query("cust", NOW - 86400 * 30, NOW)["resolution"] == "hour"
+    assert meter.query("cust", NOW - 86400 * 365, NOW)["resolution"] == "day"
+
+def test_totals_match_across_resolutions(meter):
+    for resolution in ("minute", "hour", "day"):
+        result = meter.query("cust", NOW - 60, NOW, resolution=resolution)
+        assert result["total"] == 4
+        assert result["sources"] == {"omkar": 3, "probe_engine": 1}
+
+def test_domain_filter_and_top_domains(meter):
+    result = meter.query("cust", NOW - 60, NOW, domain="GMAIL.com")
+    assert result["total"] == 3
+    assert result["sources"] == {"omkar": 3}
+    assert "top_domains" not in result
+
+    top = meter.query("cust", NOW - 60, NOW)["top_domains"]
+    assert top == [{"domain": "gmail.com", "total": 3}, {"domain": "corp.example", "total": 1}]
+
+def test_global_rollup_spans_customers(meter):
+    result = meter.query(None, NOW - 60, NOW)
+    assert result["customer_id"] is None
+    assert result["total"] == 5
+
+def test_global_rollup_is_not_a_customer_key(meter):
+    meter.record("_all", "gmail.com", "omkar", 7)
+    asyncio.run(meter.flush())
+    assert meter.query(None, NOW - 60, NOW)["total"] == 12
+    assert meter.query("_all", NOW - 60, NOW)["total"] == 7
+    assert f"usage_global:day:{NOW // 86400 * 86400}" in meter.r.hashes
+
+def test_each_resolution_has_its_own_retention(meter):
+    for resolution, ttl in usage.USAGE_RETENTION.items():
+        step = usage.USAGE_RESOLUTIONS[resolution]
+        assert meter.r.ttls[f"usage:cust:{resolution}:{NOW // step * step}"] == ttl
+
+@pytest.mark.parametrize("start, end, resolution", [
+    (NOW, NOW - 60, None),  # Inverted range
+    (NOW - 86400 * 30, NOW, "minute"),  # Too many buckets
+    (NOW - 60, NOW, "week"),
+])
+def test_rejects_bad_ranges(meter, start, end, resolution):
+    with pytest.raises(ValueError):
+        meter.query("cust", start, end, resolution=resolution)
+
+def test_failed_flush_keeps_counts(monkeypatch):
+    meter = UsageMeter()
+    meter.r = FakeRedis()
+    meter.r.execute = lambda: (_ for _ in ()).throw(ConnectionError("redis down"))
+    meter.record("cust", "gmail.com", "omkar", 2)
+    asyncio.run(meter.flush())
+    assert meter.stats()["buffered"] == 2
+    assert meter.stats()["flush_errors"] == 1
@@ -1,68 +1,92 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from statistics import mean, stdev
+from ..config import TIMING_Z_THRESHOLD, TIMING_MIN_CV
 
 class TimingAnalyzer:
     """
     Analyzes SMTP response timing to detect catch-all vs bounced email.
     Catch-all servers respond consistently; bounce servers respond to valid faster.
     """
-    
-    def __init__(self, variance_threshold: float = 0.4):
+
+    def __init__(self, variance_threshold: float = 0.4, z_threshold: float = TIMING_Z_THRESHOLD):
         self.variance_threshold = variance_threshold
+        self.z_threshold = z_threshold
 
-    def compute_ratio(self, real_ms: float, fake_times: List[float]) -> float:
+    def compute_ratio(
+        self, real_ms: float, fake_times: List[float], baseline_ms: Optional[float] = None
+    ) -> float:
         """
-        Compute timing ratio: real_response_time / avg_fake_response_time.
-        Ratio > 1.4 suggests real address (takes longer to verify).
+        Compute timing ratio: real_response_time / expected_fake_response_time.
+        Uses the learned per-MX baseline when available, else this probe's fakes.
         """
+        if baseline_ms:
+            return real_ms / baseline_ms
+
         if not fake_times or all(t == 0 for t in fake_times):
             return 1.0
-        
+
         fake_avg = mean([t for t in fake_times if t > 0])
-        
+
         if fake_avg == 0:
             return 1.0
-        
+
         return real_ms / fake_avg
 
-    def analyze_pattern(self, real_ms: float, fake_times: List[float]) -> dict:
+    def analyze_pattern(
+        self,
+        real_ms: float,
+        fake_times: List[float],
+        baseline: Optional[Dict] = None,
+        mta_info: Optional[Dict] = None,
+    ) -> dict:
         """
-        Analyze timing pattern:
-        - If ratio > 1.4: real address (valid) — server spends more time checking
-        - If ratio < 0.8: likely catch-all — fake rejected same as real
+        Analyze timing pattern against the expected fake latency spread:
+        - ratio above 1 + z * cv: real address (valid) — server spends more time checking
+        - ratio below 1 - z * cv: likely catch-all — fake rejected same as real
         - Else: ambiguous
+
+        Spread (cv) comes from the learned MX baseline, then the learned MTA
+        baseline, then the fingerprinted MTA's timing_variance prior.
         """
-        if not fake_times:
+        baseline = baseline or {}
+        baseline_ms = baseline.get("mean_ms")
+
+        if not fake_times and not baseline_ms:
             return {"status": "insufficient_data", "ratio": 1.0, "confidence": 0}
-        
-        ratio = self.compute_ratio(real_ms, fake_times)
-        
+
+        ratio = self.compute_ratio(real_ms, fake_times, baseline_ms)
+
         if len(fake_times) > 1:
             std = stdev(fake_times)
             variance = std / mean(fake_times) if mean(fake_times) > 0 else 0
         else:
             variance = 0
 
-        if ratio > 1.4:
-            return {
-                "status": "valid",
-                "ratio": ratio,
-                "confidence": min(90, 60 + (ratio - 1.4) * 50),
-                "variance": variance,
-            }
-        elif ratio < 0.8:
-            return {
-                "status": "catch_all",
-                "ratio": ratio,
-                "confidence": min(80, 50 + (0.8 - ratio) * 50),
-                "variance": variance,
-            }
+        cv = baseline.get("cv")
+        if cv is None and mta_info:
+            cv = mta_info.get("timing_variance")
+        if cv is None:
+            cv = self.variance_threshold
+        cv = max(cv, TIMING_MIN_CV)
+
+        high = 1 + self.z_threshold * cv
+        low = max(0.0, 1 - self.z_threshold * cv)
+
+        result = {
+            "ratio": ratio,
+            "variance": variance,
+            "threshold_high": high,
+            "threshold_low": low,
+            "baseline": baseline.get("source"),
+        }
+
+        if ratio > high:
+            result.update(status="valid", confidence=min(90, 60 + (ratio - high) * 50))
+        elif ratio < low:
+            result.update(status="catch_all", confidence=min(80, 50 + (low - ratio) * 50))
         else:
-            return {
-                "status": "ambiguous",
-                "ratio": ratio,
-                "confidence": 40,
-                "variance": variance,
-            }
-
-timing_analyzer = TimingAnalyzer()
\ No newline at end of file
+            result.update(status="ambiguous", confidence=40)
+
+        return result
+
+timing_analyzer = TimingAnalyzer()
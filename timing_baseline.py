@@ -0,0 +1,128 @@
+import math
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable
+from ..config import (
+    TIMING_BASELINE_MAX_HOSTS, TIMING_BASELINE_MIN_SAMPLES, TIMING_BASELINE_WINDOW
+)
+
+class RunningStats:
+    """
+    Welford online mean/variance.
+    Sample count is capped so old observations decay and the baseline
+    follows MX hosts whose latency drifts over time.
+    """
+
+    __slots__ = ("n", "mean", "m2", "window")
+
+    def __init__(self, window: int = TIMING_BASELINE_WINDOW):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.window = window
+
+    def add(self, value: float) -> None:
+        """Add one observation."""
+        if self.n >= self.window:
+            # Shrink towards the current estimate so new samples keep weight
+            self.m2 *= (self.window - 1) / self.n
+            self.n = self.window - 1
+
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def cv(self) -> float:
+        """Coefficient of variation (std / mean)."""
+        return self.std / self.mean if self.mean > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {"samples": self.n, "mean": self.mean, "std": self.std, "cv": self.cv}
+
+class TimingBaselineStore:
+    """
+    Learned fake-RCPT latency distributions per MX host and per MTA.
+    Per-MX stats give the expected "rejected/unknown recipient" latency;
+    per-MTA stats give the relative spread for hosts we have not seen yet.
+    """
+
+    def __init__(
+        self,
+        max_hosts: int = TIMING_BASELINE_MAX_HOSTS,
+        min_samples: int = TIMING_BASELINE_MIN_SAMPLES,
+    ):
+        self.max_hosts = max_hosts
+        self.min_samples = min_samples
+        self.by_mx: "OrderedDict[str, RunningStats]" = OrderedDict()
+        self.by_mta: Dict[str, RunningStats] = {}
+        self.lock = Lock()
+
+    def record(self, mx_host: str, mta: str, fake_times: Iterable[float]) -> None:
+        """Feed fake RCPT latencies observed on one probe."""
+        samples = [t for t in fake_times if t > 0]
+        if not samples:
+            return
+
+        with self.lock:
+            mx_stats = self.by_mx.get(mx_host)
+            if mx_stats is None:
+                mx_stats = self.by_mx[mx_host] = RunningStats()
+                if len(self.by_mx) > self.max_hosts:
+                    self.by_mx.popitem(last=False)
+            else:
+                self.by_mx.move_to_end(mx_host)
+
+            for t in samples:
+                mx_stats.add(t)
+
+            # Per-MTA spread is tracked relative to each host's own mean so
+            # near and far hosts of the same MTA share one distribution
+            if mx_stats.n >= self.min_samples:
+                mta_stats = self.by_mta.setdefault(mta, RunningStats())
+                for t in samples:
+                    mta_stats.add(t / mx_stats.mean)
+
+    def get(self, mx_host: str, mta: str) -> Dict:
+        """
+        Return the baseline to judge a probe against.
+        mean_ms is None until the MX host has enough samples.
+        """
+        with self.lock:
+            mx_stats = self.by_mx.get(mx_host)
+            mta_stats = self.by_mta.get(mta)
+
+            mx_warm = mx_stats is not None and mx_stats.n >= self.min_samples
+            mta_warm = mta_stats is not None and mta_stats.n >= self.min_samples
+
+            return {
+                "mean_ms": mx_stats.mean if mx_warm else None,
+                "cv": mx_stats.cv if mx_warm else (mta_stats.std if mta_warm else None),
+                "samples": mx_stats.n if mx_stats else 0,
+                "source": "mx" if mx_warm else ("mta" if mta_warm else None),
+            }
+
+    def is_warm(self, mx_host: str) -> bool:
+        """True when the MX host has a usable learned baseline."""
+        with self.lock:
+            stats = self.by_mx.get(mx_host)
+            return stats is not None and stats.n >= self.min_samples
+
+    def stats(self) -> Dict:
+        """Snapshot for monitoring."""
+        with self.lock:
+            return {
+                "mx_hosts": len(self.by_mx),
+                "mta": {mta: s.to_dict() for mta, s in self.by_mta.items()},
+            }
+
+timing_baselines = TimingBaselineStore()
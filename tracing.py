@@ -0,0 +1,236 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import sys
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+from ..config import (
+    TRACE_EXPORTER, TRACE_FILE, TRACE_SAMPLE_RATE, TRACE_SLOW_MS, TRACE_KEEP_ERRORS,
+    TRACE_MAX_SPANS,
+)
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class _Trace:
+    __slots__ = ("trace_id", "spans", "head_sampled", "error", "closed")
+
+    def __init__(self, head_sampled: bool):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List["Span"] = []
+        self.head_sampled = head_sampled
+        self.error = False
+        self.closed = False
+
+class Span:
+    """
+    One timed stage. Used as a context manager; spans opened inside it
+    (including in tasks created inside it) become its children.
+    """
+
+    __slots__ = (
+        "tracer", "trace", "span_id", "parent_id", "name", "attributes",
+        "start", "duration_ms", "status", "token",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, parent: Optional["Span"], attributes: Dict):
+        self.tracer = tracer
+        self.trace = parent.trace if parent else _Trace(random.random() < tracer.sample_rate)
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes
+        self.start = 0.0
+        self.duration_ms = 0.0
+        self.status = "ok"
+        self.token = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def fail(self, error: str) -> None:
+        """Mark failed without raising (errors the caller swallows)."""
+        self.status = "error"
+        self.attributes["error"] = error
+        self.trace.error = True
+
+    def __enter__(self) -> "Span":
+        self.start = time.time()
+        self.token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_ms = (time.time() - self.start) * 1000
+        _current.reset(self.token)
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            # Hedge loser or expired deadline; not a failure of this stage
+            self.status = "cancelled"
+        elif exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            self.status = "error"
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+            self.trace.error = True
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+class _NoopSpan:
+    trace_id = None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def fail(self, error: str) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+class StdoutExporter:
+    def export(self, spans: List[Dict]) -> None:
+        sys.stdout.write(json.dumps({"spans": spans}, default=str) + "\n")
+        sys.stdout.flush()
+
+class FileExporter:
+    """Appends one JSON line per kept trace."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = Lock()
+
+    def export(self, spans: List[Dict]) -> None:
+        line = json.dumps({"spans": spans}, default=str) + "\n"
+        with self.lock, open(self.path, "a") as f:
+            f.write(line)
+
+class Tracer:
+    """
+    Lightweight OpenTelemetry-style tracer with local exporters.
+
+    - Head sampling: TRACE_SAMPLE_RATE of traces are kept regardless
+    - Tail sampling: traces slower than TRACE_SLOW_MS, or with an error
+      span (TRACE_KEEP_ERRORS), are kept as well
+    - Spans of a trace are buffered until its root span ends, then the
+      whole trace is exported or dropped
+    - With no exporter, span() returns a shared no-op span
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[Any] = None,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        slow_ms: Optional[float] = TRACE_SLOW_MS,
+        keep_errors: bool = TRACE_KEEP_ERRORS,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.keep_errors = keep_errors
+        self.counters = {"traces": 0, "exported": 0, "dropped": 0, "late_spans": 0, "export_errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, **attributes: Any):
+        """Open a child of the current span, or a new trace if none is active."""
+        if self.exporter is None:
+            return NOOP_SPAN
+        return Span(self, name, _current.get(), attributes)
+
+    def current_trace_id(self) -> Optional[str]:
+        span = _current.get()
+        return span.trace_id if span is not None else None
+
+    def _finish(self, span: Span) -> None:
+        trace = span.trace
+        if trace.closed:
+            # Outlived its root (e.g. a shared Omkar lookup); the trace is gone
+            self.counters["late_spans"] += 1
+            return
+        if len(trace.spans) < TRACE_MAX_SPANS:
+            trace.spans.append(span)
+        if span.parent_id is not None:
+            return
+
+        trace.closed = True
+        self.counters["traces"] += 1
+        keep = (
+            trace.head_sampled
+            or (self.keep_errors and trace.error)
+            or (self.slow_ms is not None and span.duration_ms >= self.slow_ms)
+        )
+        if not keep:
+            self.counters["dropped"] += 1
+            return
+        try:
+            self.exporter.export([s.to_dict() for s in trace.spans])
+            self.counters["exported"] += 1
+        except Exception as e:
+            self.counters["export_errors"] += 1
+            logger.warning(f"Trace export failed: {e}")
+
+    def stats(self) -> Dict:
+        return dict(
+            self.counters,
+            exporter=type(self.exporter).__name__ if self.exporter else None,
+            sample_rate=self.sample_rate,
+            slow_ms=self.slow_ms,
+        )
+
+def current_span():
+    """The active span (or a no-op), for adding attributes from inside a traced function."""
+    span = _current.get()
+    return span if span is not None else NOOP_SPAN
+
+def traced(name: str, **attributes: Any) -> Callable:
+    """Decorator wrapping a sync or async function in a span."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _build_exporter() -> Optional[Any]:
+    if TRACE_EXPORTER == "stdout":
+        return StdoutExporter()
+    if TRACE_EXPORTER == "file":
+        return FileExporter(TRACE_FILE)
+    return None
+
+tracer = Tracer(_build_exporter())
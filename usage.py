@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+import redis
+from collections import Counter, defaultdict
+from typing import Dict, Optional, Tuple
+from ..config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, USAGE_RESOLUTIONS, USAGE_RETENTION,
+    USAGE_FLUSH_EVENTS, USAGE_FLUSH_INTERVAL, USAGE_MAX_BUCKETS, USAGE_TOP_DOMAINS,
+)
+
+logger = logging.getLogger(__name__)
+
+class UsageMeter:
+    """
+    Per-customer usage rollups for billing and capacity planning.
+
+    Verified emails are counted in memory per (customer, domain, source,
+    minute) and flushed as pipelined HINCRBYs into minute, hour and day
+    buckets, one hash per customer and bucket:
+
+        usage:<customer>:<resolution>:<bucket start>
+            total, src:<source>, dom:<domain>, dom:<domain>|<source>
+        usage_global:<resolution>:<bucket start>
+            total, src:<source>  (across customers)
+
+    Each resolution has its own retention (USAGE_RETENTION), so day
+    rollups outlive the hourly quota counters. Range queries compute the
+    bucket keys they need instead of scanning.
+    """
+
+    def __init__(self):
+        self.r = redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True
+        )
+        self.pending: Counter = Counter()
+        self.buffered = 0
+        self.flushing: Optional[asyncio.Task] = None
+        self.task: Optional[asyncio.Task] = None
+        self.counters = {"recorded": 0, "flushes": 0, "flush_errors": 0}
+
+    def record(self, customer_id: str, domain: str, source: str, count: int = 1) -> None:
+        """Count verified emails; written to Redis on the next flush."""
+        minute = int(time.time()) // 60 * 60
+        self.pending[(customer_id, domain.lower(), source, minute)] += count
+        self.buffered += count
+        self.counters["recorded"] += count
+        if self.buffered >= USAGE_FLUSH_EVENTS and (self.flushing is None or self.flushing.done()):
+            try:
+                self.flushing = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                pass  # No loop (scripts); the caller flushes
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    async def run(self) -> None:
+        """Background flush loop."""
+        while True:
+            await asyncio.sleep(USAGE_FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.pending:
+            return
+        pending, self.pending, self.buffered = self.pending, Counter(), 0
+        try:
+            await asyncio.to_thread(self._write, pending)
+            self.counters["flushes"] += 1
+        except Exception as e:
+            # Keep the counts for the next flush rather than losing billable usage
+            logger.error(f"Usage flush failed: {e}")
+            self.counters["flush_errors"] += 1
+            self.pending.update(pending)
+            self.buffered += sum(pending.values())
+
+    def _write(self, pending: Counter) -> None:
+        increments: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        for (customer_id, domain, source, minute), count in pending.items():
+            for resolution, step in USAGE_RESOLUTIONS.items():
+                bucket = minute - minute % step
+                fields = increments[(self._key(customer_id, resolution, bucket), resolution)]
+                fields["total"] += count
+                fields[f"src:{source}"] += count
+                fields[f"dom:{domain}"] += count
+                fields[f"dom:{domain}|{source}"] += count
+
+                fields = increments[(self._key(None, resolution, bucket), resolution)]
+                fields["total"] += count
+                fields[f"src:{source}"] += count
+
+        pipe = self.r.pipeline(transaction=False)
+        for (key, resolution), fields in increments.items():
+            for field, count in fields.items():
+                pipe.hincrby(key, field, count)
+            pipe.expire(key, USAGE_RETENTION[resolution])
+        pipe.execute()
+
+    def _key(self, customer_id: Optional[str], resolution: str, bucket: int) -> str:
+        if customer_id is None:
+            return f"usage_global:{resolution}:{bucket}"
+        return f"usage:{customer_id}:{resolution}:{bucket}"
+
+    def query(
+        self,
+        customer_id: Optional[str],
+        start: float,
+        end: float,
+        resolution: Optional[str] = None,
+        domain: Optional[str] = None,
+    ) -> Dict:
+        """
+        Usage per bucket between start and end (unix seconds), with totals
+        by source, for one customer or (customer_id None) all of them. Picks
+        the finest resolution within USAGE_MAX_BUCKETS unless one is given.
+        Up to USAGE_FLUSH_INTERVAL seconds behind.
+        """
+        if end < start:
+            raise ValueError("end is before start")
+        if resolution is None:
+            resolution = next(
+                (name for name, step in USAGE_RESOLUTIONS.items()
+                 if (end - start) // step + 1 <= USAGE_MAX_BUCKETS),
+                list(USAGE_RESOLUTIONS)[-1],
+            )
+        if resolution not in USAGE_RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {list(USAGE_RESOLUTIONS)}")
+
+        step = USAGE_RESOLUTIONS[resolution]
+        first = int(start) // step * step
+        last = int(end) // step * step
+        buckets = range(first, last + step, step)
+        if len(buckets) > USAGE_MAX_BUCKETS:
+            raise ValueError(f"range spans more than {USAGE_MAX_BUCKETS} {resolution} buckets")
+
+        pipe = self.r.pipeline(transaction=False)
+        for bucket in buckets:
+            pipe.hgetall(self._key(customer_id, resolution, bucket))
+        hashes = pipe.execute()
+
+        domain = domain.lower() if domain else None
+        series = []
+        sources: Counter = Counter()
+        domains: Counter = Counter()
+        for bucket, fields in zip(buckets, hashes):
+            bucket_sources = {}
+            if domain:
+                prefix = f"dom:{domain}|"
+                total = int(fields.get(f"dom:{domain}", 0))
+                for field, count in fields.items():
+                    if field.startswith(prefix):
+                        bucket_sources[field[len(prefix):]] = int(count)
+            else:
+                total = int(fields.get("total", 0))
+                for field, count in fields.items():
+                    if field.startswith("src:"):
+                        bucket_sources[field[4:]] = int(count)
+                    elif field.startswith("dom:") and "|" not in field:
+                        domains[field[4:]] += int(count)
+            sources.update(bucket_sources)
+            series.append({"start": bucket, "total": total, "sources": bucket_sources})
+
+        result = {
+            "customer_id": customer_id,
+            "resolution": resolution,
+            "start": first,
+            "end": last + step,
+            "domain": domain,
+            "total": sum(b["total"] for b in series),
+            "sources": dict(sources),
+            "buckets": series,
+        }
+        if domains:
+            result["top_domains"] = [
+                {"domain": d, "total": n} for d, n in domains.most_common(USAGE_TOP_DOMAINS)
+            ]
+        return result
+
+    def stats(self) -> Dict:
+        return dict(self.counters, buffered=self.buffered)
+
+usage_meter = UsageMeter()
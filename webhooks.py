@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import time
+import uuid
+import httpx
+import redis
+from typing import Dict, List, Optional
+from ..config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, WEBHOOK_SIGNING_SECRET, WEBHOOK_TIMEOUT,
+    WEBHOOK_MAX_ATTEMPTS, WEBHOOK_BACKOFF_BASE, WEBHOOK_BACKOFF_MAX, WEBHOOK_CONCURRENCY,
+    WEBHOOK_POLL_INTERVAL, WEBHOOK_LEASE_SECONDS, WEBHOOK_RETENTION, WEBHOOK_DEAD_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = "webhook:outbox"
+DEAD_KEY = "webhook:dead"
+
+class UnsafeCallbackURL(ValueError):
+    """Callback URL points at a private, loopback or link-local address."""
+
+def is_public_address(address: str) -> bool:
+    """True for globally routable unicast IPs."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+def check_callback_host(host: str) -> None:
+    """
+    Reject callback hosts that are internal without resolving them:
+    non-public IP literals (including integer forms), localhost and
+    single-label names. Hostnames are checked again at delivery, after
+    DNS resolution.
+    """
+    host = host.strip("[]").rstrip(".").lower()
+    try:
+        address = str(ipaddress.ip_address(int(host) if host.isdigit() else host))
+    except ValueError:
+        if host == "localhost" or host.endswith(".localhost") or "." not in host:
+            raise UnsafeCallbackURL(f"Callback host {host} is not public")
+        return
+    if not is_public_address(address):
+        raise UnsafeCallbackURL(f"Callback host {host} is not public")
+
+class WebhookDispatcher:
+    """
+    Delivers completed verifications to customer callback URLs.
+
+    Deliveries are written to a Redis outbox (sorted set scored by next
+    attempt time) before any network I/O, so they survive restarts. A
+    background loop leases due deliveries, POSTs them over a pooled
+    client with an HMAC signature, and reschedules failures with
+    exponential backoff. Delivery is at-least-once; receivers should
+    dedupe on the X-Bounso-Delivery header.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        secret: str = WEBHOOK_SIGNING_SECRET,
+        allow_private: bool = False,
+    ):
+        self.r = redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            decode_responses=True
+        )
+        self.transport = transport
+        self.secret = secret
+        self.allow_private = allow_private  # Test stand-ins only
+        self.client: Optional[httpx.AsyncClient] = None
+        self.task: Optional[asyncio.Task] = None
+        self.counters = {"delivered": 0, "retried": 0, "dead_lettered": 0}
+
+    def enqueue(self, url: str, payload: Dict, job_id: Optional[str] = None) -> str:
+        """Persist a delivery in the outbox; it is sent by the background loop."""
+        delivery_id = uuid.uuid4().hex
+        key = f"webhook:delivery:{delivery_id}"
+        pipe = self.r.pipeline()
+        pipe.hset(key, mapping={
+            "url": url,
+            "body": json.dumps(payload),
+            "job_id": job_id or "",
+            "attempts": 0,
+            "created_at": time.time(),
+        })
+        pipe.expire(key, WEBHOOK_RETENTION)
+        pipe.zadd(OUTBOX_KEY, {delivery_id: time.time()})
+        pipe.execute()
+        return delivery_id
+
+    def enqueue_results(
+        self, url: str, job_id: str, results: List[Dict], batch: int, final: bool
+    ) -> str:
+        return self.enqueue(url, {
+            "job_id": job_id,
+            "batch": batch,
+            "final": final,
+            "results": results,
+        }, job_id=job_id)
+
+    def sign(self, body: str, timestamp: int) -> str:
+        """HMAC-SHA256 over "<timestamp>.<body>" (Stripe-style, replay-safe)."""
+        digest = hmac.new(
+            self.secret.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256
+        ).hexdigest()
+        return f"t={timestamp},v1={digest}"
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def run(self) -> None:
+        """Background delivery loop."""
+        while True:
+            try:
+                delivered = await self.deliver_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Webhook dispatcher error: {e}")
+                delivered = 0
+            if not delivered:
+                await asyncio.sleep(WEBHOOK_POLL_INTERVAL)
+
+    async def deliver_due(self) -> int:
+        """Lease and deliver one batch of due deliveries. Returns batch size."""
+        now = time.time()
+        due = self.r.zrangebyscore(OUTBOX_KEY, 0, now, start=0, num=WEBHOOK_CONCURRENCY)
+        if not due:
+            return 0
+
+        # Lease by pushing the next attempt out; a crash mid-send just retries
+        pipe = self.r.pipeline()
+        for delivery_id in due:
+            pipe.zadd(OUTBOX_KEY, {delivery_id: now + WEBHOOK_LEASE_SECONDS}, xx=True)
+        pipe.execute()
+
+        await asyncio.gather(*(self._deliver(delivery_id) for delivery_id in due))
+        return len(due)
+
+    async def _deliver(self, delivery_id: str) -> None:
+        key = f"webhook:delivery:{delivery_id}"
+        delivery = self.r.hgetall(key)
+        if not delivery:
+            self.r.zrem(OUTBOX_KEY, delivery_id)
+            return
+
+        retryable = True
+        try:
+            url = delivery["url"]
+            if not self.allow_private:
+                await self._check_destination(url)
+            timestamp = int(time.time())
+            body = delivery["body"]
+            headers = {
+                "Content-Type": "application/json",
+                "X-Bounso-Delivery": delivery_id,
+                "X-Bounso-Signature": self.sign(body, timestamp),
+            }
+            response = await self._get_client().post(url, content=body, headers=headers)
+            if response.status_code < 300:
+                pipe = self.r.pipeline()
+                pipe.zrem(OUTBOX_KEY, delivery_id)
+                pipe.delete(key)
+                pipe.execute()
+                self.counters["delivered"] += 1
+                return
+            retryable = response.status_code in (408, 429) or response.status_code >= 500
+            error = f"HTTP {response.status_code}"
+        except (httpx.HTTPError, OSError) as e:
+            error = str(e) or type(e).__name__
+        except Exception as e:
+            # Bad or unsafe URL, corrupt delivery: another attempt cannot succeed
+            retryable = False
+            error = f"{type(e).__name__}: {e}"
+
+        attempts = int(delivery.get("attempts") or 0) + 1
+        if not retryable or attempts >= WEBHOOK_MAX_ATTEMPTS:
+            logger.warning(f"Webhook {delivery_id} to {delivery.get('url')} dead after {attempts} attempts: {error}")
+            pipe = self.r.pipeline()
+            pipe.zrem(OUTBOX_KEY, delivery_id)
+            pipe.hset(key, mapping={"attempts": attempts, "last_error": error})
+            pipe.rpush(DEAD_KEY, delivery_id)
+            pipe.ltrim(DEAD_KEY, -WEBHOOK_DEAD_MAX, -1)
+            pipe.execute()
+            self.counters["dead_lettered"] += 1
+            return
+
+        backoff = min(WEBHOOK_BACKOFF_MAX, WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1))
+        backoff *= random.uniform(0.8, 1.2)
+        pipe = self.r.pipeline()
+        pipe.hset(key, mapping={"attempts": attempts, "last_error": error})
+        pipe.zadd(OUTBOX_KEY, {delivery_id: time.time() + backoff})
+        pipe.execute()
+        self.counters["retried"] += 1
+
+    async def _check_destination(self, url: str) -> None:
+        """Resolve the callback host and refuse non-public addresses."""
+        parsed = httpx.URL(url)
+        check_callback_host(parsed.host)
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parsed.host, parsed.port or (443 if parsed.scheme == "https" else 80)
+        )
+        for *_, sockaddr in infos:
+            if not is_public_address(sockaddr[0]):
+                raise UnsafeCallbackURL(f"Callback host {parsed.host} resolves to {sockaddr[0]}")
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=WEBHOOK_TIMEOUT,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=WEBHOOK_CONCURRENCY,
+                    max_keepalive_connections=WEBHOOK_CONCURRENCY,
+                ),
+            )
+        return self.client
+
+    def stats(self) -> Dict:
+        return dict(
+            self.counters,
+            outbox=self.r.zcard(OUTBOX_KEY),
+            dead=self.r.llen(DEAD_KEY),
+        )
+
+webhook_dispatcher = WebhookDispatcher()